@@ -0,0 +1,33 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Runs shard_count topic_activity_monitor processes and the topic_status_aggregator that merges them
+
+Usage:
+    ros2 launch topic_activity_monitor sharded.launch.py shard_count:=4
+"""
+from launch import LaunchDescription
+from launch.actions import DeclareLaunchArgument, OpaqueFunction
+from launch.substitutions import LaunchConfiguration
+from launch_ros.actions import Node
+
+
+def launch_shards(context):
+    shard_count = int(LaunchConfiguration("shard_count").perform(context))
+    config_path = LaunchConfiguration("config_path").perform(context)
+    shards = [Node(package="topic_activity_monitor",
+                   executable="topic_activity_monitor",
+                   name="_topic_activity_monitor_shard_%d" % shard_index,
+                   arguments=["--config-path", config_path,
+                              "--shard-count", str(shard_count),
+                              "--shard-index", str(shard_index)])
+              for shard_index in range(shard_count)]
+    return shards + [Node(package="topic_activity_monitor", executable="topic_status_aggregator")]
+
+
+def generate_launch_description():
+    return LaunchDescription([
+        DeclareLaunchArgument("shard_count", default_value="2"),
+        DeclareLaunchArgument("config_path", default_value="config/example.ini"),
+        OpaqueFunction(function=launch_shards),
+    ])
@@ -1,3 +1,5 @@
+from glob import glob
+
 from setuptools import setup
 
 package_name = 'topic_activity_monitor'
@@ -6,6 +8,7 @@ setup(
     name=package_name,
     version='0.1.0',
     packages=[package_name,
+              package_name + "/benchmark",
               package_name + "/config",
               package_name + "/lib"],
     package_data={package_name + "/config": ["*.ini"]},
@@ -13,6 +16,7 @@ setup(
         ('share/ament_index/resource_index/packages',
             ['resource/' + package_name]),
         ('share/' + package_name, ['package.xml']),
+        ('share/' + package_name + '/launch', glob('launch/*.launch.py')),
     ],
     install_requires=['setuptools'],
     zip_safe=True,
@@ -24,6 +28,9 @@ setup(
     entry_points={
         'console_scripts': [
             "topic_activity_monitor = topic_activity_monitor.topic_activity_monitor:main",
+            "topic_status_aggregator = topic_activity_monitor.topic_status_aggregator:main",
+            "topic_status_history = topic_activity_monitor.topic_status_history:main",
+            "topic_status_replay = topic_activity_monitor.topic_status_replay:main",
         ],
     },
 )
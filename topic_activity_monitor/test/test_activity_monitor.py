@@ -0,0 +1,48 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import argparse
+from threading import Thread
+import time
+
+from topic_activity_monitor.benchmark.fake_node import FakeClock, FakeNode
+from topic_activity_monitor.benchmark.load_generator import SyntheticPublisher
+from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+
+MSG_TYPE_NAME = "std_msgs/msg/String"
+
+def subscribed_monitor(tmp_path):
+    """ returns the ActivityMonitor of a continuous topic, subscribed and receiving messages """
+    config_path = tmp_path / "monitor.ini"
+    with open(config_path, "w") as config_file:
+        config_file.write("[/chatter]\nTYPE: %s\nWINDOW_SIZE: 10\nDEADLINE: 0.1\nTIMEOUT: 1\nMODE: continuous\n\n" % MSG_TYPE_NAME)
+        config_file.write('[SETTINGS]\nBLACKLIST: ["/topic_status"]\nSAMPLING_SEED: 0\n')
+    clock = FakeClock()
+    ros_node = FakeNode(clock)
+    tracker = NetworkStateTracker(ros_node, argparse.Namespace(config_path=str(config_path), shard_count=1, shard_index=0),
+                                  clock=clock)
+    SyntheticPublisher(ros_node, "/chatter", MSG_TYPE_NAME, 20.0).start(clock())
+    ros_node.run_until(clock() + 2.0)
+    return tracker.activity_monitors["/chatter"]
+
+def test_callback_after_unsubscribe_while_waiting_for_lock(tmp_path):
+    monitor = subscribed_monitor(tmp_path)
+    assert(monitor._subscription is not None)
+    errors = list()
+
+    def callback():
+        try:
+            monitor._topic_callback(b"hello")
+        except Exception as error:
+            errors.append(error)
+
+    # The callback gets past its unlocked checks, then waits for the lock while the monitor unsubscribes
+    with monitor._lock:
+        thread = Thread(target=callback)
+        thread.start()
+        time.sleep(0.1)
+        monitor._unsubscribe()
+    thread.join()
+    assert(not errors)
+    # Nothing recorded into the cleared window
+    assert(monitor._last_stamp is None)
@@ -0,0 +1,29 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor.lib.change_log import ChangeLog
+
+def test_changed_since_returns_each_topic_once_oldest_first():
+    change_log = ChangeLog()
+    for topic_name in ["/a", "/b", "/c", "/a"]:
+        change_log.changed(topic_name)
+    assert(change_log.version == 4)
+    assert(change_log.changed_since(0) == ["/b", "/c", "/a"])
+    assert(change_log.changed_since(2) == ["/c", "/a"])
+    assert(change_log.changed_since(4) == list())
+
+def test_covers():
+    change_log = ChangeLog()
+    change_log.changed("/a")
+    change_log.changed("/b")
+    assert(change_log.covers(change_log.epoch, 1))
+    assert(change_log.covers(change_log.epoch, 2))
+    # Never synced
+    assert(not change_log.covers(change_log.epoch, 0))
+    assert(not change_log.covers("", 0))
+    # A version from before a restart, even one the new log has reached, or from the future
+    assert(not change_log.covers(ChangeLog().epoch, 1))
+    assert(not change_log.covers(change_log.epoch, 3))
+
+def test_every_log_has_its_own_epoch():
+    assert(not ChangeLog().epoch == ChangeLog().epoch)
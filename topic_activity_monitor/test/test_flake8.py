@@ -0,0 +1,15 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import os
+
+from ament_flake8.main import main_with_errors
+import pytest
+
+@pytest.mark.flake8
+@pytest.mark.linter
+def test_flake8():
+    # setup.cfg's [flake8] holds the conventions this package is written in
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "setup.cfg")
+    rc, errors = main_with_errors(argv=["--config", config_path])
+    assert(rc == 0), "Found %d code style errors / warnings:\n" % len(errors) + "\n".join(errors)
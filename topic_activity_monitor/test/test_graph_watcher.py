@@ -0,0 +1,42 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor.benchmark.fake_node import make_graph
+from topic_activity_monitor.lib.graph_watcher import GraphWatcher
+
+def event_driven_watcher():
+    """ returns (ros_node, watcher) after the initial scan of a small graph """
+    ros_node = make_graph(3, 4)
+    watcher = GraphWatcher(ros_node)
+    watcher.event_driven = True
+    watcher.scan()
+    return ros_node, watcher
+
+def test_own_change_skips_one_scan():
+    ros_node, watcher = event_driven_watcher()
+    watcher.own_change()
+    watcher.notify_graph_change()
+    ros_node.calls = 0
+    assert(watcher.scan() == [])
+    assert(ros_node.calls == 0 and watcher.own_events == 1)
+
+def test_coalesced_own_changes_do_not_hide_later_changes():
+    ros_node, watcher = event_driven_watcher()
+    # rmw reports several of our changes with one event, a publisher added after them must still be seen
+    for _ in range(5):
+        watcher.own_change()
+    watcher.notify_graph_change()
+    ros_node.add_publisher(("node_0", "/"), "/new_topic", "std_msgs/msg/String")
+    watcher.notify_graph_change()
+    assert(watcher.scan() == ["/new_topic"])
+    assert(watcher.own_events == 1)
+
+def test_change_before_own_event_is_seen_at_the_own_event():
+    ros_node, watcher = event_driven_watcher()
+    watcher.own_change()
+    ros_node.remove_publisher(("node_0", "/"), "/topic_0")
+    # The other node's event arrives first and is taken for ours, ours then triggers the scan
+    watcher.notify_graph_change()
+    assert(watcher.scan() == [])
+    watcher.notify_graph_change()
+    assert(watcher.scan() == ["/topic_0"])
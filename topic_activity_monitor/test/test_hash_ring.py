@@ -0,0 +1,35 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor.lib.hash_ring import HashRing, stable_hash
+
+TOPICS = ["/robot_%d/topic_%d" % (i // 10, i) for i in range(1000)]
+
+def test_stable_hash_is_fixed():
+    # The same in every process, so every shard agrees on the owners
+    assert(stable_hash("/chatter") == 0x2a592f1c20a95191)
+
+def test_empty_ring():
+    assert(HashRing().get_node("/chatter") is None)
+
+def test_keys_spread_over_the_nodes():
+    ring = HashRing(["shard_%d" % i for i in range(4)])
+    counts = dict()
+    for topic in TOPICS:
+        counts[ring.get_node(topic)] = counts.get(ring.get_node(topic), 0) + 1
+    assert(set(counts) == ring.nodes)
+    assert(min(counts.values()) > len(TOPICS) / 4 / 2)
+
+def test_removing_a_node_only_moves_its_keys():
+    ring = HashRing(["shard_%d" % i for i in range(4)])
+    before = {topic: ring.get_node(topic) for topic in TOPICS}
+    ring.remove_node("shard_1")
+    for topic in TOPICS:
+        if not before[topic] == "shard_1":
+            assert(ring.get_node(topic) == before[topic])
+        else:
+            assert(not ring.get_node(topic) == "shard_1")
+
+    # Adding it back restores the original owners
+    ring.add_node("shard_1")
+    assert({topic: ring.get_node(topic) for topic in TOPICS} == before)
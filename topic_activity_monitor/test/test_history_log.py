@@ -0,0 +1,78 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import numpy as np
+import pytest
+
+from topic_activity_monitor.benchmark.fake_node import FakeClock
+from topic_activity_monitor.lib.history_log import HistoryLog, HistoryReader
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, TopicStatusData
+
+def record(history_log, clock, topic_status_data, activity_status, timestamp):
+    clock.now = timestamp
+    topic_status_data.activity_status = activity_status
+    history_log.record(topic_status_data)
+
+def test_ring_keeps_the_last_capacity_records(tmp_path):
+    path = str(tmp_path / "history")
+    clock = FakeClock()
+    history_log = HistoryLog(path, capacity=4, clock=clock)
+    topic_status_data = TopicStatusData("/image_raw", "sensor_msgs/msg/Image")
+    for i, status in enumerate([ActivityStatus.ACTIVE, ActivityStatus.SLOW, ActivityStatus.ACTIVE,
+                                ActivityStatus.TIMEOUT, ActivityStatus.ACTIVE, ActivityStatus.SLOW]):
+        record(history_log, clock, topic_status_data, status, 1000.0 + 10.0 * i)
+    history_log.close()
+
+    reader = HistoryReader(path)
+    assert(reader.topic_names == ["/image_raw"])
+    assert(reader.records["timestamp"].tolist() == [1020.0, 1030.0, 1040.0, 1050.0])
+    assert(reader.records["activity_status"].tolist() == [ActivityStatus.ACTIVE.value, ActivityStatus.TIMEOUT.value,
+                                                          ActivityStatus.ACTIVE.value, ActivityStatus.SLOW.value])
+
+def test_reopening_appends(tmp_path):
+    path = str(tmp_path / "history")
+    clock = FakeClock()
+    history_log = HistoryLog(path, capacity=8, clock=clock)
+    record(history_log, clock, TopicStatusData("/a", "std_msgs/msg/String"), ActivityStatus.ACTIVE, 1000.0)
+    history_log.close()
+
+    # The capacity of the existing file wins
+    history_log = HistoryLog(path, capacity=100, clock=clock)
+    assert(history_log.capacity == 8)
+    record(history_log, clock, TopicStatusData("/b", "std_msgs/msg/String"), ActivityStatus.ACTIVE, 1001.0)
+    record(history_log, clock, TopicStatusData("/a", "std_msgs/msg/String"), ActivityStatus.TIMEOUT, 1002.0)
+    history_log.close()
+
+    reader = HistoryReader(path)
+    assert(reader.topic_names == ["/a", "/b"])
+    assert(reader.records["topic_id"].tolist() == [0, 1, 0])
+
+def test_not_a_history_file(tmp_path):
+    path = tmp_path / "history"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        HistoryLog(str(path))
+
+def test_query_and_time_in_status(tmp_path):
+    path = str(tmp_path / "history")
+    clock = FakeClock()
+    history_log = HistoryLog(path, capacity=16, clock=clock)
+    a = TopicStatusData("/a", "std_msgs/msg/String")
+    b = TopicStatusData("/b", "std_msgs/msg/String")
+    record(history_log, clock, a, ActivityStatus.ACTIVE, 1000.0)
+    record(history_log, clock, b, ActivityStatus.ACTIVE, 1001.0)
+    record(history_log, clock, a, ActivityStatus.TIMEOUT, 1004.0)
+    record(history_log, clock, a, ActivityStatus.ACTIVE, 1007.0)
+    history_log.close()
+
+    reader = HistoryReader(path)
+    timeouts = reader.query(activity_status=[ActivityStatus.TIMEOUT.value])
+    assert(timeouts["timestamp"].tolist() == [1004.0])
+    assert(len(reader.query(topic_ids=reader.topic_ids(["/b", "/missing"]))) == 1)
+    assert(len(reader.query(since=1001.0, until=1004.0)) == 2)
+
+    seconds = reader.time_in_status(1002.0, 1010.0)
+    assert(seconds[0][ActivityStatus.ACTIVE.value] == pytest.approx(5.0))
+    assert(seconds[0][ActivityStatus.TIMEOUT.value] == pytest.approx(3.0))
+    assert(seconds[1][ActivityStatus.ACTIVE.value] == pytest.approx(8.0))
+    assert(np.sum(seconds[1]) == pytest.approx(8.0))
@@ -0,0 +1,48 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor.lib.namespace_rollup import ACTIVE, NamespaceRollup, PRESENT, TIMEOUT, TOPICS
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, ConnectionStatus, TopicStatusData
+
+TOPIC_NAMES = ["/perception/camera/image_raw", "/perception/lidar/points", "/cmd_vel"]
+
+def make_rollup():
+    rollup = NamespaceRollup(domain_id=3)
+    topics = [TopicStatusData(name, "sensor_msgs/msg/Image") for name in TOPIC_NAMES]
+    for topic_status_data in topics:
+        topic_status_data.on_transition = rollup.update
+        topic_status_data.connection_status = ConnectionStatus.PRESENT
+        topic_status_data.activity_status = ActivityStatus.ACTIVE
+    return rollup, topics
+
+def counts(rollup, namespace, counters):
+    return [rollup.get(namespace).counts[counter] for counter in counters]
+
+def test_topics_count_towards_every_namespace_above_them():
+    rollup, _ = make_rollup()
+    assert(counts(rollup, "/", [TOPICS, PRESENT, ACTIVE]) == [3, 3, 3])
+    assert(counts(rollup, "/perception", [TOPICS, PRESENT, ACTIVE]) == [2, 2, 2])
+    assert(counts(rollup, "/perception/camera", [TOPICS, ACTIVE]) == [1, 1])
+    assert(rollup.get("/perception/radar") is None)
+
+def test_changed_returns_only_the_namespaces_that_changed_parents_first():
+    rollup, topics = make_rollup()
+    assert([node.namespace for node in rollup.changed()] == ["/", "/perception", "/perception/camera", "/perception/lidar"])
+    assert(rollup.changed() == list())
+
+    topics[1].activity_status = ActivityStatus.TIMEOUT
+    changed = rollup.changed()
+    assert([node.namespace for node in changed] == ["/", "/perception", "/perception/lidar"])
+    assert(counts(rollup, "/perception", [ACTIVE, TIMEOUT]) == [1, 1])
+
+    # Back where it was published from, nothing to report
+    topics[1].activity_status = ActivityStatus.ACTIVE
+    topics[1].activity_status = ActivityStatus.TIMEOUT
+    assert(rollup.changed() == list())
+
+def test_to_msg():
+    rollup, topics = make_rollup()
+    topics[0].activity_status = ActivityStatus.TIMEOUT
+    msg = rollup.to_msg(rollup.get("/perception"), 1000.0)
+    assert(msg.namespace == "/perception" and msg.domain_id == 3 and msg.timestamp == 1000.0)
+    assert([msg.topic_count, msg.present_count, msg.active_count, msg.timeout_count] == [2, 2, 1, 1])
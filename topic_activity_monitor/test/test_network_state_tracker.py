@@ -0,0 +1,58 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import argparse
+
+from topic_activity_monitor.benchmark.fake_node import FakeClock, FakeNode
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus
+from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+
+MSG_TYPE_NAME = "std_msgs/msg/String"
+
+def unmonitored_tracker(tmp_path, topic_names):
+    """ returns (tracker, ros_node, clock, [(topic_name, ActivityStatus)] published) with the monitors of topic_names stopped,
+    so their statuses only change when the test publishes them
+    """
+    config_path = tmp_path / "tracker.ini"
+    with open(config_path, "w") as config_file:
+        for topic_name in topic_names:
+            config_file.write("[%s]\nTYPE: %s\nWINDOW_SIZE: 10\nDEADLINE: 0.1\nTIMEOUT: 1\nMODE: continuous\n\n"
+                              % (topic_name, MSG_TYPE_NAME))
+        config_file.write('[SETTINGS]\nBLACKLIST: ["/topic_status"]\nSAMPLING_SEED: 0\n')
+    clock = FakeClock()
+    ros_node = FakeNode(clock)
+    tracker = NetworkStateTracker(ros_node, argparse.Namespace(config_path=str(config_path), shard_count=1, shard_index=0),
+                                  clock=clock)
+    for topic_name in topic_names:
+        tracker.activity_monitors.pop(topic_name).stop_monitor()
+    published = list()
+    tracker.update_pub.listeners.append(lambda msg: published.append((msg.topic_name, ActivityStatus(msg.activity_status))))
+    return tracker, ros_node, clock, published
+
+def refresh(tracker, topic_name, valid_duration):
+    with tracker.topics_lock:
+        topic_status_data = tracker.topics[topic_name]
+        topic_status_data.activity_status = ActivityStatus.ACTIVE
+        topic_status_data.valid_duration = valid_duration
+        tracker.publish_update(topic_status_data)
+
+def test_status_goes_stale_valid_duration_after_last_refresh(tmp_path):
+    tracker, ros_node, clock, published = unmonitored_tracker(tmp_path, ["/a", "/b"])
+    refresh(tracker, "/a", 1.0)
+    refresh(tracker, "/b", 0.0)  # Never expires
+    ros_node.run_until(clock() + 0.6)
+    refresh(tracker, "/a", 1.0)
+    del published[:]
+
+    # Refreshing moved the deadline, a second after the refresh rather than the first update
+    ros_node.run_until(clock() + 0.9)
+    assert(tracker.topics["/a"].activity_status == ActivityStatus.ACTIVE)
+    ros_node.run_until(clock() + 0.2)
+    assert(tracker.topics["/a"].activity_status == ActivityStatus.STALE)
+    assert(published == [("/a", ActivityStatus.STALE)])
+
+    # Nothing left on the timing wheel for either topic
+    ros_node.run_until(clock() + 10.0)
+    assert(published == [("/a", ActivityStatus.STALE)])
+    assert(tracker.topics["/b"].activity_status == ActivityStatus.ACTIVE)
+    assert(not tracker._expiry_timers)
@@ -0,0 +1,15 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from ament_pep257.main import main
+import pytest
+
+# """ text """ docstrings, a summary that may run onto a second line and no closing period,
+# and the blank line after the upstream docstrings of find_current_endpoints and _load_config_file
+IGNORE = ["D202", "D204", "D205", "D210", "D213", "D400", "D401", "D403", "D415"]
+
+@pytest.mark.linter
+@pytest.mark.pep257
+def test_pep257():
+    rc = main(argv=[".", "test", "--add-ignore"] + IGNORE)
+    assert(rc == 0), "Found code style errors / warnings"
@@ -0,0 +1,83 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor.lib.publisher_stats import PublisherStats
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus
+
+DEADLINE = 0.1
+
+def message(stats, sequence, received, gid=None):
+    msg_info = {"source_timestamp": 0, "received_timestamp": int(received * 1e9),
+                "publication_sequence_number": sequence, "reception_sequence_number": 0}
+    if gid is not None:
+        msg_info["publisher_gid"] = gid
+    stats.add(msg_info, received)
+
+def statuses(stats):
+    return {record.publisher_id: record.activity_status(DEADLINE) for record in stats.publishers}
+
+def test_sequence_ranges_tell_publishers_apart():
+    stats = PublisherStats()
+    for i in range(1, 21):
+        message(stats, 500 + i, 1000.0 + i * 0.05)
+        if i <= 10:
+            message(stats, i, 1000.01 + i * 0.05)
+    assert([record.message_count for record in stats.publishers] == [20, 10])
+    assert(statuses(stats) == {"seq-1": ActivityStatus.ACTIVE, "seq-2": ActivityStatus.ACTIVE})
+    stats.end_window()
+
+    for i in range(21, 41):
+        message(stats, 500 + i, 1000.0 + i * 0.05)
+    assert(statuses(stats) == {"seq-1": ActivityStatus.ACTIVE, "seq-2": ActivityStatus.TIMEOUT})
+
+def test_tied_sequence_numbers_are_ambiguous():
+    # Two publishers started together number their messages alike, so every other message fits both
+    stats = PublisherStats()
+    for i in range(1, 21):
+        message(stats, i, 1000.0 + i * 0.05)
+        message(stats, i, 1000.01 + i * 0.05)
+    assert(len(stats.publishers) == 2)
+    assert(all(record.ambiguous for record in stats.publishers))
+    # Neither is reported SLOW or TIMEOUT from a guess
+    assert(set(statuses(stats).values()) == {ActivityStatus.UNDEFINED})
+
+def test_skipped_numbers_are_ambiguous_when_another_publisher_fits():
+    stats = PublisherStats()
+    for i in range(1, 11):
+        message(stats, 100 + i, 1000.0 + i * 0.05)
+        message(stats, 95 + i, 1000.01 + i * 0.05)
+    assert(not any(record.ambiguous for record in stats.publishers))
+    # 113 skips 111 and 112 of the first publisher and 106 to 112 of the second, it could be either one's
+    message(stats, 113, 1000.6)
+    assert(all(record.ambiguous for record in stats.publishers))
+
+    # A new window starts out attributable again
+    stats.end_window()
+    message(stats, 114, 1000.65)
+    assert(not any(record.ambiguous for record in stats.publishers))
+
+def test_lost_messages_of_a_single_publisher_are_not_ambiguous():
+    stats = PublisherStats()
+    for sequence in [1, 2, 3, 6, 7]:
+        message(stats, sequence, 1000.0 + sequence * 0.05)
+    record, = stats.publishers
+    assert(not record.ambiguous)
+    assert(record.lost_count == 2)
+    assert(record.activity_status(DEADLINE) == ActivityStatus.SLOW)
+
+def test_publisher_gid_is_never_ambiguous():
+    stats = PublisherStats()
+    for i in range(1, 11):
+        message(stats, i, 1000.0 + i * 0.05, gid=b"\x01" * 16)
+        message(stats, i, 1000.01 + i * 0.05, gid=b"\x02" * 16)
+    assert([record.publisher_id for record in stats.publishers] == ["01" * 16, "02" * 16])
+    assert(set(statuses(stats).values()) == {ActivityStatus.ACTIVE})
+
+def test_to_msg_reports_ambiguous_attribution():
+    stats = PublisherStats()
+    for i in range(1, 4):
+        message(stats, i, 1000.0 + i * 0.05)
+        message(stats, i, 1000.01 + i * 0.05)
+    msg = stats.to_msg("/topic", 1001.0, DEADLINE)
+    assert([publisher.attribution_ambiguous for publisher in msg.publishers] == [True, True])
+    assert([publisher.activity_status for publisher in msg.publishers] == [ActivityStatus.UNDEFINED.value] * 2)
@@ -0,0 +1,33 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import numpy as np
+import pytest
+
+from topic_activity_monitor.lib.ring_buffer import RingBuffer
+
+def test_push_overwrites_the_oldest():
+    buffer = RingBuffer(4)
+    assert(len(buffer) == 0 and not buffer.full())
+    for value in [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]:
+        buffer.push(value)
+    assert(buffer.full())
+    assert(buffer.values().tolist() == [3.0, 4.0, 5.0, 6.0])
+    buffer.clear()
+    assert(len(buffer) == 0 and buffer.values().tolist() == [])
+
+def test_statistics_match_numpy():
+    values = np.random.default_rng(0).exponential(0.1, 1000)
+    buffer = RingBuffer(64)
+    for value in values:
+        buffer.push(value)
+    window = values[-64:]
+    assert(buffer.mean() == pytest.approx(window.mean()))
+    assert(buffer.std() == pytest.approx(window.std()))
+    assert(buffer.min() == window.min() and buffer.max() == window.max())
+    for q in [0, 50, 95, 100]:
+        assert(buffer.percentile(q) == pytest.approx(np.percentile(window, q)))
+
+def test_empty_statistics_are_zero():
+    buffer = RingBuffer(3)
+    assert([buffer.mean(), buffer.std(), buffer.min(), buffer.max(), buffer.percentile(50)] == [0.0] * 5)
@@ -0,0 +1,65 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import argparse
+
+from topic_activity_monitor.benchmark.fake_node import FakeClock, FakeNode, QuietLogger
+from topic_activity_monitor.benchmark.load_generator import SyntheticPublisher
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus
+from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+
+MSG_TYPE_NAME = "std_msgs/msg/String"
+
+class WarningLogger(QuietLogger):
+    """ QuietLogger that keeps its warnings """
+    def __init__(self):
+        self.warnings = list()
+
+    def warn(self, msg):
+        self.warnings.append(msg)
+
+def run(tmp_path, modes, max_subscriptions, duration, rate=20.0):
+    """ returns (tracker, ros_node, [(topic_name, ActivityStatus)] published) of topics /topic_<i> in modes[i] """
+    config_path = tmp_path / "scheduler.ini"
+    with open(config_path, "w") as config_file:
+        for i, mode in enumerate(modes):
+            config_file.write("[/topic_%d]\nTYPE: %s\nWINDOW_SIZE: 10\nRECONNECT_WAIT_TIME: 1\nDEADLINE: %f\nTIMEOUT: 1\n"
+                              "MODE: %s\n\n" % (i, MSG_TYPE_NAME, 2.0 / rate, mode))
+        config_file.write('[SETTINGS]\nBLACKLIST: ["/topic_status"]\nMAX_CONCURRENT_SUBSCRIPTIONS: %d\nSAMPLING_SEED: 0\n'
+                          % max_subscriptions)
+    clock = FakeClock()
+    ros_node = FakeNode(clock)
+    ros_node._logger = WarningLogger()
+    tracker = NetworkStateTracker(ros_node, argparse.Namespace(config_path=str(config_path), shard_count=1, shard_index=0),
+                                  clock=clock)
+    published = list()
+    tracker.update_pub.listeners.append(lambda msg: published.append((msg.topic_name, ActivityStatus(msg.activity_status))))
+    for i in range(len(modes)):
+        SyntheticPublisher(ros_node, "/topic_%d" % i, MSG_TYPE_NAME, rate, seed=i).start(clock() + i * 0.001)
+    ros_node.run_until(clock() + duration)
+    return tracker, ros_node, published
+
+def budget_warnings(ros_node):
+    return [warning for warning in ros_node.get_logger().warnings if "MAX_CONCURRENT_SUBSCRIPTIONS" in warning]
+
+def test_queued_duty_cycle_topics_do_not_go_stale(tmp_path):
+    # 60 topics take turns on 3 subscriptions, a 2 s window each, so each waits ~40 s for its turn,
+    # much longer than the windows and RECONNECT_WAIT_TIME alone would keep a status valid for
+    tracker, _, published = run(tmp_path, ["duty_cycle"] * 60, 3, 150.0, rate=5.0)
+    assert(not [name for name, status in published if status == ActivityStatus.STALE])
+    assert(all(tracker.topics["/topic_%d" % i].activity_status == ActivityStatus.ACTIVE for i in range(60)))
+
+def test_continuous_monitors_leave_a_slot_for_duty_cycle(tmp_path):
+    modes = ["continuous"] * 4 + ["duty_cycle"] * 2
+    tracker, ros_node, _ = run(tmp_path, modes, 3, 30.0)
+    statuses = [tracker.topics["/topic_%d" % i].activity_status for i in range(len(modes))]
+    # Two continuous monitors hold their slots, the duty cycle monitors share the third
+    assert(statuses[4:] == [ActivityStatus.ACTIVE] * 2)
+    assert(statuses[:4].count(ActivityStatus.ACTIVE) == 2)
+    assert(len(budget_warnings(ros_node)) == 1)
+
+def test_continuous_monitors_use_every_slot_without_duty_cycle(tmp_path):
+    tracker, ros_node, _ = run(tmp_path, ["continuous"] * 4, 3, 10.0)
+    statuses = [tracker.topics["/topic_%d" % i].activity_status for i in range(4)]
+    assert(statuses.count(ActivityStatus.ACTIVE) == 3)
+    assert(not budget_warnings(ros_node))
@@ -0,0 +1,130 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import argparse
+
+import numpy as np
+import pytest
+
+from topic_activity_monitor.benchmark.fake_node import FakeClock, FakeNode
+from topic_activity_monitor.lib.status_replay import replay_continuous, replay_duty_cycle, time_in_status
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus
+from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+
+START = 1000.0
+WINDOW_SIZE = 10
+DEADLINE = 0.25
+TIMEOUT = 1.0
+RECONNECT_WAIT_TIME = 1.0
+
+CONFIG = """
+[/replayed]
+TYPE: std_msgs/msg/String
+WINDOW_SIZE: %d
+RECONNECT_WAIT_TIME: %s
+DEADLINE: %s
+TIMEOUT: %s
+MODE: %%s
+
+[SETTINGS]
+BLACKLIST: ["/topic_status"]
+SAMPLING_JITTER: 0
+TIMER_RESOLUTION: %%s
+""" % (WINDOW_SIZE, RECONNECT_WAIT_TIME, DEADLINE, TIMEOUT)
+
+def random_timestamps():
+    """ ~12 Hz with a slow patch, a gap longer than TIMEOUT and a stretch at a third of the rate """
+    intervals = np.random.default_rng(3).exponential(0.08, 3000)
+    intervals[500:510] = 0.3
+    intervals[1200] = 2.5
+    intervals[2000:2100] *= 3
+    return START + 0.5 + np.cumsum(intervals)
+
+def periodic_timestamps():
+    """ 10 Hz, silent for a second, 10 Hz again, then 3.3 Hz. Off the tick grid, a message exactly
+    on a tick arrives before or after the wheel's deadlines of that tick depending on the executor
+    """
+    return START + 0.0537 + np.concatenate((np.arange(190) * 0.1, 20.0 + np.arange(100) * 0.1, 31.0 + np.arange(300) * 0.3))
+
+def live_transitions(tmp_path, timestamps, end, mode, resolution):
+    """ returns [(time, status value)] of the transitions a NetworkStateTracker on a FakeNode publishes """
+    config_path = tmp_path / "replay.ini"
+    config_path.write_text(CONFIG % (mode, resolution))
+    clock = FakeClock(START)
+    ros_node = FakeNode(clock)
+    ros_node.add_node("publisher")
+    ros_node.add_publisher(("publisher", "/"), "/replayed", "std_msgs/msg/String")
+    tracker = NetworkStateTracker(ros_node, argparse.Namespace(config_path=str(config_path), shard_count=1, shard_index=0),
+                                  clock=clock)
+    # The replay requests the first window at start, the monitor staggered it
+    tracker.sampling_scheduler.request(tracker.activity_monitors["/replayed"])
+
+    transitions = list()
+
+    def record(msg):
+        if msg.topic_name == "/replayed" and msg.activity_status > 0 and \
+                (not transitions or not transitions[-1][1] == msg.activity_status):
+            transitions.append((clock(), msg.activity_status))
+    ros_node.publishers_by_topic["/topic_status/updates"].listeners.append(record)
+
+    for stamp in timestamps:
+        ros_node.schedule(stamp, ros_node.deliver, "/replayed", b"\x00" * 16)
+    ros_node.run_until(end)
+    return transitions
+
+def replayed_transitions(timestamps, end, mode, resolution):
+    if mode == "continuous":
+        times, statuses = replay_continuous(timestamps, START, end, WINDOW_SIZE, DEADLINE, TIMEOUT, resolution)
+    else:
+        times, statuses = replay_duty_cycle(timestamps, START, end, WINDOW_SIZE, DEADLINE, TIMEOUT,
+                                            RECONNECT_WAIT_TIME, resolution)
+    return list(zip(times.tolist(), statuses.tolist()))
+
+@pytest.mark.parametrize("mode", ["continuous", "duty_cycle"])
+@pytest.mark.parametrize("resolution", [0.01, 0.001])
+@pytest.mark.parametrize("make_timestamps", [random_timestamps, periodic_timestamps])
+def test_replay_matches_live(tmp_path, mode, resolution, make_timestamps):
+    timestamps = make_timestamps()
+    end = timestamps[-1] + 2.5
+    live = live_transitions(tmp_path, timestamps, end, mode, resolution)
+    replayed = replayed_transitions(timestamps, end, mode, resolution)
+
+    assert([status for _, status in replayed] == [status for _, status in live])
+    for (replayed_time, _), (live_time, _) in zip(replayed, live):
+        assert(replayed_time == pytest.approx(live_time, abs=1e-6))
+
+def test_replay_waits_for_the_grant():
+    # Granted by the first SamplingScheduler update at START + 0.05, so the message at START + 0.01 is
+    # not heard and the first window ends with the tenth message after the grant
+    timestamps = START + 0.01 + np.arange(40) * 0.05
+    times, statuses = replay_continuous(timestamps, START, START + 2.0, WINDOW_SIZE, DEADLINE, TIMEOUT)
+    assert(times[0] == pytest.approx(timestamps[10]))
+    assert(statuses[0] == ActivityStatus.ACTIVE.value)
+
+def test_replay_timeout_rounds_up_to_a_tick():
+    # Silent after START + 0.1246, the watchdog fires on the first 0.01 s tick at or after TIMEOUT
+    timestamps = START + 0.06 + np.arange(20) * 0.0034
+    times, statuses = replay_continuous(timestamps, START, START + 5.0, WINDOW_SIZE, DEADLINE, TIMEOUT, resolution=0.01)
+    assert(statuses[-1] == ActivityStatus.TIMEOUT.value)
+    assert(times[-1] == pytest.approx(START + 1.13))
+
+def test_time_in_status():
+    times = np.array([START + 1.0, START + 3.0])
+    statuses = np.array([ActivityStatus.ACTIVE.value, ActivityStatus.TIMEOUT.value])
+    seconds = time_in_status(times, statuses, START, START + 10.0)
+    assert(seconds[ActivityStatus.UNDEFINED.value] == pytest.approx(1.0))
+    assert(seconds[ActivityStatus.ACTIVE.value] == pytest.approx(2.0))
+    assert(seconds[ActivityStatus.TIMEOUT.value] == pytest.approx(7.0))
+
+def test_time_in_status_outside_the_transitions():
+    times = np.array([START + 1.0, START + 3.0])
+    statuses = np.array([ActivityStatus.ACTIVE.value, ActivityStatus.TIMEOUT.value])
+    # A window that ends before the first transition is all UNDEFINED
+    seconds = time_in_status(times, statuses, START - 5.0, START)
+    assert(seconds[ActivityStatus.UNDEFINED.value] == pytest.approx(5.0))
+    assert(seconds.sum() == pytest.approx(5.0))
+    # One that starts after it has no UNDEFINED time
+    seconds = time_in_status(times, statuses, START + 2.0, START + 4.0)
+    assert(seconds[ActivityStatus.UNDEFINED.value] == pytest.approx(0.0))
+    assert(seconds[ActivityStatus.ACTIVE.value] == pytest.approx(1.0))
+    assert(seconds[ActivityStatus.TIMEOUT.value] == pytest.approx(1.0))
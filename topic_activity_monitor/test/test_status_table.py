@@ -0,0 +1,74 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import numpy as np
+
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, ConnectionStatus, StatusTable, TopicStatusData
+
+def make_table(topic_count=100):
+    table = StatusTable(capacity=4, domain_id=7)
+    topics = [TopicStatusData("/topic_%d" % i, "std_msgs/msg/String", table=table) for i in range(topic_count)]
+    return table, topics
+
+def test_rows_grow_and_views_follow():
+    table, topics = make_table()
+    assert(len(table) == 100)
+    topics[3].activity_status = ActivityStatus.SLOW
+    # The views write through to the (reallocated) columns
+    assert(table.activity_status[3] == ActivityStatus.SLOW.value)
+    assert(table.ids["/topic_99"] == 99 and topics[99].topic_name == "/topic_99")
+
+def test_to_msg_reuses_the_row_message():
+    table, topics = make_table()
+    topics[0].activity_status = ActivityStatus.ACTIVE
+    msg = table.to_msg(0)
+    assert(msg.activity_status == ActivityStatus.ACTIVE.value and msg.domain_id == 7)
+    topics[0].activity_status = ActivityStatus.TIMEOUT
+    assert(table.to_msg(0) is msg and msg.activity_status == ActivityStatus.TIMEOUT.value)
+
+def test_snapshot_messages_are_independent_of_the_table():
+    table, topics = make_table()
+    topics[1].connection_status = ConnectionStatus.PRESENT
+    topics[1].activity_status = ActivityStatus.ACTIVE
+    snapshot = table.snapshot([1, 2])
+    # Changes after the snapshot, and to_msg() of the same rows, don't reach its messages
+    topics[1].activity_status = ActivityStatus.TIMEOUT
+    table.to_msg(1)
+    msgs = table.to_msgs(snapshot)
+    assert([msg.topic_name for msg in msgs] == ["/topic_1", "/topic_2"])
+    assert(msgs[0].activity_status == ActivityStatus.ACTIVE.value)
+    assert(msgs[0].connection_status == ConnectionStatus.PRESENT.value)
+    assert(msgs[0] is not table.to_msg(1) and msgs[0].domain_id == 7)
+    assert(table.to_msgs(table.snapshot([1]))[0] is not table.to_msgs(table.snapshot([1]))[0])
+
+def test_set_column_returns_the_rows_that_changed():
+    table, _ = make_table(10)
+    table.updated[:] = False
+    changed = table.set_column("connection_status", [0, 1, 2], [ConnectionStatus.PRESENT.value] * 3)
+    assert(changed.tolist() == [0, 1, 2])
+    changed = table.set_column("connection_status", [1, 2, 3], [ConnectionStatus.PRESENT.value, ConnectionStatus.MISSING.value,
+                                                                ConnectionStatus.UNDEFINED.value])
+    assert(changed.tolist() == [2])
+    assert(np.flatnonzero(table.updated).tolist() == [0, 1, 2])
+
+def test_expired_skips_stale_unowned_and_unbounded_rows():
+    table, topics = make_table(5)
+    for topic_status_data in topics:
+        topic_status_data.timestamp = 1000.0
+        topic_status_data.valid_duration = 2.0
+    topics[1].valid_duration = 0.0  # Never expires
+    topics[2].valid_duration = 10.0
+    topics[3].activity_status = ActivityStatus.STALE
+    table.owned[4] = False
+    assert(table.expired(1001.0).tolist() == list())
+    assert(table.expired(1002.0).tolist() == [0])
+    assert(table.expired(1010.0).tolist() == [0, 2])
+
+def test_largest():
+    table, topics = make_table(20)
+    for i, topic_status_data in enumerate(topics):
+        topic_status_data.activity_bandwidth = float((i * 7) % 20)  # 0 for topic 0, not measured
+    table.owned[table.activity_bandwidth.argmax()] = False
+    expected = sorted(range(1, 20), key=lambda i: -((i * 7) % 20))[1:]
+    assert(table.largest("activity_bandwidth", 3).tolist() == expected[:3])
+    assert(table.largest("activity_bandwidth", 100).tolist() == expected)
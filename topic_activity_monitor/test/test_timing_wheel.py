@@ -0,0 +1,80 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import pytest
+
+from topic_activity_monitor.benchmark.fake_node import FakeClock
+from topic_activity_monitor.lib.timing_wheel import TimingWheel
+
+RESOLUTION = 0.01
+
+def make_wheel(slot_count=8):
+    clock = FakeClock(0.0)
+    return TimingWheel(resolution=RESOLUTION, slot_count=slot_count, clock=clock), clock
+
+def run(wheel, clock, until):
+    """ advances the wheel every tick until until, on time """
+    tick = int(round(clock() / RESOLUTION))
+    while clock() < until - 1e-9:
+        tick += 1
+        clock.now = tick * RESOLUTION
+        wheel.advance()
+
+def test_deadlines_round_up_to_a_tick():
+    wheel, clock = make_wheel()
+    fired = list()
+    wheel.schedule(0.025, lambda: fired.append(clock()))
+    wheel.schedule(0.04, lambda: fired.append(clock()))
+    run(wheel, clock, 0.1)
+    assert(fired == [pytest.approx(0.03), pytest.approx(0.04)])
+
+def test_deadlines_beyond_a_revolution_wait_for_their_tick():
+    wheel, clock = make_wheel(slot_count=8)
+    fired = list()
+    wheel.schedule(0.5, lambda: fired.append(clock()))
+    run(wheel, clock, 0.49)
+    assert(fired == [] and len(wheel) == 1)
+    run(wheel, clock, 0.6)
+    assert(fired == [pytest.approx(0.5)] and len(wheel) == 0)
+
+def test_deadlines_of_a_tick_fire_in_the_order_scheduled():
+    wheel, clock = make_wheel()
+    fired = list()
+    for i in range(20):
+        wheel.schedule(0.05, lambda i=i: fired.append(i))
+    run(wheel, clock, 0.1)
+    assert(fired == list(range(20)))
+
+def test_cancel():
+    wheel, clock = make_wheel()
+    fired = list()
+    first = wheel.schedule(0.05, lambda: fired.append("first"))
+    # Canceled by an earlier callback of the same tick
+    wheel.schedule(0.05, lambda: wheel.cancel(second))
+    second = wheel.schedule(0.05, lambda: fired.append("second"))
+    run(wheel, clock, 0.1)
+    wheel.cancel(first)  # Already fired, does nothing
+    assert(fired == ["first"] and len(wheel) == 0)
+
+def test_late_advance_fires_every_missed_tick_in_order():
+    wheel, clock = make_wheel(slot_count=8)
+    fired = list()
+    for delay in [0.3, 0.02, 0.15]:
+        wheel.schedule(delay, lambda delay=delay: fired.append(delay))
+    clock.now = 1.0
+    wheel.advance()
+    assert(fired == [0.02, 0.15, 0.3])
+
+def test_schedule_after_does_not_drift():
+    wheel, clock = make_wheel()
+    due = list()
+
+    def periodic():
+        due.append(timers[-1].tick)
+        timers.append(wheel.schedule_after(timers[-1], 0.1, periodic))
+    timers = [wheel.schedule(0.1, periodic)]
+    # advance() runs 0.035 s late every time, each deadline still counts from the one before
+    for i in range(1, 11):
+        clock.now = i * 0.1 + 0.035
+        wheel.advance()
+    assert(due == [10 * i for i in range(1, 11)])
@@ -0,0 +1,31 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor.lib.topic_filter import TopicFilter
+
+def test_matches_like_re_match():
+    topic_filter = TopicFilter(["/rosout", "/parameter_events", r".*/image_raw$"])
+    assert(len(topic_filter) == 3)
+    assert(topic_filter.match("/rosout"))
+    assert(topic_filter.match("/rosout_agg"))  # Anchored at the start only, like re.match()
+    assert(topic_filter.match("/camera/image_raw"))
+    assert(not topic_filter.match("/camera/image_raw/compressed"))
+    assert(not topic_filter.match("/chatter"))
+
+def test_empty_filter_matches_nothing():
+    assert(not TopicFilter().match("/chatter"))
+
+def test_changing_patterns_clears_cached_verdicts():
+    topic_filter = TopicFilter(["/rosout"])
+    assert(not topic_filter.match("/chatter"))
+    topic_filter.extend(["/chat"])
+    assert(topic_filter.match("/chatter"))
+    topic_filter.set_patterns(list())
+    assert(not topic_filter.match("/chatter") and topic_filter.patterns == list())
+
+def test_patterns_with_global_flags():
+    # Can't be combined into one alternation, each is compiled on its own
+    topic_filter = TopicFilter(["(?i)/CAMERA", "/rosout"])
+    assert(topic_filter.match("/camera/image_raw"))
+    assert(topic_filter.match("/rosout"))
+    assert(not topic_filter.match("/chatter"))
@@ -1,81 +1,216 @@
 # Author: Dan Brooks [db] ros2@danbrooks.net
 # Date: 2023-09-08
 # License Apache 2
-import time
-
-import numpy as np
+from enum import Enum
 from threading import Thread, RLock
 
 import rclpy
-from rosidl_runtime_py.utilities import get_message
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
+
+try:
+    from rclpy.event_handler import SubscriptionEventCallbacks
+except ImportError:
+    # Before Iron
+    from rclpy.qos_event import SubscriptionEventCallbacks
 
 from topic_activity_monitor.lib.better_timer import BetterTimer
-from topic_activity_monitor.lib.buffer import Buffer
+from topic_activity_monitor.lib.header_stamp import has_header, stamp_from_cdr, stamp_from_msg
+from topic_activity_monitor.lib.message_types import get_message_type, MESSAGE_TYPE_ERRORS
+from topic_activity_monitor.lib.print_logger import DEBUG
+from topic_activity_monitor.lib.publisher_stats import PublisherStats, MESSAGE_INFO_SUPPORTED
+from topic_activity_monitor.lib.qos_selector import select_qos
+from topic_activity_monitor.lib.rate_estimator import RateEstimator
+from topic_activity_monitor.lib.ring_buffer import RingBuffer
 from topic_activity_monitor.lib.topic_status_data import ActivityStatus
 
+class MonitorMode(Enum):
+    DUTY_CYCLE = "duty_cycle"  # Subscribe until WINDOW_SIZE messages are received, then disconnect for RECONNECT_WAIT_TIME
+    CONTINUOUS = "continuous"  # Stay subscribed, evaluate a sliding window of intervals
+
 class ActivityMonitor(object):
     def __init__(self, network_state_tracker, config):
         self.ros_node = network_state_tracker.ros_node
         self.logger = self.ros_node.get_logger()
         self.network_state_tracker = network_state_tracker
+        self._clock = network_state_tracker.clock
 
         self._topic_name = config["TOPIC_NAME"]
-        # The following memebers are made available via TopicStatusData
-        # self.topic_name
-        # self.msg_type_name
-        # self.timestamp
-        # self.valid_duration
-        # self.activity_deadline
-        # self.activity_slow_count
-        # self.activity_timeout
-        # self.activity_timeout_count
-        
-        # Get class type for topic
-        self._msg_type = get_message(self.msg_type_name)
+        # TopicStatusData for the topic, this is where the activity status is kept
+        self.status = network_state_tracker.topics[self._topic_name]
+
+        # Class type for topic, imported on first subscription so startup doesn't wait for it
+        self._msg_type = None
+
+        # Hands out subscriptions within the global budget
+        self._scheduler = network_state_tracker.sampling_scheduler
 
         # ActivityMonitoring Settings
+        self._mode = config["MODE"]
         self._window_size = config["WINDOW_SIZE"]
         self._reconnect_wait_time = config["RECONNECT_WAIT_TIME"]
+        # Raw subscriptions hand us the serialized bytes, so rclpy never builds the Python message
+        self._raw = config["RAW"]
+        # Subscription QoS, re-selected from the publishers' QoS when they change
+        self._reliability = config["RELIABILITY"]
+        self._qos_depth = config["QOS_DEPTH"]
+        self._qos_profile = None
+        self._qos_blocked = False      # Every publisher is incompatible with the selected QoS
+        self._event_callbacks = SubscriptionEventCallbacks(incompatible_qos=self._qos_incompatible_callback)
+        # Interval statistics per publisher, from the MessageInfo of each message
+        self._publisher_stats = None
+        if config["PUBLISHER_STATS"] and MESSAGE_INFO_SUPPORTED:
+            self._publisher_stats = PublisherStats()
+
+        # Latency (arrival time - header.stamp) of the window's messages, only kept when MAX_LATENCY is set
+        self._max_latency = config["MAX_LATENCY"]
+        self._latency_buffer = None
+        if self._max_latency > 0:
+            self._latency_buffer = RingBuffer(config["WINDOW_SIZE"])
+        self._read_stamp = None        # stamp_from_cdr() or stamp_from_msg(), picked once the message type is loaded
+
+        # Serialized size of the window's messages, for the bandwidth. Only raw subscriptions see it,
+        # getting it from a deserialized message would mean serializing it again
+        self._max_bandwidth = config["MAX_BANDWIDTH"]
+        self._size_buffer = None
+        if self._raw:
+            self._size_buffer = RingBuffer(config["WINDOW_SIZE"])
+        elif self._max_bandwidth > 0:
+            self.logger.warn("Not monitoring bandwidth of %s, MAX_BANDWIDTH needs RAW subscriptions" % self._topic_name)
+            self._max_bandwidth = 0.0
+            with network_state_tracker.topics_lock:
+                self.status.activity_max_bandwidth = 0.0
+
+        # Auto monitors learn DEADLINE and TIMEOUT from the topic instead of reading them from the config
+        self._estimator = None
+        self._learn_windows = config.get("LEARN_WINDOWS", 0)
+        if self._learn_windows > 0:
+            assert(self._mode == MonitorMode.DUTY_CYCLE), "%s: only duty_cycle monitors can learn deadlines" % self._topic_name
+            self._estimator = RateEstimator()
+            self._min_timeout = config["TIMEOUT"]
+            self._timeout_factor = config["TIMEOUT_FACTOR"]
 
 
         # Connection
         self._subscription = None      # Connection to the ROS Topic
-        self._reconnect_timer = None   # Reconnection Timer
         self._running = False
         self._lock = RLock()           # Lock
-        self._watchdog = BetterTimer(self.ros_node, self.activity_timeout, self._timeout_callback)
+        # Callbacks of one monitor never run concurrently, but different monitors can run in parallel
+        self._callback_group = MutuallyExclusiveCallbackGroup()
+        self._watchdog = BetterTimer(network_state_tracker.timing_wheel, self.status.activity_timeout, self._timeout_callback)
+
+        # Intervals between messages. WINDOW_SIZE messages give WINDOW_SIZE - 1 intervals
+        self.interval_buffer = RingBuffer(config["WINDOW_SIZE"] - 1)
+        self._last_stamp = None        # Arrival time of the previous message
+        self._window_count = 0         # (continuous) intervals received since the last report
+        self._window_late = False      # (continuous) a late interval was received since the last report
+        self._window_counted = False   # (continuous) activity_slow_count already incremented for this window
+        self._window_start = None      # Time the subscription was granted
+        self._window_bytes = 0         # Bytes received since the subscription was granted (raw only)
+        self._changed = True           # The last window changed activity_status (or there was none yet)
+
+        self.logger.info("Adding monitor for %s" % self._topic_name)
 
-        # Time Stamp Data Buffer
-        self.timestamp_buffer = Buffer(config["WINDOW_SIZE"])
- 
-        self.logger.info("Adding monitor for %s" % self.topic_name)
+    def start_monitor(self):
+        self._running = True
+        if self._mode == MonitorMode.CONTINUOUS:
+            self._scheduler.request(self)
+        else:
+            # Monitors are started together, spread their windows out
+            self._scheduler.request_staggered(self, self._reconnect_wait_time)
 
-    def __getattribute__(self, value_name):
-        """ get certain attributes from the TopicStatusData """
-        if value_name in ["topic_name", "msg_type_name", "timestamp", "valid_duration", "activity_status",
-                        "activity_deadline", "activity_slow_count", "activity_timeout", "activity_timeout_count"]:
-            return getattr(self.network_state_tracker.topics[self._topic_name], value_name)
-        return super().__getattribute__(value_name)
+    def stop_monitor(self):
+        with self._lock:
+            self._running = False
+            self._scheduler.remove(self)
+            if self._subscribed():
+                self._unsubscribe()
+            self._watchdog.cancel()
 
-    def __setattr__(self, name, value):
-        if name in ["topic_name", "msg_type_name", "timestamp", "valid_duration", "activity_status",
-                        "activity_deadline", "activity_slow_count", "activity_timeout", "activity_timeout_count"]:
-            return self.network_state_tracker.topics[self._topic_name].__setattr__(name, value)
-        return super().__setattr__(name, value)
+    def urgent(self):
+        """ returns True if this monitor should be sampled ahead of others, called by SamplingScheduler """
+        return self._changed
 
+    def continuous(self):
+        """ returns True if this monitor keeps its subscription once granted, called by SamplingScheduler """
+        return self._mode == MonitorMode.CONTINUOUS
 
+    def grant(self):
+        """ subscribes, called by SamplingScheduler when there is budget for it
+        returns False if the monitor was stopped in the meantime or can't subscribe
+        """
+        with self._lock:
+            if not self._running:
+                return False
+            if self._msg_type is None and not self._load_msg_type():
+                return False
+            if self._qos_profile is None:
+                self._select_qos()
+            if self._qos_blocked:
+                # Nothing to hear, check again later
+                self._report_qos_incompatible()
+                self._scheduler.request(self, max(self._reconnect_wait_time, self.status.activity_timeout))
+                return False
+            self._window_start = self._clock()
+            self._window_bytes = 0
+            return self._subscribe()
+
+    def _load_msg_type(self):
+        """ returns False, and stops monitoring, if the topic's message type can't be imported.
+        Also picks how header.stamp is read when latency is monitored
+        """
+        try:
+            self._msg_type = get_message_type(self.status.msg_type_name)
+        except MESSAGE_TYPE_ERRORS as e:
+            self.logger.warn("Not monitoring %s, can't load message type %s: %s" % (self._topic_name, self.status.msg_type_name, e))
+            self._running = False
+            with self.network_state_tracker.topics_lock:
+                self.status.activity_status = ActivityStatus.NOT_MONITORED
+                self._publish_update()
+            return False
 
-    def start_monitor(self):
-        self._running = True
-        self._subscribe()
+        if self._latency_buffer is not None:
+            if has_header(self._msg_type):
+                # Raw messages are read in place, header.stamp is at a fixed offset of the serialized bytes
+                self._read_stamp = stamp_from_cdr if self._raw else stamp_from_msg
+            else:
+                self.logger.warn("Not monitoring latency of %s, %s doesn't start with a std_msgs/Header" %
+                                 (self._topic_name, self.status.msg_type_name))
+                self._latency_buffer = None
+                with self.network_state_tracker.topics_lock:
+                    self.status.activity_max_latency = 0.0
+        return True
+
+    def publishers_changed(self):
+        """ re-selects the subscription QoS, and resubscribes if it changed.
+        Called by ConnectionMonitor when the topic's publishers change, without topics_lock held
+        """
+        with self._lock:
+            if not self._running:
+                return
+            previous = (self._qos_profile, self._qos_blocked)
+            self._select_qos()
+            if self._subscribed() and not previous == (self._qos_profile, self._qos_blocked):
+                self.logger.info("%s: publishers changed, resubscribing" % self._topic_name)
+                self._unsubscribe()
+                self._scheduler.release(self)
+                self._scheduler.request(self)
 
-    def stop_monitor(self):
-        if self._subscribed():
-            self._running = False
-            if not self._reconnect_timer is None:
-                self._reconnect_timer.cancel()
-                self._reconnect_timer = None
-            self._unsubscribe()
+    def _select_qos(self):
+        """ picks the cheapest QoS compatible with the topic's current publishers """
+        publisher_infos = self.ros_node.get_publishers_info_by_topic(self._topic_name)
+        self._qos_profile, incompatible = select_qos(publisher_infos, self._reliability, self._qos_depth)
+        self._qos_blocked = len(publisher_infos) > 0 and incompatible == len(publisher_infos)
+
+    def _report_qos_incompatible(self):
+        with self.network_state_tracker.topics_lock:
+            self.status.activity_status = ActivityStatus.QOS_INCOMPATIBLE
+            self._publish_update()
+
+    def _release(self):
+        """ unsubscribe and return the subscription to the SamplingScheduler, then request the next window """
+        self._unsubscribe()
+        self._scheduler.release(self, self._window_bytes, self._clock() - self._window_start)
+        self._scheduler.request(self, self._reconnect_wait_time)
 
 
     def _subscribe(self):
@@ -84,27 +219,38 @@ class ActivityMonitor(object):
             if not self._running:
                 return
             if not self._subscription is None:
-                self.logger.warn("_connect(): restart subscription %s failed. Already running" % self.topic_name)
+                self.logger.warn("_connect(): restart subscription %s failed. Already running" % self._topic_name)
                 return False
 
-            self._subscription = self.ros_node.create_subscription(self._msg_type, self.topic_name, self._topic_callback, self._window_size)
+            if self._publisher_stats is None:
+                topic_callback = self.network_state_tracker.instrument("topic_callback", self._topic_callback)
+            else:
+                topic_callback = self.network_state_tracker.instrument("topic_callback", self._topic_info_callback)
+            # Before subscribing, so the graph event it causes can't arrive first
+            self.network_state_tracker.own_graph_change()
+            self._subscription = self.ros_node.create_subscription(self._msg_type, self._topic_name, topic_callback, self._qos_profile,
+                                                                   callback_group=self._callback_group, raw=self._raw,
+                                                                   event_callbacks=self._event_callbacks)
             self._watchdog.start()
+            self.network_state_tracker.count("subscriptions_created")
             return True
 
     def _unsubscribe(self):
         """ unsubscribe from topic """
         with self._lock:
             if self._subscription is None:
-                self.logger.warn("Attempting to unsubscribe from %s without a subscription" % self.topic_name)
+                self.logger.warn("Attempting to unsubscribe from %s without a subscription" % self._topic_name)
                 return False
 
+            self.network_state_tracker.own_graph_change()
             success = self.ros_node.destroy_subscription(self._subscription)
             self._watchdog.cancel()
-            self.timestamp_buffer.clear()
+            self._clear_window()
             if not success:
-                self.logger.warn("Failed to unsubscribe from %s" % self.topic_name)
+                self.logger.warn("Failed to unsubscribe from %s" % self._topic_name)
             else:
                 self._subscription = None
+                self.network_state_tracker.count("subscriptions_destroyed")
             return success
 
     def _subscribed(self):
@@ -112,67 +258,239 @@ class ActivityMonitor(object):
             return True
         return False
 
-    def _topic_callback(self, msg):
-        """ ROS subscription callback """
+    def _clear_window(self):
+        self.interval_buffer.clear()
+        self._last_stamp = None
+        self._window_count = 0
+        self._window_late = False
+        self._window_counted = False
+        if self._latency_buffer is not None:
+            self._latency_buffer.clear()
+        if self._size_buffer is not None:
+            self._size_buffer.clear()
+        if self._publisher_stats is not None:
+            self._publisher_stats.disconnect()
+
+    def _topic_info_callback(self, msg, msg_info):
+        """ ROS subscription callback that is also passed the MessageInfo, used with per publisher statistics """
+        self._topic_callback(msg, msg_info)
+
+    def _topic_callback(self, msg, msg_info=None):
+        """ ROS subscription callback
+        msg is the serialized message (bytes) when subscribed in raw mode. Only the arrival time is used,
+        the size of msg when raw, and the timestamps and sequence number in msg_info when it is given.
+        """
         # Reasons for ignoring messages
         # - We might still have messages in the queue after unsubscribing.
         # - We are not running
-        # - timestamp buffer is already full. We don't need anymore data.
-        if self._subscription is None or not self._running or self.timestamp_buffer.full():
+        # - interval buffer is already full in duty cycle mode. We don't need anymore data.
+        if self._subscription is None or not self._running:
+            return
+        if self._mode == MonitorMode.DUTY_CYCLE and self.interval_buffer.full():
             return
+        stamp = self._clock()
 
         with self._lock:
-            assert(self._subscription is not None)
-
-            # Add timestamp to buffer
-            self.timestamp_buffer.push(time.time())
-
-            # Cancel watchdog
-            self._watchdog.cancel()
-
-            # When the buffer is full, compute report, disconnect, and wait to reconnect
-            if self.timestamp_buffer.full():
-                intervals = np.diff(np.array(self.timestamp_buffer))
-                self.logger.info("%s: %s" % (self._topic_name, intervals))
-
-                # Compute time between messages
-                if np.all(np.less(intervals, self.activity_deadline)):
-                    # All the messages arrived on time
-                    self.activity_status = ActivityStatus.ACTIVE
-                else:
-                    # Some of the messages were received after the stated deadline
-                    self.activity_status = ActivityStatus.SLOW
-                    self.activity_slow_count += 1
-
-                # Empty the timestamp buffer
-                self.timestamp_buffer.clear()
-
-                # Discnonnect from topic and set a timer for when to reconnect
-                self._unsubscribe()
-                assert(self._reconnect_timer is None)
-                self._reconnect_timer = self.ros_node.create_timer(self._reconnect_wait_time, self._reconnect_timer_callback)
-
-                # Broadcast the current activity status
-                self._publish_update()
+            # The checks above are repeated now that we hold the lock, the timeout callback or
+            # publishers_changed() may have unsubscribed (or completed the window) in the meantime
+            if self._subscription is None or not self._running:
+                return
+            if self._mode == MonitorMode.DUTY_CYCLE and self.interval_buffer.full():
+                return
+            if self._size_buffer is not None:
+                size = len(msg)
+                self._window_bytes += size
+                self._size_buffer.push(size)
+            if msg_info is not None:
+                self._publisher_stats.add(msg_info, stamp)
+            if self._latency_buffer is not None:
+                self._latency_buffer.push(stamp - self._read_stamp(msg))
+
+            # Restart the watchdog, TIMEOUT is the longest we will wait for the first message and between
+            # any two messages after it (a publisher stopping half way through a duty cycle window times out too)
+            self._watchdog.reset()
+
+            # The first message only provides a reference time
+            last_stamp = self._last_stamp
+            self._last_stamp = stamp
+            if last_stamp is None:
+                return
+            interval = stamp - last_stamp
+            self.interval_buffer.push(interval)
+
+            if self._mode == MonitorMode.CONTINUOUS:
+                self._continuous_update(interval)
+            elif self.interval_buffer.full():
+                self._duty_cycle_update()
+
+    def _duty_cycle_update(self):
+        """ When the buffer is full, compute report, disconnect, and wait to reconnect """
+        self._log_window()
+
+        with self.network_state_tracker.topics_lock:
+            previous_status = self.status.activity_status
+            # Compute time between messages
+            if self._learn_windows > 0:
+                # Still learning the rate, there is nothing to judge the window against yet
+                self._learn_windows -= 1
+                self._learn()
+            elif self.interval_buffer.max() < self.status.activity_deadline:
+                # All the messages arrived on time
+                self.status.activity_status = ActivityStatus.ACTIVE
+                if self._estimator is not None:
+                    self._learn()
+            else:
+                # Some of the messages were received after the stated deadline
+                self.status.activity_status = ActivityStatus.SLOW
+                self.status.activity_slow_count += 1
+            self._check_latency()
+            self._check_bandwidth()
+
+            self._changed = not self.status.activity_status == previous_status
+            self._report_publishers()
+
+            # Disconnect from topic until the scheduler grants the next window
+            self._release()
+
+            # Broadcast the current activity status
+            self._publish_update()
+
+    def _continuous_update(self, interval):
+        """ Reports once every window of intervals, or immediately when a late message breaks an ACTIVE streak """
+        self._window_count += 1
+        if not interval < self.status.activity_deadline:
+            self._window_late = True
+            with self.network_state_tracker.topics_lock:
+                if not self.status.activity_status == ActivityStatus.SLOW:
+                    self.status.activity_status = ActivityStatus.SLOW
+                    self.status.activity_slow_count += 1
+                    self._window_counted = True
+                    self._publish_update()
+
+        if self._window_count < self.interval_buffer.max_size:
+            return
 
-    def _reconnect_timer_callback(self):
-        with self._lock:
-            self._reconnect_timer.cancel()
-            self._reconnect_timer = None
-            self._subscribe()
+        self._log_window()
+        with self.network_state_tracker.topics_lock:
+            if self._window_late:
+                self.status.activity_status = ActivityStatus.SLOW
+                if not self._window_counted:
+                    self.status.activity_slow_count += 1
+            else:
+                self.status.activity_status = ActivityStatus.ACTIVE
+            self._check_latency()
+            self._check_bandwidth()
+            self._publish_update()
+        self._report_publishers()
+        self._window_count = 0
+        self._window_late = False
+        self._window_counted = False
+
+    def _check_latency(self):
+        """ Records the window's latency percentiles, and reports LATE instead of ACTIVE when the 95th
+        percentile is over MAX_LATENCY. Caller must hold network_state_tracker.topics_lock
+        """
+        if self._latency_buffer is None or len(self._latency_buffer) == 0:
+            return
+        latency_p95 = self._latency_buffer.percentile(95)
+        self.status.activity_latency_p50 = self._latency_buffer.percentile(50)
+        self.status.activity_latency_p95 = latency_p95
+        if self.status.activity_status == ActivityStatus.ACTIVE and latency_p95 > self._max_latency:
+            self.status.activity_status = ActivityStatus.LATE
+            self.status.activity_late_count += 1
+
+    def _check_bandwidth(self):
+        """ Records the window's message sizes and bandwidth (mean size over mean interval, the rate the
+        publishers send at whether or not we stay subscribed), and reports BANDWIDTH_EXCEEDED instead of ACTIVE
+        when it is over MAX_BANDWIDTH. Caller must hold network_state_tracker.topics_lock
+        """
+        if self._size_buffer is None or len(self._size_buffer) == 0:
+            return
+        size_mean = self._size_buffer.mean()
+        interval_mean = self.interval_buffer.mean()
+        bandwidth = size_mean / interval_mean if interval_mean > 0 else 0.0
+        self.status.activity_msg_size_mean = size_mean
+        self.status.activity_msg_size_p95 = self._size_buffer.percentile(95)
+        self.status.activity_msg_size_max = self._size_buffer.max()
+        self.status.activity_bandwidth = bandwidth
+        if self._max_bandwidth > 0 and self.status.activity_status == ActivityStatus.ACTIVE and bandwidth > self._max_bandwidth:
+            self.status.activity_status = ActivityStatus.BANDWIDTH_EXCEEDED
+            self.status.activity_bandwidth_exceeded_count += 1
+
+    def _report_publishers(self):
+        """ Publishes the per publisher statistics of the window and starts the next one, caller must hold _lock """
+        if self._publisher_stats is None:
+            return
+        self.network_state_tracker.publish_publishers(self._publisher_stats.to_msg(self._topic_name, self._clock(),
+                                                                                   self.status.activity_deadline))
+        self._publisher_stats.end_window()
+
+    def _learn(self):
+        """ Updates the learned rate from the window, and DEADLINE and TIMEOUT from it.
+        Only on time windows are learned from, so a topic that slows down keeps being reported SLOW.
+        Caller must hold network_state_tracker.topics_lock
+        """
+        for interval in self.interval_buffer.values():
+            self._estimator.update(interval)
+        self.status.activity_deadline = self._estimator.deadline()
+        self.status.activity_timeout = max(self._min_timeout, self._timeout_factor * self.status.activity_deadline)
+        self._watchdog.set_time(self.status.activity_timeout)
+        if self.logger.is_enabled_for(DEBUG):
+            self.logger.debug("%s: learned rate %.2f Hz, deadline %.4f s, timeout %.2f s" %
+                              (self._topic_name, self._estimator.rate(), self.status.activity_deadline,
+                               self.status.activity_timeout))
+
+    def _log_window(self):
+        """ Logs the window's interval statistics at debug level. The percentile sorts the window,
+        so nothing is computed unless debug messages are enabled
+        """
+        if not self.logger.is_enabled_for(DEBUG):
+            return
+        intervals = self.interval_buffer
+        self.logger.debug("%s: rate %.2f Hz, jitter %.4f s, min %.4f s, max %.4f s, p95 %.4f s" %
+                          (self._topic_name, 1.0 / intervals.mean() if intervals.mean() > 0 else 0.0,
+                           intervals.std(), intervals.min(), intervals.max(), intervals.percentile(95)))
 
     def _timeout_callback(self):
         """ called by watchdog timer """
         # TIMEOUT STATE - we failed to receive any messages prior to the TIMEOUT watchdog timer going off
         self.logger.warn("%s ActivityMonitor - Timeout!" % self._topic_name)
-        self.activity_status = ActivityStatus.TIMEOUT
-        self.activity_timeout_count += 1
-        self._publish_update()
-
+        with self._lock, self.network_state_tracker.topics_lock:
+            self._changed = not self.status.activity_status == ActivityStatus.TIMEOUT
+            self.status.activity_status = ActivityStatus.TIMEOUT
+            self.status.activity_timeout_count += 1
+            # Nothing is arriving
+            self.status.activity_bandwidth = 0.0
+            self._report_publishers()
+            # A silent topic must not hold on to a limited subscription slot, try again later
+            if self._mode == MonitorMode.DUTY_CYCLE and self._scheduler.limited and self._subscribed():
+                self._release()
+            self._publish_update()
+
+
+    def _qos_incompatible_callback(self, event):
+        """ called by rclpy when a publisher's QoS doesn't match our subscription """
+        self.logger.warn("%s ActivityMonitor - incompatible QoS policy %s" % (self._topic_name, event.last_policy_kind))
+        with self._lock:
+            # Compatible publishers may still be delivering
+            if self._subscribed() and self._last_stamp is None:
+                self._report_qos_incompatible()
 
     def _publish_update(self):
-        """ Publish TopicStatus() for this ActivityMonitor """
-        self.timestamp = time.time()
-        self.valid_duration = self.activity_timeout * 1.5
-        topic_status_data = self.network_state_tracker.topics[self._topic_name]
-        self.network_state_tracker.update_pub.publish(topic_status_data.to_msg())
+        """ Publish TopicStatus() for this ActivityMonitor, caller must hold network_state_tracker.topics_lock
+        The status stays valid for 1.5 times the longest we expect to wait for the next report, after that
+        NetworkStateTracker marks it STALE.
+        """
+        if self.status.activity_status in (ActivityStatus.NOT_MONITORED, ActivityStatus.TIMEOUT) and \
+                (not self._running or self._subscribed()):
+            # Nothing is reported again until a message arrives (or monitoring restarts), however long that takes
+            self.status.valid_duration = 0.0
+        else:
+            # A window reports after at most WINDOW_SIZE messages, each within TIMEOUT of the one before it (or
+            # of subscribing). A SLOW topic can take that long, anything slower is reported as a TIMEOUT
+            report_interval = (self.interval_buffer.max_size + 1) * self.status.activity_timeout
+            if not self._mode == MonitorMode.CONTINUOUS or self.status.activity_status == ActivityStatus.QOS_INCOMPATIBLE:
+                # The next window waits out RECONNECT_WAIT_TIME, then its turn for a subscription
+                report_interval += self._reconnect_wait_time * (1.0 + self._scheduler.jitter) + self._scheduler.expected_delay()
+            self.status.valid_duration = report_interval * 1.5
+        self.network_state_tracker.publish_update(self.status)
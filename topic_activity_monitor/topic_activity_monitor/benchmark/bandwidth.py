@@ -0,0 +1,78 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Cost of measuring bandwidth and message sizes, and of the network wide bandwidth report.
+
+"per message" is what a raw subscription callback adds to record the serialized size: len() of
+the bytes it was handed and a RingBuffer push, nothing is deserialized. "window" turns the
+buffer into the mean, p95 and max size and the bandwidth once per window.
+
+The report picks the BANDWIDTH_REPORT_SIZE topics with the highest bandwidth. "per topic" sorts
+the TopicStatusData of every topic the way TopicStatusAggregator does (heapq.nlargest over the
+views), "table" is StatusTable.largest() on the activity_bandwidth column as NetworkStateTracker does.
+
+    python3 -m topic_activity_monitor.benchmark.bandwidth
+"""
+import argparse
+import heapq
+import random
+import timeit
+
+from topic_activity_monitor.lib.ring_buffer import RingBuffer
+from topic_activity_monitor.lib.topic_status_data import StatusTable, TopicStatusData
+
+def main():
+    parser = argparse.ArgumentParser("bandwidth")
+    parser.add_argument("--topics", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--report-size", type=int, default=10)
+    parser.add_argument("--window-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    msg = bytes(640 * 480 * 3)
+    sizes = RingBuffer(args.window_size)
+    intervals = RingBuffer(args.window_size - 1)
+    for _ in range(args.window_size):
+        sizes.push(len(msg))
+        intervals.push(0.033)
+
+    def per_message():
+        sizes.push(len(msg))
+
+    def window():
+        size_mean = sizes.mean()
+        return size_mean, sizes.percentile(95), sizes.max(), size_mean / intervals.mean()
+
+    number = 10000
+    per_message_us = min(timeit.repeat(per_message, number=number, repeat=5)) / number * 1e6
+    window_us = min(timeit.repeat(window, number=number, repeat=5)) / number * 1e6
+    print("size accounting: %.2f us per message, %.2f us per window of %d" % (per_message_us, window_us, args.window_size))
+    print()
+
+    print("%6s | %16s %16s %8s" % ("topics", "per topic us", "table us", "speedup"))
+    for topic_count in args.topics:
+        table = StatusTable()
+        topics = [TopicStatusData("/robot_%d/topic_%d" % (i // 100, i), "sensor_msgs/msg/Image", table=table)
+                  for i in range(topic_count)]
+        values = random.Random(0)
+        for topic_status_data in topics:
+            # A quarter of the topics are not measured (not raw, or timed out)
+            if values.random() < 0.75:
+                topic_status_data.activity_bandwidth = values.uniform(1e3, 1e8)
+
+        def per_topic_report():
+            measured = [topic_status_data for topic_status_data in topics if topic_status_data.activity_bandwidth > 0]
+            largest = heapq.nlargest(args.report_size, measured, key=lambda topic_status_data: topic_status_data.activity_bandwidth)
+            return [topic_status_data.topic_name for topic_status_data in largest]
+
+        def table_report():
+            return [table.topic_names[topic_id] for topic_id in table.largest("activity_bandwidth", args.report_size).tolist()]
+
+        assert(per_topic_report() == table_report())
+        per_topic_us = min(timeit.repeat(per_topic_report, number=1, repeat=args.repeat)) * 1e6
+        table_us = min(timeit.repeat(table_report, number=1, repeat=args.repeat)) * 1e6
+        print("%6d | %16.1f %16.1f %7.1fx" % (topic_count, per_topic_us, table_us, per_topic_us / table_us))
+
+
+if __name__ == "__main__":
+    main()
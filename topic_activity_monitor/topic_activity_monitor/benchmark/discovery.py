@@ -0,0 +1,79 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Discovery scan cost against node and topic count.
+
+Compares the per node scan that ran on every tick (find_current_endpoints) with a
+full GraphWatcher scan, with GraphWatcher's cost on a tick where the graph did
+not change, and on a tick after a graph event caused by one of our own monitoring
+subscriptions (the duty cycle monitors subscribe and unsubscribe all the time).
+Graph queries are answered by FakeGraphNode, so the numbers show the Python side
+cost and the number of graph queries made. With a real rmw every query also walks
+the graph cache, so the query count is the better predictor of real cost.
+
+    python3 -m topic_activity_monitor.benchmark.discovery
+"""
+import argparse
+import timeit
+
+from topic_activity_monitor.benchmark.fake_node import make_graph
+from topic_activity_monitor.lib.find_current_endpoints import find_current_endpoints
+from topic_activity_monitor.lib.graph_watcher import GraphWatcher
+
+RUNS = 5
+
+
+def time_call(fun, repeat):
+    """ returns seconds per call, the best average of RUNS runs of repeat calls """
+    return min(timeit.repeat(fun, number=repeat, repeat=RUNS)) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser("discovery")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--topics", type=int, nargs="+", default=[100, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print("%6s %6s | %12s %8s | %12s %8s | %12s %8s | %12s %8s" % ("nodes", "topics", "legacy ms", "queries",
+                                                                   "full scan ms", "queries", "idle tick ms", "queries",
+                                                                   "own event ms", "queries"))
+    for node_count in args.nodes:
+        for topic_count in args.topics:
+            ros_node = make_graph(node_count, topic_count)
+
+            ros_node.calls = 0
+            legacy = time_call(lambda: find_current_endpoints(ros_node), args.repeat)
+            legacy_calls = ros_node.calls / (RUNS * args.repeat)
+
+            watcher = GraphWatcher(ros_node)
+            watcher.event_driven = True
+
+            def full_scan():
+                watcher.notify_graph_change()
+                watcher.scan()
+            ros_node.calls = 0
+            scan = time_call(full_scan, args.repeat)
+            scan_calls = ros_node.calls / (RUNS * args.repeat)
+
+            ros_node.calls = 0
+            idle = time_call(watcher.scan, args.repeat)
+            idle_calls = ros_node.calls / (RUNS * args.repeat)
+
+            def own_event():
+                watcher.own_change()
+                watcher.notify_graph_change()
+                watcher.scan()
+            ros_node.calls = 0
+            own = time_call(own_event, args.repeat)
+            own_calls = ros_node.calls / (RUNS * args.repeat)
+
+            print("%6d %6d | %12.3f %8d | %12.3f %8d | %12.4f %8d | %12.4f %8d" % (node_count, topic_count,
+                                                                                 legacy * 1e3, legacy_calls,
+                                                                                 scan * 1e3, scan_calls,
+                                                                                 idle * 1e3, idle_calls,
+                                                                                 own * 1e3, own_calls))
+
+
+if __name__ == "__main__":
+    main()
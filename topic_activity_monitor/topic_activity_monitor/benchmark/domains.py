@@ -0,0 +1,122 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Resident memory of monitoring several ROS domains from one process against one process per domain.
+
+Every measurement runs in fresh processes, and the memory is the sum of their VmRSS once the
+trackers are built. By default the trackers get FakeNodes, which shows the Python side (the
+interpreter, the imported modules and the trackers themselves). With --ros the real
+topic_activity_monitor runs on loopback, with a DDS participant per domain either way, so the
+difference is what the shared process saves on top of that.
+
+    python3 -m topic_activity_monitor.benchmark.domains --domains 1 2 4 8
+    python3 -m topic_activity_monitor.benchmark.domains --domains 2 4 --ros
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+def write_config(path, topic_count):
+    with open(path, "w") as config_file:
+        for i in range(topic_count):
+            config_file.write("[/domains/topic_%d]\n" % i)
+            config_file.write("TYPE: std_msgs/msg/String\n")
+            config_file.write("WINDOW_SIZE: 10\n")
+            config_file.write("RECONNECT_WAIT_TIME: 1\n")
+            config_file.write("DEADLINE: 0.1\n")
+            config_file.write("TIMEOUT: 1\n\n")
+        config_file.write("[SETTINGS]\n")
+        config_file.write('BLACKLIST: ["/topic_status"]\n')
+
+def rss_kb(pid="self"):
+    """ returns VmRSS (kB) of process pid """
+    with open("/proc/%s/status" % pid) as status_file:
+        for line in status_file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+def measure(config_path, domain_ids):
+    """ runs in the child process, builds a tracker per domain on FakeNodes and prints its VmRSS """
+    from topic_activity_monitor.benchmark.fake_node import FakeClock, FakeNode
+    from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+
+    clock = FakeClock()
+    args = argparse.Namespace(config_path=config_path, shard_count=1, shard_index=0)
+    network_trackers = list()
+    for domain_id in domain_ids:
+        primary = network_trackers[0] if network_trackers else None
+        network_trackers.append(NetworkStateTracker(FakeNode(clock), args, clock=clock, domain_id=domain_id, primary=primary))
+    # Let the monitors subscribe and time out once, stepping every domain's node together
+    end = clock() + 2.0
+    while clock() < end:
+        step = clock() + 0.01
+        for network_tracker in network_trackers:
+            network_tracker.ros_node.run_until(step)
+    print(rss_kb())
+
+def run_fake(config_path, domain_groups):
+    """ returns the summed VmRSS (kB) of one child process per group of domain ids """
+    total = 0
+    for domain_ids in domain_groups:
+        output = subprocess.run([sys.executable, "-m", "topic_activity_monitor.benchmark.domains", "--child", config_path,
+                                 "--domains"] + [str(domain_id) for domain_id in domain_ids],
+                                check=True, stdout=subprocess.PIPE, universal_newlines=True)
+        total += int(output.stdout.split()[-1])
+    return total
+
+def run_ros(config_path, domain_groups, settle):
+    """ returns the summed VmRSS (kB) of a topic_activity_monitor per group of domain ids, on loopback """
+    env = dict(os.environ, ROS_LOCALHOST_ONLY="1", ROS_AUTOMATIC_DISCOVERY_RANGE="LOCALHOST")
+    processes = [subprocess.Popen([sys.executable, "-m", "topic_activity_monitor.topic_activity_monitor",
+                                   "--config-path", config_path, "--domains"] + [str(domain_id) for domain_id in domain_ids],
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                 for domain_ids in domain_groups]
+    try:
+        time.sleep(settle)
+        for process in processes:
+            if process.poll() is not None:
+                raise SystemExit("topic_activity_monitor exited with %d" % process.returncode)
+        return sum(rss_kb(process.pid) for process in processes)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser("domains")
+    parser.add_argument("--domains", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Domain counts to compare (with --child, the domain ids to monitor)")
+    parser.add_argument("--topics", type=int, default=100, help="Configured topics, monitored in every domain")
+    parser.add_argument("--ros", action="store_true", help="Run the real topic_activity_monitor with rclpy")
+    parser.add_argument("--settle", type=float, default=5.0, help="Seconds the --ros processes run before measuring")
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        measure(args.child, args.domains)
+        return
+
+    print("%7s %16s %14s %8s" % ("domains", "separate MB", "shared MB", "saved"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = os.path.join(tmp_dir, "domains.ini")
+        write_config(config_path, args.topics)
+        for domain_count in args.domains:
+            # Domains from 10 up, clear of the default domain 0
+            domain_ids = list(range(10, 10 + domain_count))
+            if args.ros:
+                separate = run_ros(config_path, [[domain_id] for domain_id in domain_ids], args.settle)
+                shared = run_ros(config_path, [domain_ids], args.settle)
+            else:
+                separate = run_fake(config_path, [[domain_id] for domain_id in domain_ids])
+                shared = run_fake(config_path, [domain_ids])
+            print("%7d %16.1f %14.1f %7.0f%%" % (domain_count, separate / 1024.0, shared / 1024.0,
+                                                 100.0 * (separate - shared) / separate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Stamp jitter of a slow topic while a fast topic keeps the executor busy.
+
+A separate process publishes /benchmark/load at --load-rate Hz and /benchmark/probe at
+--probe-rate Hz. This process subscribes to both, the way ActivityMonitor does, with
+each subscription in its own callback group. Every load callback burns --work-us
+microseconds of CPU. The arrival stamps of /benchmark/probe are compared with the
+probe period, once with the single threaded spin_once() loop and once with
+MultiThreadedExecutor.
+
+    python3 -m topic_activity_monitor.benchmark.executor_jitter
+"""
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+import rclpy
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
+from rclpy.executors import MultiThreadedExecutor
+from rclpy.qos import qos_profile_sensor_data
+from std_msgs.msg import Empty
+
+
+def publisher_process(load_rate, probe_rate, stop_event):
+    rclpy.init()
+    node = rclpy.create_node("_benchmark_publisher")
+    load_pub = node.create_publisher(Empty, "/benchmark/load", qos_profile_sensor_data)
+    probe_pub = node.create_publisher(Empty, "/benchmark/probe", qos_profile_sensor_data)
+    node.create_timer(1.0 / load_rate, lambda: load_pub.publish(Empty()))
+    node.create_timer(1.0 / probe_rate, lambda: probe_pub.publish(Empty()))
+    while not stop_event.is_set():
+        rclpy.spin_once(node, timeout_sec=0.1)
+    rclpy.shutdown()
+
+
+def measure(executor_mode, duration, work_us):
+    """ returns array of /benchmark/probe arrival intervals """
+    rclpy.init()
+    node = rclpy.create_node("_benchmark_monitor")
+    stamps = list()
+
+    def load_callback(msg):
+        end = time.perf_counter() + work_us * 1e-6
+        while time.perf_counter() < end:
+            pass
+
+    node.create_subscription(Empty, "/benchmark/load", load_callback, qos_profile_sensor_data,
+                             callback_group=MutuallyExclusiveCallbackGroup(), raw=True)
+    node.create_subscription(Empty, "/benchmark/probe", lambda msg: stamps.append(time.time()), qos_profile_sensor_data,
+                             callback_group=MutuallyExclusiveCallbackGroup(), raw=True)
+
+    end = time.time() + duration
+    if executor_mode == "multi":
+        executor = MultiThreadedExecutor()
+        executor.add_node(node)
+        while time.time() < end:
+            executor.spin_once(timeout_sec=0.1)
+        executor.shutdown()
+    else:
+        while time.time() < end:
+            rclpy.spin_once(node, timeout_sec=0.1)
+    node.destroy_node()
+    rclpy.shutdown()
+    return np.diff(np.array(stamps))
+
+
+def main():
+    parser = argparse.ArgumentParser("executor_jitter")
+    parser.add_argument("--load-rate", type=float, default=1000.0)
+    parser.add_argument("--probe-rate", type=float, default=10.0)
+    parser.add_argument("--work-us", type=float, default=500.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    stop_event = multiprocessing.Event()
+    publisher = multiprocessing.Process(target=publisher_process, args=(args.load_rate, args.probe_rate, stop_event))
+    publisher.start()
+    time.sleep(2.0)  # discovery
+
+    period = 1.0 / args.probe_rate
+    print("%8s %8s %14s %14s %14s" % ("executor", "samples", "jitter ms", "p99 error ms", "max error ms"))
+    try:
+        for executor_mode in ["single", "multi"]:
+            intervals = measure(executor_mode, args.duration, args.work_us)
+            if len(intervals) == 0:
+                print("%8s no probe messages received" % executor_mode)
+                continue
+            error = np.abs(intervals - period)
+            print("%8s %8d %14.3f %14.3f %14.3f" % (executor_mode, len(intervals), np.std(intervals) * 1e3,
+                                                    np.percentile(error, 99) * 1e3, np.max(error) * 1e3))
+    finally:
+        stop_event.set()
+        publisher.join()
+
+
+if __name__ == "__main__":
+    main()
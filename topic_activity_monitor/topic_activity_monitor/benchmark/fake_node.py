@@ -0,0 +1,266 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import heapq
+import inspect
+import itertools
+import time
+
+from collections import namedtuple
+
+from topic_activity_monitor.lib.print_logger import ERROR, PrintLogger
+
+EndpointInfo = namedtuple("EndpointInfo", ["node_name", "node_namespace", "topic_type", "qos_profile"], defaults=[None])
+
+class QuietLogger(PrintLogger):
+    """ PrintLogger that only prints errors so logging doesn't skew timings """
+    level = ERROR
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warn(self, msg):
+        pass
+
+class FakeGraphNode(object):
+    """ Stands in for rclpy.node.Node's graph API with a synthetic graph.
+    Counts every graph query in self.calls
+    """
+    def __init__(self, name="_topic_activity_monitor", namespace="/"):
+        self._name = name
+        self._namespace = namespace
+        self._logger = QuietLogger()
+        self.calls = 0
+        self.publishers = dict()   # (node_name, node_namespace): {topic_name: msg_type_name}
+        self.subscribers = dict()  # (node_name, node_namespace): {topic_name: msg_type_name}
+        self.add_node(name, namespace)
+
+    def add_node(self, name, namespace="/"):
+        self.publishers[(name, namespace)] = dict()
+        self.subscribers[(name, namespace)] = dict()
+
+    def add_publisher(self, node, topic_name, msg_type_name):
+        self.publishers[node][topic_name] = msg_type_name
+
+    def add_subscriber(self, node, topic_name, msg_type_name):
+        self.subscribers[node][topic_name] = msg_type_name
+
+    def remove_publisher(self, node, topic_name):
+        del self.publishers[node][topic_name]
+
+    # rclpy.node.Node API
+    def get_name(self):
+        return self._name
+
+    def get_namespace(self):
+        return self._namespace
+
+    def get_logger(self):
+        return self._logger
+
+    def get_node_names_and_namespaces(self):
+        self.calls += 1
+        return list(self.publishers.keys())
+
+    def get_publisher_names_and_types_by_node(self, node_name, node_namespace):
+        self.calls += 1
+        return [(topic, [msg_type]) for topic, msg_type in self.publishers[(node_name, node_namespace)].items()]
+
+    def get_subscriber_names_and_types_by_node(self, node_name, node_namespace):
+        self.calls += 1
+        return [(topic, [msg_type]) for topic, msg_type in self.subscribers[(node_name, node_namespace)].items()]
+
+    def get_topic_names_and_types(self):
+        self.calls += 1
+        topics = dict()
+        for endpoints in list(self.publishers.values()) + list(self.subscribers.values()):
+            for topic, msg_type in endpoints.items():
+                topics.setdefault(topic, set()).add(msg_type)
+        return [(topic, sorted(msg_types)) for topic, msg_types in topics.items()]
+
+    def count_publishers(self, topic_name):
+        self.calls += 1
+        return _count(self.publishers, topic_name)
+
+    def count_subscribers(self, topic_name):
+        self.calls += 1
+        return _count(self.subscribers, topic_name)
+
+    def get_publishers_info_by_topic(self, topic_name):
+        self.calls += 1
+        return [EndpointInfo(node[0], node[1], endpoints[topic_name])
+                for node, endpoints in self.publishers.items() if topic_name in endpoints]
+
+    def get_subscriptions_info_by_topic(self, topic_name):
+        self.calls += 1
+        return [EndpointInfo(node[0], node[1], endpoints[topic_name])
+                for node, endpoints in self.subscribers.items() if topic_name in endpoints]
+
+def _count(endpoints_by_node, topic_name):
+    return len([1 for endpoints in endpoints_by_node.values() if topic_name in endpoints])
+
+def make_graph(node_count, topic_count, msg_type_name="std_msgs/msg/String"):
+    """ returns FakeGraphNode with node_count nodes sharing topic_count topics.
+    Each topic has one publisher and one subscriber on different nodes.
+    """
+    ros_node = FakeGraphNode()
+    nodes = [("node_%d" % i, "/") for i in range(node_count)]
+    for node in nodes:
+        ros_node.add_node(*node)
+    for i in range(topic_count):
+        topic_name = "/topic_%d" % i
+        ros_node.add_publisher(nodes[i % node_count], topic_name, msg_type_name)
+        ros_node.add_subscriber(nodes[(i + 1) % node_count], topic_name, msg_type_name)
+    return ros_node
+
+class FakeClock(object):
+    """ Simulated wall clock (seconds), a drop in for time.time() """
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+class FakeTimer(object):
+    """ Periodic timer on a FakeNode, mirrors rclpy.timer.Timer """
+    def __init__(self, ros_node, period, callback):
+        self._ros_node = ros_node
+        self.timer_period_ns = int(period * 1e9)
+        self._period = period
+        self.callback = callback
+        self._generation = 0  # Incremented to invalidate events that are already scheduled
+        self._canceled = False
+        self.reset()
+
+    def reset(self):
+        self._canceled = False
+        self._generation += 1
+        self._started = self._ros_node.clock()
+        self._fired = 0
+        self._ros_node.schedule(self._started + self._period, self._fire, self._generation)
+
+    def cancel(self):
+        self._canceled = True
+        self._generation += 1
+
+    def is_canceled(self):
+        return self._canceled
+
+    def _fire(self, generation):
+        if self._canceled or not generation == self._generation:
+            return
+        # Like rclpy, every call is due a whole number of periods after the start, adding up the
+        # period would let rounding errors accumulate into drift
+        self._fired += 1
+        self._ros_node.schedule(self._started + (self._fired + 1) * self._period, self._fire, generation)
+        self._ros_node.dispatch(self.callback)
+
+class FakeSubscription(object):
+    def __init__(self, topic_name, callback, raw):
+        self.topic_name = topic_name
+        self.callback = callback
+        self.raw = raw
+        # Like rclpy, callbacks that can't be called with the message alone are passed the MessageInfo too
+        try:
+            inspect.signature(callback).bind(object())
+            self.with_message_info = False
+        except TypeError:
+            self.with_message_info = True
+
+class FakePublisher(object):
+    """ Counts published messages and hands them to listeners as they are published """
+    def __init__(self, topic_name):
+        self.topic_name = topic_name
+        self.count = 0
+        self.listeners = list()  # callable(msg)
+
+    def publish(self, msg):
+        self.count += 1
+        for listener in self.listeners:
+            listener(msg)
+
+class FakeNode(FakeGraphNode):
+    """ Headless stand-in for rclpy.node.Node, with an event loop driven by a FakeClock.
+
+    Timers and message deliveries are events on a heap ordered by simulated time, and
+    run_until() runs them in order while advancing the clock. Every callback is timed, and
+    the CPU time and call count are kept per callback name in self.stats.
+    """
+    def __init__(self, clock, name="_topic_activity_monitor", namespace="/"):
+        FakeGraphNode.__init__(self, name, namespace)
+        self.clock = clock
+        self._events = list()  # heap of (time, sequence, function, args)
+        self._sequence = itertools.count()
+        self.subscriptions = dict()  # topic_name(str): [FakeSubscription()]
+        self.publishers_by_topic = dict()  # topic_name(str): FakePublisher()
+        self.stats = dict()  # callback name(str): [calls(int), cpu seconds(float)]
+        self.delivered_bytes = 0  # Bytes handed to subscriptions
+
+    # Event loop
+    def schedule(self, at, function, *args):
+        heapq.heappush(self._events, (at, next(self._sequence), function, args))
+
+    def dispatch(self, callback, *args):
+        start = time.perf_counter()
+        callback(*args)
+        elapsed = time.perf_counter() - start
+        name = getattr(callback, "__qualname__", repr(callback))
+        stat = self.stats.setdefault(name, [0, 0.0])
+        stat[0] += 1
+        stat[1] += elapsed
+
+    def run_until(self, end):
+        while self._events and self._events[0][0] <= end:
+            at, _, function, args = heapq.heappop(self._events)
+            self.clock.now = at
+            function(*args)
+        self.clock.now = end
+
+    def deliver(self, topic_name, msg, msg_info=None):
+        """ hands msg to every subscription on topic_name, msg_info is the rclpy MessageInfo dict (defaults to unknown) """
+        for subscription in list(self.subscriptions.get(topic_name, list())):
+            self.delivered_bytes += len(msg)
+            if subscription.with_message_info:
+                if msg_info is None:
+                    msg_info = {"source_timestamp": 0, "received_timestamp": int(self.clock() * 1e9),
+                                "publication_sequence_number": 0, "reception_sequence_number": 0}
+                self.dispatch(subscription.callback, msg, msg_info)
+            else:
+                self.dispatch(subscription.callback, msg)
+
+    # rclpy.node.Node API
+    def create_timer(self, period, callback, callback_group=None):
+        return FakeTimer(self, period, callback)
+
+    def destroy_timer(self, timer):
+        timer.cancel()
+        return True
+
+    def create_subscription(self, msg_type, topic_name, callback, qos_profile, callback_group=None, raw=False,
+                            event_callbacks=None):
+        subscription = FakeSubscription(topic_name, callback, raw)
+        self.subscriptions.setdefault(topic_name, list()).append(subscription)
+        self.add_subscriber((self._name, self._namespace), topic_name, getattr(msg_type, "__name__", str(msg_type)))
+        return subscription
+
+    def destroy_subscription(self, subscription):
+        subscriptions = self.subscriptions.get(subscription.topic_name, list())
+        if subscription not in subscriptions:
+            return False
+        subscriptions.remove(subscription)
+        if not subscriptions:
+            del self.subscribers[(self._name, self._namespace)][subscription.topic_name]
+        return True
+
+    def create_service(self, srv_type, srv_name, callback, callback_group=None):
+        """ returns the callback, call it with (request, response) to use the service """
+        return callback
+
+    def create_publisher(self, msg_type, topic_name, qos_profile, callback_group=None):
+        publisher = FakePublisher(topic_name)
+        self.publishers_by_topic[topic_name] = publisher
+        self.add_publisher((self._name, self._namespace), topic_name, getattr(msg_type, "__name__", str(msg_type)))
+        return publisher
@@ -0,0 +1,65 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import random
+import struct
+
+class SyntheticPublisher(object):
+    """ Publishes serialized messages of a fixed size on a FakeNode at a configurable rate.
+    Shows up on the fake graph as a publisher on its own node, and numbers its messages like rmw does.
+    With latency set, each message is little endian CDR starting with a std_msgs/Header stamped latency seconds ago.
+    """
+    def __init__(self, ros_node, topic_name, msg_type_name, rate, size=64, jitter=0.0, seed=0, node_name=None, latency=None):
+        self._ros_node = ros_node
+        self.topic_name = topic_name
+        self.rate = rate
+        self.jitter = jitter       # fraction of the period each interval may vary by
+        self.latency = latency
+        self._payload = bytearray(max(size, 12))
+        self._payload[1] = 1  # CDR_LE encapsulation
+        self._random = random.Random(seed)
+        self._generation = 0
+        self.count = 0
+
+        if node_name is None:
+            node_name = "_synthetic_publisher_%s" % topic_name.strip("/").replace("/", "_")
+        self._node = (node_name, "/")
+        ros_node.add_node(*self._node)
+        ros_node.add_publisher(self._node, topic_name, msg_type_name)
+
+    def start(self, at=None):
+        """ start publishing at time `at`, defaults to now """
+        self._generation += 1
+        self._ros_node.schedule(self._ros_node.clock() if at is None else at, self._publish, self._generation)
+
+    def stop(self):
+        """ stop publishing, but stay on the graph (looks like a stuck publisher) """
+        self._generation += 1
+
+    def set_rate(self, rate):
+        self.rate = rate
+
+    def set_size(self, size):
+        """ changes the serialized size of the messages, keeping the header """
+        payload = bytearray(max(size, 12))
+        payload[:12] = self._payload[:12]
+        self._payload = payload
+
+    def set_latency(self, latency):
+        self.latency = latency
+
+    def _publish(self, generation):
+        if not generation == self._generation:
+            return
+        self.count += 1
+        stamp = int(self._ros_node.clock() * 1e9)
+        if self.latency is not None:
+            header_stamp = stamp - int(self.latency * 1e9)
+            struct.pack_into("<iI", self._payload, 4, header_stamp // 1000000000, header_stamp % 1000000000)
+        self._ros_node.deliver(self.topic_name, self._payload,
+                               {"source_timestamp": stamp, "received_timestamp": stamp,
+                                "publication_sequence_number": self.count, "reception_sequence_number": 0})
+        period = 1.0 / self.rate
+        if self.jitter > 0:
+            period *= 1.0 + self._random.uniform(-self.jitter, self.jitter)
+        self._ros_node.schedule(self._ros_node.clock() + period, self._publish, generation)
@@ -0,0 +1,73 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Cost of keeping namespace health summaries current against topic count.
+
+"rescan" is what a dashboard does with the raw updates: after each status change, count the
+topics under every namespace again. "rollup" is NamespaceRollup.update() on the transition plus
+changed() to find what to publish. Topics are spread over 20 robots x 10 subsystems x N topics,
+so every topic is 3 namespaces deep.
+
+    python3 -m topic_activity_monitor.benchmark.namespace_rollup
+"""
+import argparse
+import random
+import timeit
+
+from topic_activity_monitor.lib.namespace_rollup import NamespaceRollup
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, ConnectionStatus, StatusTable, TopicStatusData
+
+STATUSES = [ActivityStatus.ACTIVE, ActivityStatus.SLOW, ActivityStatus.TIMEOUT]
+
+def rescan(topics):
+    """ returns {namespace: [topics, active, slow, timeout]} counted from scratch """
+    counts = dict()
+    for topic_status_data in topics:
+        namespace = ""
+        names = [""] + topic_status_data.topic_name.strip("/").split("/")[:-1]
+        for name in names:
+            namespace = namespace.rstrip("/") + "/" + name
+            namespace_counts = counts.setdefault(namespace, [0, 0, 0, 0])
+            namespace_counts[0] += 1
+            namespace_counts[1 + STATUSES.index(topic_status_data.activity_status)] += 1
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser("namespace_rollup")
+    parser.add_argument("--topics", type=int, nargs="+", default=[200, 2000, 10000])
+    parser.add_argument("--transitions", type=int, default=200)
+    args = parser.parse_args()
+
+    print("%6s %10s | %14s %14s" % ("topics", "namespaces", "rescan us", "rollup us"))
+    for topic_count in args.topics:
+        table = StatusTable()
+        rollup = NamespaceRollup()
+        topics = [TopicStatusData("/robot_%d/subsystem_%d/topic_%d" % (i % 20, (i // 20) % 10, i), "std_msgs/msg/String",
+                                  table=table)
+                  for i in range(topic_count)]
+        for topic_status_data in topics:
+            topic_status_data.on_transition = rollup.update
+            topic_status_data.connection_status = ConnectionStatus.PRESENT
+            topic_status_data.activity_status = ActivityStatus.ACTIVE
+        rollup.changed()
+
+        changes = random.Random(0)
+        transitions = [(changes.choice(topics), changes.choice(STATUSES)) for _ in range(args.transitions)]
+
+        def rescan_transitions():
+            for topic_status_data, status in transitions:
+                topic_status_data.activity_status = status
+                rescan(topics)
+
+        def rollup_transitions():
+            for topic_status_data, status in transitions:
+                topic_status_data.activity_status = status
+                rollup.changed()
+
+        rescan_us = min(timeit.repeat(rescan_transitions, number=1, repeat=3)) / len(transitions) * 1e6
+        rollup_us = min(timeit.repeat(rollup_transitions, number=1, repeat=3)) / len(transitions) * 1e6
+        print("%6d %10d | %14.1f %14.2f" % (topic_count, len(rescan(topics)), rescan_us, rollup_us))
+
+
+if __name__ == "__main__":
+    main()
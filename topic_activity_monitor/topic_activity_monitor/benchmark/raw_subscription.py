@@ -0,0 +1,76 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Compares the per-message cost of a regular subscription against a raw one.
+
+A regular subscription deserializes every message into a Python object before
+ActivityMonitor._topic_callback() is called. A raw subscription hands over the
+serialized bytes. This measures the CPU time and peak memory of that
+deserialization step for a few representative message types.
+
+    python3 -m topic_activity_monitor.benchmark.raw_subscription
+"""
+import argparse
+import time
+import tracemalloc
+
+from rclpy.serialization import serialize_message, deserialize_message
+from sensor_msgs.msg import Image, Imu, PointCloud2, PointField
+
+
+def make_image():
+    msg = Image()
+    msg.height = 1080
+    msg.width = 1920
+    msg.encoding = "rgb8"
+    msg.step = msg.width * 3
+    msg.data = bytes(msg.step * msg.height)
+    return msg
+
+
+def make_point_cloud():
+    msg = PointCloud2()
+    msg.height = 1
+    msg.width = 128 * 1024
+    msg.fields = [PointField(name=n, offset=4 * i, datatype=PointField.FLOAT32, count=1)
+                  for i, n in enumerate(["x", "y", "z", "intensity"])]
+    msg.point_step = 16
+    msg.row_step = msg.point_step * msg.width
+    msg.data = bytes(msg.row_step)
+    return msg
+
+
+SAMPLES = {
+    "sensor_msgs/msg/Imu": (Imu, Imu),
+    "sensor_msgs/msg/Image (1080p rgb8)": (Image, make_image),
+    "sensor_msgs/msg/PointCloud2 (128k points)": (PointCloud2, make_point_cloud),
+}
+
+
+def measure(callback, serialized, count):
+    """ returns (cpu seconds per message, peak bytes allocated) for calling callback on serialized """
+    tracemalloc.start()
+    start = time.process_time()
+    for _ in range(count):
+        callback(serialized)
+    elapsed = time.process_time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / count, peak
+
+
+def main():
+    parser = argparse.ArgumentParser("raw_subscription")
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    print("%-44s %14s %14s %14s %14s" % ("type", "cpu us/msg", "raw us/msg", "peak KiB", "raw peak KiB"))
+    for name, (msg_type, factory) in SAMPLES.items():
+        serialized = serialize_message(factory())
+        cpu, peak = measure(lambda data: deserialize_message(data, msg_type), serialized, args.count)
+        raw_cpu, raw_peak = measure(lambda data: len(data), serialized, args.count)
+        print("%-44s %14.2f %14.2f %14.1f %14.1f" % (name, cpu * 1e6, raw_cpu * 1e6, peak / 1024.0, raw_peak / 1024.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Startup time of NetworkStateTracker against config size.
+
+Every measurement runs in a fresh Python process, so no interface package is imported yet.
+  - eager     the message types are imported one by one before the tracker is built, as
+              ActivityMonitor.__init__ used to do
+  - ready     lazy: time until the tracker is built and monitoring starts
+  - all types lazy: time until the background prefetch has imported every type
+
+    python3 -m topic_activity_monitor.benchmark.startup --topics 10 100 1000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MESSAGE_TYPES = ["std_msgs/msg/String", "sensor_msgs/msg/Image", "sensor_msgs/msg/Imu", "sensor_msgs/msg/PointCloud2",
+                 "sensor_msgs/msg/LaserScan", "geometry_msgs/msg/Twist", "geometry_msgs/msg/PoseStamped",
+                 "nav_msgs/msg/Odometry", "nav_msgs/msg/Path", "tf2_msgs/msg/TFMessage",
+                 "diagnostic_msgs/msg/DiagnosticArray", "visualization_msgs/msg/MarkerArray", "rcl_interfaces/msg/Log",
+                 "trajectory_msgs/msg/JointTrajectory", "stereo_msgs/msg/DisparityImage", "shape_msgs/msg/Mesh"]
+
+def write_config(path, topic_count, prefetch):
+    with open(path, "w") as config_file:
+        for i in range(topic_count):
+            config_file.write("[/startup/topic_%d]\n" % i)
+            config_file.write("TYPE: %s\n" % MESSAGE_TYPES[i % len(MESSAGE_TYPES)])
+            config_file.write("WINDOW_SIZE: 10\n")
+            config_file.write("RECONNECT_WAIT_TIME: 1\n")
+            config_file.write("DEADLINE: 0.1\n")
+            config_file.write("TIMEOUT: 1\n\n")
+        config_file.write("[SETTINGS]\n")
+        config_file.write('BLACKLIST: ["/topic_status"]\n')
+        config_file.write("PREFETCH_MESSAGE_TYPES: %s\n" % prefetch)
+
+def measure(config_path, eager):
+    """ runs in the child process, prints seconds until ready and until every type is imported """
+    start = time.perf_counter()
+    from topic_activity_monitor.benchmark.fake_node import FakeClock, FakeNode
+    from topic_activity_monitor.lib.message_types import get_message_type, MESSAGE_TYPE_ERRORS
+    from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+
+    def load_all():
+        for msg_type_name in MESSAGE_TYPES:
+            try:
+                get_message_type(msg_type_name)
+            except MESSAGE_TYPE_ERRORS:
+                pass
+
+    if eager:
+        load_all()
+    args = argparse.Namespace(config_path=config_path, shard_count=1, shard_index=0)
+    NetworkStateTracker(FakeNode(FakeClock()), args)
+    ready = time.perf_counter() - start
+    # Waits for the prefetch thread where it holds the cache lock
+    load_all()
+    print("%f %f" % (ready, time.perf_counter() - start))
+
+def run(config_path, eager):
+    output = subprocess.run([sys.executable, "-m", "topic_activity_monitor.benchmark.startup", "--child", config_path]
+                            + (["--eager"] if eager else []), check=True, stdout=subprocess.PIPE, universal_newlines=True)
+    ready, loaded = output.stdout.split()[-2:]
+    return float(ready), float(loaded)
+
+def main():
+    parser = argparse.ArgumentParser("startup")
+    parser.add_argument("--topics", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        measure(args.child, args.eager)
+        return
+
+    print("%6s %10s %10s %12s" % ("topics", "eager s", "ready s", "all types s"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for topic_count in args.topics:
+            config_path = os.path.join(tmp_dir, "startup_%d.ini" % topic_count)
+            write_config(os.path.join(tmp_dir, "eager_%d.ini" % topic_count), topic_count, False)
+            write_config(config_path, topic_count, True)
+            eager, _ = run(os.path.join(tmp_dir, "eager_%d.ini" % topic_count), True)
+            ready, loaded = run(config_path, False)
+            print("%6d %10.3f %10.3f %12.3f" % (topic_count, eager, ready, loaded))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Per callback cost of reading and writing a topic's status.
+
+"before" replays the attribute proxies that TopicStatusData and ActivityMonitor used
+to have (a list membership test on every attribute access, plus a dict lookup into
+NetworkStateTracker.topics from the monitor). "after" uses TopicStatusData (now a view of
+a StatusTable row) through ActivityMonitor.status. Each callback does the reads and writes that a continuous
+ActivityMonitor does for an on time message, and to_msg() is timed with and without
+the reused message.
+
+    python3 -m topic_activity_monitor.benchmark.status_access
+"""
+import argparse
+import timeit
+
+from topic_activity_monitor_msgs.msg import TopicStatus
+
+from topic_activity_monitor.lib.topic_status_data import TopicStatusData, ActivityStatus
+
+FIELDS = ["topic_name", "msg_type_name", "timestamp", "valid_duration", "connection_status", "activity_status",
+          "activity_deadline", "activity_slow_count", "activity_timeout", "activity_timeout_count"]
+MONITOR_FIELDS = [name for name in FIELDS if not name == "connection_status"]
+
+class ProxyTopicStatusData(TopicStatusData):
+    """ TopicStatusData with the old __getattribute__ / __setattr__ proxies """
+    __slots__ = []
+
+    def __setattr__(self, name, value):
+        if name in FIELDS:
+            getattr(TopicStatusData, name).fset(self, value)
+        else:
+            super().__setattr__(name, value)
+
+    def __getattribute__(self, name):
+        if name not in FIELDS:
+            return super().__getattribute__(name)
+        return getattr(TopicStatusData, name).fget(self)
+
+class ProxyMonitor(object):
+    """ The old ActivityMonitor attribute proxy """
+    def __init__(self, topics, topic_name):
+        self.topics = topics
+        self._topic_name = topic_name
+
+    def __getattribute__(self, value_name):
+        if value_name in MONITOR_FIELDS:
+            return getattr(super().__getattribute__("topics")[super().__getattribute__("_topic_name")], value_name)
+        return super().__getattribute__(value_name)
+
+    def __setattr__(self, name, value):
+        if name in MONITOR_FIELDS:
+            return self.topics[self._topic_name].__setattr__(name, value)
+        return super().__setattr__(name, value)
+
+class SlotsMonitor(object):
+    def __init__(self, topics, topic_name):
+        self.status = topics[topic_name]
+
+def before_callback(monitor):
+    if not 0.01 < monitor.activity_deadline:
+        return
+    if not monitor.activity_status == ActivityStatus.ACTIVE:
+        monitor.activity_status = ActivityStatus.ACTIVE
+    monitor.valid_duration = monitor.activity_timeout * 1.5
+
+def after_callback(monitor):
+    status = monitor.status
+    if not 0.01 < status.activity_deadline:
+        return
+    if not status.activity_status == ActivityStatus.ACTIVE:
+        status.activity_status = ActivityStatus.ACTIVE
+    status.valid_duration = status.activity_timeout * 1.5
+
+def new_msg(topic_status_data):
+    msg = TopicStatus()
+    msg.topic_name = topic_status_data.topic_name
+    msg.msg_type = topic_status_data.msg_type_name
+    msg.timestamp = topic_status_data.timestamp
+    msg.valid_duration = topic_status_data.valid_duration
+    msg.connection_status = topic_status_data.connection_status.value
+    msg.activity_status = topic_status_data.activity_status.value
+    msg.activity_deadline = topic_status_data.activity_deadline
+    msg.activity_slow_count = topic_status_data.activity_slow_count
+    msg.activity_timeout = topic_status_data.activity_timeout
+    msg.activity_timeout_count = topic_status_data.activity_timeout_count
+    return msg
+
+def main():
+    parser = argparse.ArgumentParser("status_access")
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    def make(cls):
+        topic_status_data = cls("/image_raw", "sensor_msgs/msg/Image")
+        topic_status_data.activity_deadline = 0.05
+        topic_status_data.activity_timeout = 1.0
+        return {"/image_raw": topic_status_data}
+
+    before = ProxyMonitor(make(ProxyTopicStatusData), "/image_raw")
+    after = SlotsMonitor(make(TopicStatusData), "/image_raw")
+
+    def per_call(fun):
+        return min(timeit.repeat(fun, number=args.number, repeat=3)) / args.number * 1e9
+
+    print("%-24s %12s %12s" % ("", "before ns", "after ns"))
+    print("%-24s %12.1f %12.1f" % ("callback status access", per_call(lambda: before_callback(before)),
+                                   per_call(lambda: after_callback(after))))
+    print("%-24s %12.1f %12.1f" % ("to_msg()", per_call(lambda: new_msg(after.status)),
+                                   per_call(lambda: after.status.to_msg())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Cost of the sweeps over every topic's status against topic count.
+
+"per topic" loops over the TopicStatusData of each topic, the way NetworkStateTracker did
+before the status table (when TopicStatusData was a __slots__ record, its fields were a little
+faster to reach than through today's view of a row). "table" runs the same sweep as array
+operations on the StatusTable columns. The sweeps are:
+
+    connection   set connection_status of every topic, 10% of them changed by the graph
+    expiry       find the owned topics whose valid_duration ran out, 1% of them
+    snapshot     the TopicStatus of every topic, for TopicStatusArray and GetTopicStatuses
+
+The snapshot builds new TopicStatus messages either way, they are published or returned after
+topics_lock is released ("table" copies the rows under the lock, then fills the messages). With
+the generated message classes every field assignment is also type checked, which adds the same
+cost to both columns.
+
+    python3 -m topic_activity_monitor.benchmark.status_table
+"""
+import argparse
+import copy
+import timeit
+
+import numpy as np
+
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, ConnectionStatus, StatusTable, TopicStatusData
+
+def make_topics(topic_count):
+    """ returns (StatusTable, [TopicStatusData]) of topic_count monitored topics """
+    table = StatusTable()
+    topics = [TopicStatusData("/robot_%d/topic_%d" % (i // 100, i), "std_msgs/msg/String", table=table)
+              for i in range(topic_count)]
+    for i, topic_status_data in enumerate(topics):
+        topic_status_data.connection_status = ConnectionStatus.PRESENT
+        topic_status_data.activity_status = ActivityStatus.ACTIVE
+        topic_status_data.timestamp = 1000.0 + (i % 100) * 0.01
+        # 1% of the topics have not been refreshed in time at now = 1002.0
+        topic_status_data.valid_duration = 0.5 if i % 100 == 0 else 3.0
+    return table, topics
+
+def main():
+    parser = argparse.ArgumentParser("status_table")
+    parser.add_argument("--topics", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    now = 1002.0
+    print("%6s %-10s | %12s %12s %8s" % ("topics", "sweep", "per topic us", "table us", "speedup"))
+    for topic_count in args.topics:
+        table, topics = make_topics(topic_count)
+        topic_ids = np.arange(topic_count)
+        # Alternate between two graphs so every sweep changes 10% of the statuses
+        graphs = list()
+        for offset in range(2):
+            statuses = np.full(topic_count, ConnectionStatus.PRESENT.value, dtype=np.uint8)
+            statuses[offset::20] = ConnectionStatus.MISSING.value
+            graphs.append((statuses, [ConnectionStatus(status) for status in statuses.tolist()]))
+        state = {"graph": 0}
+
+        def per_topic_connection():
+            state["graph"] ^= 1
+            changed = list()
+            for topic_status_data, status in zip(topics, graphs[state["graph"]][1]):
+                if not topic_status_data.connection_status == status:
+                    topic_status_data.connection_status = status
+                    changed.append(topic_status_data)
+            return changed
+
+        def table_connection():
+            state["graph"] ^= 1
+            return table.set_column("connection_status", topic_ids, graphs[state["graph"]][0])
+
+        def per_topic_expiry():
+            return [topic_status_data for topic_status_data in topics
+                    if topic_status_data.valid_duration > 0 and
+                    topic_status_data.timestamp + topic_status_data.valid_duration <= now and
+                    not topic_status_data.activity_status == ActivityStatus.STALE]
+
+        def table_expiry():
+            return table.expired(now)
+
+        def per_topic_snapshot():
+            return [copy.copy(topic_status_data.to_msg()) for topic_status_data in topics]
+
+        def table_snapshot():
+            return table.to_msgs(table.snapshot(table.owned_ids()))
+
+        assert(len(per_topic_expiry()) == len(table_expiry()) == (topic_count + 99) // 100)
+        for name, per_topic, vectorized in [("connection", per_topic_connection, table_connection),
+                                            ("expiry", per_topic_expiry, table_expiry),
+                                            ("snapshot", per_topic_snapshot, table_snapshot)]:
+            per_topic_us = min(timeit.repeat(per_topic, number=1, repeat=args.repeat)) * 1e6
+            table_us = min(timeit.repeat(vectorized, number=1, repeat=args.repeat)) * 1e6
+            print("%6d %-10s | %12.1f %12.1f %7.1fx" % (topic_count, name, per_topic_us, table_us, per_topic_us / table_us))
+
+
+if __name__ == "__main__":
+    main()
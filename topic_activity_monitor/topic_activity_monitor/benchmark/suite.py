@@ -0,0 +1,245 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Headless benchmark of NetworkStateTracker, ConnectionMonitor and ActivityMonitor.
+
+Each scenario runs the real tracker on a FakeNode with a simulated clock, fed by
+SyntheticPublishers. Partway through, one topic's publisher stops (should go TIMEOUT)
+and another drops to a third of its rate (should go SLOW). Reports:
+  - callbacks/s   subscription callbacks per CPU second spent in them
+  - cpu/topic     CPU time per simulated second per monitored topic (fraction of a core)
+  - discovery     average ConnectionMonitor._update() cost
+  - TIMEOUT/SLOW  simulated seconds from the fault until the status was published
+  - peak subs     most subscriptions open at once
+  - peak MB/s     most bytes delivered to our subscriptions in any LOAD_BIN, as a rate
+  - peak cpu %    most CPU time spent in callbacks in any LOAD_BIN, as a fraction of a core
+
+The suite exits nonzero if a scenario fails a check: the TIMEOUT or SLOW fault was not published,
+more subscriptions were open than --max-subscriptions, or, given --baseline, a metric is worse than
+the same scenario in the baseline by more than --tolerance (a fraction for the CPU metrics,
+--latency-tolerance seconds for TIMEOUT and SLOW, which the simulated clock and SAMPLING_SEED
+make repeatable). The CPU metrics are the best of --repeat runs of each scenario.
+--save-baseline writes the results of a run for later comparison.
+
+    python3 -m topic_activity_monitor.benchmark.suite --topics 10 100 500 --rate 100
+    python3 -m topic_activity_monitor.benchmark.suite --topics 500 --size 100000 --max-subscriptions 20
+    python3 -m topic_activity_monitor.benchmark.suite --save-baseline baseline.json
+    python3 -m topic_activity_monitor.benchmark.suite --baseline baseline.json --tolerance 0.5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from topic_activity_monitor.benchmark.fake_node import FakeClock, FakeNode
+from topic_activity_monitor.benchmark.load_generator import SyntheticPublisher
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus
+from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+
+MSG_TYPE_NAME = "std_msgs/msg/String"
+LOAD_BIN = 0.1  # Simulated seconds per bin when looking for bursts of load
+
+# Compared against the baseline, with whether a higher value is better
+CPU_METRICS = [("callbacks_per_s", True), ("cpu_per_topic", False), ("discovery_s", False), ("peak_cpu", False)]
+LATENCY_METRICS = ["timeout_latency", "slow_latency"]
+
+def write_config(path, topic_names, rate, mode, raw, max_subscriptions=0, max_bandwidth=0.0, publisher_stats=True):
+    with open(path, "w") as config_file:
+        for topic_name in topic_names:
+            config_file.write("[%s]\n" % topic_name)
+            config_file.write("TYPE: %s\n" % MSG_TYPE_NAME)
+            config_file.write("WINDOW_SIZE: 10\n")
+            config_file.write("RECONNECT_WAIT_TIME: 1\n")
+            config_file.write("DEADLINE: %f\n" % (2.0 / rate))
+            config_file.write("TIMEOUT: 1\n")
+            config_file.write("MODE: %s\n" % mode)
+            config_file.write("RAW: %s\n\n" % raw)
+        config_file.write("[SETTINGS]\n")
+        config_file.write('BLACKLIST: ["/topic_status"]\n')
+        config_file.write("MAX_CONCURRENT_SUBSCRIPTIONS: %d\n" % max_subscriptions)
+        config_file.write("MAX_SUBSCRIPTION_BANDWIDTH: %f\n" % max_bandwidth)
+        config_file.write("PUBLISHER_STATS: %s\n" % publisher_stats)
+        # The same schedule every run, so detection latencies can be compared with a baseline
+        config_file.write("SAMPLING_SEED: 0\n")
+
+def run_scenario(topic_count, rate, mode, duration, raw=True, size=64, jitter=0.05, max_subscriptions=0,
+                 max_bandwidth=0.0, publisher_stats=True):
+    """ returns dict of results for one scenario """
+    clock = FakeClock()
+    ros_node = FakeNode(clock)
+    topic_names = ["/load/topic_%d" % i for i in range(topic_count)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = os.path.join(tmp_dir, "benchmark.ini")
+        write_config(config_path, topic_names, rate, mode, raw, max_subscriptions, max_bandwidth, publisher_stats)
+        args = argparse.Namespace(config_path=config_path, shard_count=1, shard_index=0)
+        tracker = NetworkStateTracker(ros_node, args, clock=clock)
+
+    # Record every published status change
+    transitions = list()  # (time, topic_name, ActivityStatus)
+    tracker.update_pub.listeners.append(
+        lambda msg: transitions.append((clock(), msg.topic_name, ActivityStatus(msg.activity_status))))
+
+    publishers = [SyntheticPublisher(ros_node, topic_name, MSG_TYPE_NAME, rate, size=size, jitter=jitter, seed=i)
+                  for i, topic_name in enumerate(topic_names)]
+    start = clock()
+    for i, publisher in enumerate(publishers):
+        publisher.start(start + float(i) / (rate * topic_count))
+
+    def cpu_total():
+        return sum(cpu for _, cpu in ros_node.stats.values())
+
+    # Open subscriptions, delivered bytes and CPU time in every LOAD_BIN
+    load = list()  # (subscriptions, bytes, cpu seconds)
+    last = [ros_node.delivered_bytes, cpu_total()]
+
+    def sample_load():
+        total = cpu_total()
+        load.append((sum(len(subscriptions) for subscriptions in ros_node.subscriptions.values()),
+                     ros_node.delivered_bytes - last[0], total - last[1]))
+        last[:] = [ros_node.delivered_bytes, total]
+        ros_node.schedule(clock() + LOAD_BIN, sample_load)
+    ros_node.schedule(start + LOAD_BIN, sample_load)
+
+    # Let every monitor settle, then inject faults
+    fault_time = start + duration / 2.0
+    ros_node.run_until(fault_time)
+    settled = {name: list(stat) for name, stat in ros_node.stats.items()}
+    publishers[0].stop()
+    if topic_count > 1:
+        publishers[1].set_rate(rate / 3.0)
+    ros_node.run_until(start + duration)
+
+    def detection_latency(topic_name, status):
+        for at, name, activity_status in transitions:
+            if at >= fault_time and name == topic_name and activity_status == status:
+                return at - fault_time
+        return None
+
+    def since_settled(name):
+        calls, cpu = ros_node.stats.get(name, [0, 0.0])
+        settled_calls, settled_cpu = settled.get(name, [0, 0.0])
+        return calls - settled_calls, cpu - settled_cpu
+
+    # Subscriptions take the MessageInfo callback when keeping per publisher statistics
+    callback_calls, callback_cpu = [sum(values) for values in zip(since_settled("ActivityMonitor._topic_callback"),
+                                                                  since_settled("ActivityMonitor._topic_info_callback"))]
+    discovery_calls, discovery_cpu = since_settled("ConnectionMonitor._update")
+    total_cpu = cpu_total() - sum(cpu for _, cpu in settled.values())
+    measured = duration / 2.0
+    return {
+        "callbacks_per_s": callback_calls / callback_cpu if callback_cpu > 0 else 0.0,
+        "cpu_per_topic": total_cpu / measured / topic_count,
+        "discovery_s": discovery_cpu / discovery_calls if discovery_calls > 0 else 0.0,
+        "timeout_latency": detection_latency(topic_names[0], ActivityStatus.TIMEOUT),
+        "slow_latency": detection_latency(topic_names[1], ActivityStatus.SLOW) if topic_count > 1 else None,
+        "updates_published": tracker.update_pub.count,
+        "peak_subscriptions": max(subscriptions for subscriptions, _, _ in load),
+        "peak_bandwidth": max(byte_count for _, byte_count, _ in load) / LOAD_BIN,
+        "peak_cpu": max(cpu for _, _, cpu in load) / LOAD_BIN,
+    }
+
+def best_of(results):
+    """ returns the first of results (dicts of one scenario) with the best value of each CPU metric """
+    best = dict(results[0])
+    for name, higher_is_better in CPU_METRICS:
+        best[name] = (max if higher_is_better else min)(result[name] for result in results)
+    return best
+
+def scenario_name(mode, topic_count):
+    return "%s/%d" % (mode, topic_count)
+
+def check(result, topic_count, max_subscriptions, baseline=None, tolerance=0.5, latency_tolerance=0.05):
+    """ returns list of failure descriptions (str) of one scenario's result, compared with baseline
+    (the same scenario's result from an earlier run) if given
+    """
+    failures = list()
+    if result["timeout_latency"] is None:
+        failures.append("TIMEOUT of the stopped publisher was never published")
+    if topic_count > 1 and result["slow_latency"] is None:
+        failures.append("SLOW of the throttled publisher was never published")
+    if max_subscriptions > 0 and result["peak_subscriptions"] > max_subscriptions:
+        failures.append("%d subscriptions open, over the limit of %d" % (result["peak_subscriptions"], max_subscriptions))
+    if baseline is None:
+        return failures
+
+    for name, higher_is_better in CPU_METRICS:
+        value, reference = result[name], baseline[name]
+        if reference <= 0:
+            continue
+        change = (value - reference) / reference
+        if (-change if higher_is_better else change) > tolerance:
+            failures.append("%s %.4g, baseline %.4g (%+.0f%%)" % (name, value, reference, change * 100.0))
+    for name in LATENCY_METRICS:
+        value, reference = result[name], baseline[name]
+        if reference is not None and value is not None and value > reference + latency_tolerance:
+            failures.append("%s %.3f s, baseline %.3f s" % (name, value, reference))
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser("suite")
+    parser.add_argument("--topics", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--rate", type=float, default=100.0, help="Publish rate (Hz) of every topic")
+    parser.add_argument("--modes", type=str, nargs="+", default=["duty_cycle", "continuous"])
+    parser.add_argument("--duration", type=float, default=20.0, help="Simulated seconds per scenario")
+    parser.add_argument("--size", type=int, default=64, help="Serialized message size in bytes")
+    parser.add_argument("--max-subscriptions", type=int, default=0, help="MAX_CONCURRENT_SUBSCRIPTIONS, 0 for no limit")
+    parser.add_argument("--max-bandwidth", type=float, default=0.0, help="MAX_SUBSCRIPTION_BANDWIDTH (bytes/s), 0 for no limit")
+    parser.add_argument("--no-publisher-stats", action="store_true", help="PUBLISHER_STATS: false")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each scenario, the CPU metrics are the best run's")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--save-baseline", type=str, default=None, help="Write the results as JSON to this path")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Fraction a CPU metric may be worse than the baseline before failing")
+    parser.add_argument("--latency-tolerance", type=float, default=0.05,
+                        help="Seconds TIMEOUT or SLOW detection may be slower than the baseline before failing")
+    args = parser.parse_args()
+
+    baseline = dict()
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    def latency(value):
+        return "%10s" % "-" if value is None else "%10.3f" % value
+
+    print("%-10s %6s %12s %12s %13s %10s %10s %9s %10s %10s %11s" % ("mode", "topics", "callbacks/s", "cpu/topic %",
+                                                                    "discovery ms", "TIMEOUT s", "SLOW s", "updates",
+                                                                    "peak subs", "peak MB/s", "peak cpu %"))
+    results = dict()  # scenario name(str): result
+    for mode in args.modes:
+        for topic_count in args.topics:
+            result = best_of([run_scenario(topic_count, args.rate, mode, args.duration, size=args.size,
+                                           max_subscriptions=args.max_subscriptions, max_bandwidth=args.max_bandwidth,
+                                           publisher_stats=not args.no_publisher_stats) for _ in range(args.repeat)])
+            results[scenario_name(mode, topic_count)] = result
+            print("%-10s %6d %12.0f %12.4f %13.4f %s %s %9d %10d %10.2f %11.1f" % (mode, topic_count, result["callbacks_per_s"],
+                                                                                 result["cpu_per_topic"] * 100.0,
+                                                                                 result["discovery_s"] * 1e3,
+                                                                                 latency(result["timeout_latency"]),
+                                                                                 latency(result["slow_latency"]),
+                                                                                 result["updates_published"],
+                                                                                 result["peak_subscriptions"],
+                                                                                 result["peak_bandwidth"] / 1e6,
+                                                                                 result["peak_cpu"] * 100.0))
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+    failed = False
+    for name, result in results.items():
+        if args.baseline is not None and name not in baseline:
+            print("%s: not in the baseline, only checked for faults" % name)
+        topic_count = int(name.split("/")[1])
+        for failure in check(result, topic_count, args.max_subscriptions, baseline.get(name), args.tolerance,
+                             args.latency_tolerance):
+            print("FAIL %s: %s" % (name, failure))
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,75 @@
 # Author: Dan Brooks [db] ros2@danbrooks.net
 # Date: 2023-09-08
 # License Apache 2
-import time
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
 
-from topic_activity_monitor.lib.find_current_endpoints import find_current_endpoints
-from topic_activity_monitor.lib.topic_status_data import TopicStatusData, ConnectionStatus
+from topic_activity_monitor.lib.graph_watcher import GraphWatcher
+from topic_activity_monitor.lib.topic_status_data import ConnectionStatus
 
 class ConnectionMonitor(object):
-    """ Watches ROS network for topic publishers and subscribers 
-    Updates TopicActivityMonitor.topics dictionary
+    """ Watches ROS network for topic publishers and subscribers
+    Updates the connection_status of NetworkStateTracker.topics
     """
     def __init__(self, ros_node, network_state_tracker):
         self.ros_node = ros_node
         self.logger = ros_node.get_logger()
         self.network_state_tracker = network_state_tracker
-        
-        self._update_timer = self.ros_node.create_timer(0.1, self._update)
 
-    def _update(self):
-        """  updates topic connection statuses 
-        Called by _update_timer """
-        publishers, subscribers = find_current_endpoints(self.ros_node)
+        self.graph_watcher = GraphWatcher(ros_node, ignore_topic=network_state_tracker.ignore_topic,
+                                          clock=network_state_tracker.clock)
+        self._scan = network_state_tracker.instrument("graph_scan", self.graph_watcher.scan)
+        self._first_update = True
 
-        all_topic_names = list(publishers.keys()) + list(subscribers.keys())
+        # Discovery runs in its own callback group so it doesn't hold up the ActivityMonitors
+        self._callback_group = MutuallyExclusiveCallbackGroup()
+        update = network_state_tracker.instrument("discovery_update", self._update)
+        update = network_state_tracker.instrument_timer("discovery_timer_lag", 0.1, update)
+        self._update_timer = self.ros_node.create_timer(0.1, update, callback_group=self._callback_group)
 
-        # Add New Topics
-        for topic_name in all_topic_names:
-            # Skip topics in blacklist
-            if self.network_state_tracker.check_blacklist(topic_name):
-                continue
-            # Add new topics to list
-            if topic_name not in self.network_state_tracker.topics.keys():
-                msg_type_name = publishers[topic_name] if topic_name in publishers else subscribers[topic_name]
-                self.network_state_tracker.topics[topic_name] = TopicStatusData(topic_name, msg_type_name, self.logger)
-                self.logger.info("Adding topic %s" % topic_name)
+    def _update(self):
+        """ updates topic connection statuses
+        Called by _update_timer
+        """
+        changed_topic_names = self._scan()
+        endpoints = self.graph_watcher.endpoints
 
-        # Update topics TopicStatusData.connection_status
-        for topic_name, topic_status_data in self.network_state_tracker.topics.items():
-            if topic_name in publishers.keys():
-                topic_status_data.connection_status = ConnectionStatus.PRESENT
-            elif topic_name in subscribers.keys():
-                topic_status_data.connection_status = ConnectionStatus.MISSING
-            else:
-                topic_status_data.connection_status = ConnectionStatus.DISCONNECTED
+        with self.network_state_tracker.topics_lock:
+            self._update_topics(changed_topic_names, endpoints)
+            activity_monitors = [self.network_state_tracker.activity_monitors[topic_name] for topic_name in changed_topic_names
+                                 if topic_name in self.network_state_tracker.activity_monitors]
 
-            # Publish update for this topic
-            topic_status_data.timestamp = time.time()
-            self.network_state_tracker.update_pub.publish(topic_status_data.to_msg())
+        # Monitors choose their QoS from the publishers, and take their own lock before topics_lock (see NetworkStateTracker)
+        for activity_monitor in activity_monitors:
+            activity_monitor.publishers_changed()
 
+    def _update_topics(self, changed_topic_names, endpoints):
+        """ Sets connection_status of changed topics, caller must hold network_state_tracker.topics_lock """
+        # Topics from the config that have never been seen still need a connection status
+        if self._first_update:
+            self._first_update = False
+            changed_topic_names = set(changed_topic_names) | set(self.network_state_tracker.topics.keys())
 
+        topic_ids = list()
+        statuses = list()
+        for topic_name in changed_topic_names:
+            endpoint = endpoints.get(topic_name)
 
+            # Add new topics to list
+            if topic_name not in self.network_state_tracker.topics.keys():
+                if endpoint is None:
+                    continue
+                msg_type_name = endpoint[0]
+                self.network_state_tracker.add_topic(topic_name, msg_type_name)
+                self.logger.info("Adding topic %s" % topic_name)
+                self.network_state_tracker.auto_monitor(topic_name)
 
+            topic_ids.append(self.network_state_tracker.topics[topic_name].topic_id)
+            if endpoint is not None and endpoint[1] > 0:
+                statuses.append(ConnectionStatus.PRESENT.value)
+            elif endpoint is not None and endpoint[2] > 0:
+                statuses.append(ConnectionStatus.MISSING.value)
+            else:
+                statuses.append(ConnectionStatus.DISCONNECTED.value)
 
+        # Update the connection_status column all at once, and publish updates for topics whose status changed
+        self.network_state_tracker.set_connection_statuses(topic_ids, statuses)
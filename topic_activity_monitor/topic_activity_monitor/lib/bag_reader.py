@@ -0,0 +1,100 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import glob
+import os
+import sqlite3
+
+import numpy as np
+
+class BagTimestamps(object):
+    """ Receive timestamps of every message in a rosbag2 recording, per topic, without the payloads.
+
+    path is a bag directory or a single .db3 or .mcap file. sqlite3 storage only reads the topic id
+    and timestamp columns of the messages table. mcap storage needs the mcap package, and its
+    reader decompresses the chunks (payloads included) to get at the log times.
+
+        bag = BagTimestamps("rosbag2_2026_10_18-12_00_00")
+        bag.topics["/image_raw"]   # numpy float64 array of seconds since the epoch, sorted
+    """
+    def __init__(self, path):
+        self.topics = dict()     # name(str): timestamps(np.ndarray)
+        self.msg_types = dict()  # name(str): msg_type_name(str)
+        self.start = None        # Earliest timestamp of any message
+        self.end = None          # Latest timestamp of any message
+
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, "*.db3")) + glob.glob(os.path.join(path, "*.mcap")))
+            if len(files) == 0:
+                raise ValueError("No .db3 or .mcap files in '%s'" % path)
+        else:
+            files = [path]
+
+        stamps = dict()  # name(str): [np.ndarray of ns]
+        for file_path in files:
+            if file_path.endswith(".mcap"):
+                self._read_mcap(file_path, stamps)
+            else:
+                self._read_sqlite(file_path, stamps)
+
+        for topic_name, arrays in stamps.items():
+            timestamps = np.sort(np.concatenate(arrays)) * 1e-9
+            self.topics[topic_name] = timestamps
+            if len(timestamps) > 0:
+                self.start = timestamps[0] if self.start is None else min(self.start, timestamps[0])
+                self.end = timestamps[-1] if self.end is None else max(self.end, timestamps[-1])
+
+    def _read_sqlite(self, file_path, stamps):
+        connection = sqlite3.connect("file:%s?mode=ro" % file_path, uri=True)
+        try:
+            names = dict()  # topic id(int): name(str)
+            for topic_id, topic_name, msg_type_name in connection.execute("SELECT id, name, type FROM topics"):
+                names[topic_id] = topic_name
+                self.msg_types[topic_name] = msg_type_name
+                stamps.setdefault(topic_name, list())
+            rows = np.fromiter(connection.execute("SELECT topic_id, timestamp FROM messages"),
+                               dtype=[("topic_id", np.int64), ("timestamp", np.int64)])
+        finally:
+            connection.close()
+        # Group by topic id with one sort instead of a query per topic
+        rows = rows[np.argsort(rows["topic_id"], kind="stable")]
+        topic_ids, first = np.unique(rows["topic_id"], return_index=True)
+        for topic_id, timestamps in zip(topic_ids, np.split(rows["timestamp"], first[1:])):
+            stamps[names[int(topic_id)]].append(timestamps)
+
+    def _read_mcap(self, file_path, stamps):
+        try:
+            from mcap.reader import make_reader
+        except ImportError:
+            raise ValueError("Reading '%s' needs the mcap package (pip install mcap)" % file_path)
+        log_times = dict()  # channel id(int): [int]
+        channels = dict()   # channel id(int): name(str)
+        with open(file_path, "rb") as mcap_file:
+            reader = make_reader(mcap_file)
+            for schema, channel, message in reader.iter_messages(log_time_order=False):
+                if channel.id not in channels:
+                    channels[channel.id] = channel.topic
+                    self.msg_types[channel.topic] = schema.name if schema is not None else ""
+                    log_times[channel.id] = list()
+                log_times[channel.id].append(message.log_time)
+        for channel_id, times in log_times.items():
+            stamps.setdefault(channels[channel_id], list()).append(np.array(times, dtype=np.int64))
+
+def example():
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), "example.db3")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE topics(id INTEGER PRIMARY KEY, name TEXT NOT NULL, type TEXT NOT NULL, "
+                       "serialization_format TEXT NOT NULL, offered_qos_profiles TEXT NOT NULL)")
+    connection.execute("CREATE TABLE messages(id INTEGER PRIMARY KEY, topic_id INTEGER NOT NULL, "
+                       "timestamp INTEGER NOT NULL, data BLOB NOT NULL)")
+    connection.execute("INSERT INTO topics VALUES (1, '/image_raw', 'sensor_msgs/msg/Image', 'cdr', '')")
+    connection.executemany("INSERT INTO messages(topic_id, timestamp, data) VALUES (1, ?, x'00')",
+                           [(1760000000000000000 + i * 100000000,) for i in range(50)])
+    connection.commit()
+    connection.close()
+    bag = BagTimestamps(path)
+    print("%s: %d messages over %.1f s" % ("/image_raw", len(bag.topics["/image_raw"]), bag.end - bag.start))
+
+if __name__ == "__main__":
+    example()
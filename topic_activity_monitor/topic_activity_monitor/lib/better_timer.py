@@ -1,18 +1,50 @@
-import rclpy
+from functools import partial
+from threading import Lock
 
 class BetterTimer(object):
-    """ This wrapper around rclpy.Node.create_timer that tracks the duration to allow stopping and restarting """
-    def __init__(self, ros_node, time, callback):
-        self._ros_node = ros_node
+    """ Periodic timer on a TimingWheel that tracks the duration to allow stopping and restarting.
+    Starting, resetting and canceling only arm and disarm a wheel deadline, no ROS timers are created.
+
+    The wheel calls back on its own thread while start(), reset() and cancel() run on executor threads.
+    Every arming gets a new generation, and a deadline only rearms and calls back if its generation
+    is still current, so one the wheel had already taken when the timer was reset or canceled is dropped.
+    """
+    def __init__(self, timing_wheel, time, callback):
+        self._timing_wheel = timing_wheel
         self._time = time
-        self._timer = None
+        self._wheel_timer = None
+        self._generation = 0
+        self._lock = Lock()
         self._callback = callback
 
+    def set_time(self, time):
+        """ changes the duration, from the next start() or reset() on """
+        self._time = time
+
     def start(self):
-        self._timer = self._ros_node.create_timer(self._time, self._callback)
+        with self._lock:
+            self._cancel()
+            self._wheel_timer = self._timing_wheel.schedule(self._time, partial(self._fire, self._generation))
 
     def cancel(self):
-        if self._timer is not None:
-            self._timer.cancel()
-            self._timer = None
+        with self._lock:
+            self._cancel()
+
+    def _cancel(self):
+        self._generation += 1
+        if self._wheel_timer is not None:
+            self._timing_wheel.cancel(self._wheel_timer)
+            self._wheel_timer = None
+
+    def reset(self):
+        """ restart the countdown """
+        self.start()
 
+    def _fire(self, generation):
+        with self._lock:
+            if generation != self._generation:
+                return  # Reset or canceled after the wheel took this deadline
+            # Periodic like the rclpy timer this replaced, rearm before calling back. From the deadline
+            # that fired rather than from now, so the period doesn't grow by the wheel's lateness
+            self._wheel_timer = self._timing_wheel.schedule_after(self._wheel_timer, self._time, partial(self._fire, generation))
+        self._callback()
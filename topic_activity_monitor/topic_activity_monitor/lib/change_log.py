@@ -0,0 +1,39 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from collections import OrderedDict
+import uuid
+
+class ChangeLog(object):
+    """ Numbers every change to the topics table with a monotonic version, so clients can ask
+    for the topics changed since the version they last saw. Keeps only the latest version of
+    each topic, ordered by version, so changed_since() costs O(topics returned).
+    Versions restart at 0 with the process, so each ChangeLog has a random epoch that clients
+    send back with their version, see covers().
+    Not thread safe, callers lock around it.
+    """
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self._versions = OrderedDict()  # topic_name(str): version of its last change, oldest first
+
+    def changed(self, topic_name):
+        self.version += 1
+        self._versions[topic_name] = self.version
+        self._versions.move_to_end(topic_name)
+
+    def covers(self, epoch, version):
+        """ returns True if changed_since(version) has every change a client at epoch and version missed,
+        False if it needs every topic: it has seen none (version 0) or its version is from another epoch
+        """
+        return version > 0 and epoch == self.epoch and version <= self.version
+
+    def changed_since(self, version):
+        """ returns the names of the topics changed after version, oldest change first """
+        topic_names = list()
+        for topic_name, topic_version in reversed(self._versions.items()):
+            if topic_version <= version:
+                break
+            topic_names.append(topic_name)
+        topic_names.reverse()
+        return topic_names
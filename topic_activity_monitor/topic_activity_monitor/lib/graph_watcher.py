@@ -0,0 +1,131 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import time
+
+from threading import Lock
+
+class GraphWatcher(object):
+    """ Tracks the msg type, publisher count and subscriber count of every topic on the ROS graph.
+
+    The graph is only rescanned after rclpy reports a graph change (or every full_scan_period
+    seconds as a safety net). A scan makes the same two endpoint queries per node as the scan it
+    replaced, and scan() returns only the topics whose endpoints changed since the last scan.
+
+    Our own monitoring subscriptions don't count as subscribers, so the graph events they cause
+    can't change anything. Call own_change() before one is created or destroyed, and the next event
+    doesn't trigger a scan. rmw coalesces events, so that one event stands for every own change
+    pending, and any event after it triggers a scan. A change of another node is only missed if it
+    is reported by the same event as ours (or arrives before it), and then seen at the next event
+    or full scan.
+    """
+    def __init__(self, ros_node, ignore_topic=None, full_scan_period=5.0, clock=time.time):
+        self._ros_node = ros_node
+        self._clock = clock
+        self.logger = ros_node.get_logger()
+        self._ignore_topic = ignore_topic            # callable(topic_name) -> True to skip topic
+        self._full_scan_period = full_scan_period
+
+        self.endpoints = dict()  # name(str): [msg_type_name(str), publisher_count(int), subscriber_count(int)]
+
+        self._graph_changed = True
+        self._last_scan_time = 0.0
+        self._own_changes = 0        # own_change() calls not yet matched by a graph event
+        self._own_changes_lock = Lock()
+        self.own_events = 0          # graph events that were ours and didn't trigger a scan
+
+        # Without graph events we fall back to scanning on every call
+        self._graph_listener = None
+        self.event_driven = False
+        try:
+            self._graph_listener = self._graph_listener_of(ros_node)
+            self._graph_listener.add_callback(ros_node.handle, self.notify_graph_change)
+            self.event_driven = True
+        except (ImportError, AttributeError, TypeError, ValueError) as e:
+            self._graph_listener = None
+            self.logger.warn("Graph change events unavailable (%s), scanning graph on every update" % e)
+
+    @staticmethod
+    def _graph_listener_of(ros_node):
+        """ returns the rclpy GraphListenerSingleton, if it can report the graph changes of ros_node """
+        from rclpy.graph_listener import GraphListenerSingleton
+        from rclpy.utilities import get_default_context
+        # The singleton waits on, and shuts down with, the default context, so nodes of other
+        # contexts (the extra domains of a multi domain monitor) poll
+        if ros_node.context is not get_default_context():
+            raise ValueError("node is not in the default context")
+        return GraphListenerSingleton()
+
+    def destroy(self):
+        if self._graph_listener is not None:
+            self._graph_listener.remove_callback(self._ros_node.handle, self.notify_graph_change)
+            self._graph_listener = None
+            self.event_driven = False
+
+    def own_change(self):
+        """ Called before this node creates or destroys a monitoring subscription """
+        with self._own_changes_lock:
+            self._own_changes += 1
+
+    def notify_graph_change(self):
+        """ Called (from the rclpy graph listener thread) when the ROS graph changes """
+        with self._own_changes_lock:
+            if self._own_changes > 0:
+                self._own_changes = 0
+                self.own_events += 1
+                return
+        self._graph_changed = True
+
+    def scan(self):
+        """ returns list of topic names whose endpoints changed since the previous scan """
+        now = self._clock()
+        if self.event_driven and not self._graph_changed and now - self._last_scan_time < self._full_scan_period:
+            return []
+        # Clear the flag before scanning so changes made during the scan trigger another one
+        self._graph_changed = False
+        self._last_scan_time = now
+
+        current = self._scan_by_node(self._ros_node.get_node_names_and_namespaces())
+
+        previous = self.endpoints
+        self.endpoints = current
+        # Most scans find nothing changed, which one dict comparison tells
+        if current == previous:
+            return []
+        changed = [name for name, endpoint in current.items() if not previous.get(name) == endpoint]
+        changed += [name for name in previous.keys() if name not in current]
+        return changed
+
+    def _scan_by_node(self, nodes):
+        """ returns {name(str): [msg_type_name(str), publisher count, subscriber count]}, counting the nodes
+        with an endpoint on each topic from two endpoint queries per node. The msg type comes from the
+        endpoint lists, so the topics don't need listing separately
+        """
+        current = dict()
+        previous = self.endpoints
+        own_node = (self._ros_node.get_name(), self._ros_node.get_namespace())
+        for node_name, node_namespace in nodes:
+            for topic_name, msg_type_names in self._ros_node.get_publisher_names_and_types_by_node(node_name, node_namespace):
+                endpoint = current.get(topic_name)
+                if endpoint is not None:
+                    endpoint[1] += 1
+                    continue
+                current[topic_name] = [msg_type_names[0], 1, 0]
+                if len(msg_type_names) > 1 and topic_name not in previous:
+                    self.logger.warn("Topic %s has multiple types!" % topic_name)
+            # Our own monitoring subscriptions should not count as subscribers
+            if (node_name, node_namespace) == own_node:
+                continue
+            for topic_name, msg_type_names in self._ros_node.get_subscriber_names_and_types_by_node(node_name, node_namespace):
+                endpoint = current.get(topic_name)
+                if endpoint is not None:
+                    endpoint[2] += 1
+                    continue
+                current[topic_name] = [msg_type_names[0], 0, 1]
+                if len(msg_type_names) > 1 and topic_name not in previous:
+                    self.logger.warn("Topic %s has multiple types!" % topic_name)
+
+        if self._ignore_topic is not None:
+            ignore_topic = self._ignore_topic
+            current = {topic_name: endpoint for topic_name, endpoint in current.items() if not ignore_topic(topic_name)}
+        return current
@@ -0,0 +1,64 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import bisect
+import hashlib
+
+def stable_hash(key):
+    """ 64 bit hash of a string that is the same in every process (unlike hash()) """
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+class HashRing(object):
+    """ Consistent hash ring. Each node is placed on the ring at `replicas` points so keys spread
+    evenly, and adding or removing a node only moves the keys that node gains or loses.
+    """
+    def __init__(self, nodes=None, replicas=64):
+        self._replicas = replicas
+        self._nodes = set()
+        self._points = list()  # sorted hashes
+        self._owners = list()  # node at the same index in _points
+        for node in nodes or list():
+            self.add_node(node)
+
+    @property
+    def nodes(self):
+        return set(self._nodes)
+
+    def add_node(self, node):
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self._replicas):
+            point = stable_hash("%s#%d" % (node, i))
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node):
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        keep = [i for i, owner in enumerate(self._owners) if not owner == node]
+        self._points = [self._points[i] for i in keep]
+        self._owners = [self._owners[i] for i in keep]
+
+    def get_node(self, key):
+        """ returns the node that owns key, or None if the ring is empty """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, stable_hash(key))
+        if index == len(self._points):
+            index = 0
+        return self._owners[index]
+
+def example():
+    ring = HashRing(["shard_0", "shard_1", "shard_2"])
+    topics = ["/topic_%d" % i for i in range(10)]
+    before = {topic: ring.get_node(topic) for topic in topics}
+    print(before)
+    ring.remove_node("shard_1")
+    moved = [topic for topic in topics if not ring.get_node(topic) == before[topic]]
+    print("Moved after removing shard_1:", moved)
+
+if __name__ == "__main__":
+    example()
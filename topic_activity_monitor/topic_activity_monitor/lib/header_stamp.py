@@ -0,0 +1,34 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import struct
+
+# A serialized message starts with a 4 byte CDR encapsulation header, whose second byte is odd for
+# little endian data. std_msgs/Header starts with builtin_interfaces/Time (int32 sec, uint32 nanosec),
+# so in a message whose first field is the header, header.stamp is the 8 bytes after the encapsulation.
+HEADER_STAMP_OFFSET = 4
+_STAMP = (struct.Struct(">iI"), struct.Struct("<iI"))  # by endianness bit
+
+def has_header(msg_type):
+    """ returns True if the first field of message class msg_type is a std_msgs/Header """
+    fields = msg_type.get_fields_and_field_types()
+    return len(fields) > 0 and next(iter(fields.values())) == "std_msgs/Header"
+
+def stamp_from_cdr(data):
+    """ returns header.stamp (seconds) of a serialized message that starts with a std_msgs/Header,
+    without deserializing it
+    """
+    sec, nanosec = _STAMP[data[1] & 1].unpack_from(data, HEADER_STAMP_OFFSET)
+    return sec + nanosec * 1e-9
+
+def stamp_from_msg(msg):
+    """ returns header.stamp (seconds) of a deserialized message """
+    stamp = msg.header.stamp
+    return stamp.sec + stamp.nanosec * 1e-9
+
+def example():
+    data = b"\x00\x01\x00\x00" + _STAMP[1].pack(1760000000, 250000000) + b"\x06\x00\x00\x00frame\x00"
+    print("header.stamp %.3f" % stamp_from_cdr(data))
+
+if __name__ == "__main__":
+    example()
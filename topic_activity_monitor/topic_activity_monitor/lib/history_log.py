@@ -0,0 +1,170 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import mmap
+import os
+import struct
+import time
+
+from threading import Lock
+
+import numpy as np
+
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, ConnectionStatus
+
+MAGIC = b"TAMH"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQ")  # magic, version, capacity (records), records written (ever)
+HEADER_SIZE = 32                  # HEADER padded so records stay aligned
+WRITTEN_OFFSET = 16               # Offset of records written in HEADER
+RECORD = struct.Struct("<dIBBH")  # timestamp, topic id, connection status, activity status, padding
+RECORD_DTYPE = np.dtype([("timestamp", "<f8"), ("topic_id", "<u4"), ("connection_status", "u1"),
+                         ("activity_status", "u1"), ("padding", "<u2")])
+assert(RECORD_DTYPE.itemsize == RECORD.size)
+
+class HistoryLog(object):
+    """ Appends status transitions to a memory mapped ring file of fixed size (16 byte) records.
+
+    The file holds the last capacity transitions and never grows. Topic names are stored once,
+    one per line, in path + ".topics", and records refer to them by line number.
+    An existing file is appended to, keeping the capacity it was created with.
+    """
+    def __init__(self, path, capacity=1000000, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = Lock()
+
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        self._file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            magic, version, capacity, written = HEADER.unpack(self._file.read(HEADER.size))
+            if not magic == MAGIC or not version == VERSION:
+                raise ValueError("'%s' is not a version %d history file" % (path, VERSION))
+        else:
+            written = 0
+            self._file.truncate(HEADER_SIZE + capacity * RECORD.size)
+            self._file.write(HEADER.pack(MAGIC, VERSION, capacity, written))
+            self._file.flush()
+        self.capacity = capacity
+        self._written = written
+        self._mmap = mmap.mmap(self._file.fileno(), HEADER_SIZE + capacity * RECORD.size)
+
+        self._topic_ids = dict()  # name(str): id(int)
+        names_path = path + ".topics"
+        if exists and os.path.exists(names_path):
+            with open(names_path) as names_file:
+                for topic_id, topic_name in enumerate(names_file.read().splitlines()):
+                    self._topic_ids[topic_name] = topic_id
+        self._names_file = open(names_path, "a" if exists else "w")
+
+    def record(self, topic_status_data, timestamp=None):
+        """ appends the current status of topic_status_data at timestamp (defaults to now),
+        used as TopicStatusData.on_transition
+        """
+        with self._lock:
+            topic_id = self._topic_ids.get(topic_status_data.topic_name)
+            if topic_id is None:
+                topic_id = len(self._topic_ids)
+                self._topic_ids[topic_status_data.topic_name] = topic_id
+                self._names_file.write(topic_status_data.topic_name + "\n")
+                self._names_file.flush()
+            RECORD.pack_into(self._mmap, HEADER_SIZE + (self._written % self.capacity) * RECORD.size,
+                             self._clock() if timestamp is None else timestamp, topic_id, topic_status_data.connection_status.value,
+                             topic_status_data.activity_status.value, 0)
+            self._written += 1
+            struct.pack_into("<Q", self._mmap, WRITTEN_OFFSET, self._written)
+
+    def close(self):
+        with self._lock:
+            self._mmap.flush()
+            self._mmap.close()
+            self._file.close()
+            self._names_file.close()
+
+class HistoryReader(object):
+    """ Loads the records of a HistoryLog file, oldest first, into a numpy structured array.
+    Reading while the monitor is writing is fine, records added after loading are not seen.
+    """
+    def __init__(self, path):
+        with open(path + ".topics") as names_file:
+            self.topic_names = names_file.read().splitlines()
+        self._topic_ids = {topic_name: topic_id for topic_id, topic_name in enumerate(self.topic_names)}
+
+        with open(path, "rb") as history_file:
+            with mmap.mmap(history_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                magic, version, capacity, written = HEADER.unpack_from(data)
+                if not magic == MAGIC or not version == VERSION:
+                    raise ValueError("'%s' is not a version %d history file" % (path, VERSION))
+                records = np.frombuffer(data, dtype=RECORD_DTYPE, count=min(written, capacity), offset=HEADER_SIZE)
+                start = written % capacity if written > capacity else 0
+                self.records = np.concatenate((records[start:], records[:start]))
+                del records  # Release the buffer before the mmap closes
+        # Writers on several threads can interleave by a few microseconds
+        self.records = self.records[np.argsort(self.records["timestamp"], kind="stable")]
+
+    def topic_ids(self, topic_names):
+        return [self._topic_ids[topic_name] for topic_name in topic_names if topic_name in self._topic_ids]
+
+    def query(self, topic_ids=None, since=None, until=None, activity_status=None, connection_status=None):
+        """ returns the records matching every given condition
+        topic_ids, activity_status and connection_status are lists of accepted values
+        """
+        records = self.records
+        mask = np.ones(len(records), dtype=bool)
+        if topic_ids is not None:
+            mask &= np.isin(records["topic_id"], topic_ids)
+        if since is not None:
+            mask &= records["timestamp"] >= since
+        if until is not None:
+            mask &= records["timestamp"] <= until
+        if activity_status is not None:
+            mask &= np.isin(records["activity_status"], activity_status)
+        if connection_status is not None:
+            mask &= np.isin(records["connection_status"], connection_status)
+        return records[mask]
+
+    def time_in_status(self, since, until, topic_ids=None, field="activity_status"):
+        """ returns {topic id: array of seconds spent in each status value} between since and until.
+        A topic is in the status of its last record until its next one.
+        """
+        result = dict()
+        statuses = max(len(ActivityStatus), len(ConnectionStatus))
+        records = self.records[self.records["timestamp"] <= until]
+        for topic_id in (np.unique(records["topic_id"]) if topic_ids is None else topic_ids):
+            topic_records = records[records["topic_id"] == topic_id]
+            if len(topic_records) == 0:
+                continue
+            starts = topic_records["timestamp"]
+            ends = np.append(starts[1:], until)
+            durations = np.clip(ends, since, until) - np.clip(starts, since, until)
+            result[int(topic_id)] = np.bincount(topic_records[field], weights=durations, minlength=statuses)
+        return result
+
+def example():
+    import tempfile
+
+    class Status(object):
+        def __init__(self, value):
+            self.value = value
+
+    class Topic(object):
+        topic_name = "/image_raw"
+        connection_status = Status(1)
+        activity_status = Status(1)
+
+    now = [1000.0]
+    path = os.path.join(tempfile.mkdtemp(), "history")
+    history_log = HistoryLog(path, capacity=4, clock=lambda: now[0])
+    topic = Topic()
+    for activity_status in [1, 2, 1, 3, 1, 2]:  # Wraps around the 4 records
+        topic.activity_status = Status(activity_status)
+        history_log.record(topic)
+        now[0] += 10.0
+    history_log.close()
+
+    reader = HistoryReader(path)
+    print(reader.records)
+    print("seconds per activity status", reader.time_in_status(1000.0, now[0])[0][:4])
+
+if __name__ == "__main__":
+    example()
@@ -0,0 +1,125 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import bisect
+import functools
+import os
+import time
+
+class Histogram(object):
+    """ Histogram of durations (seconds) with fixed power of two buckets from 1us to ~1s. observe() is O(1) """
+    BOUNDS = [1e-6 * 2 ** i for i in range(21)]
+
+    __slots__ = ["counts", "count", "sum", "max"]
+
+    def __init__(self):
+        self.counts = [0] * (len(Histogram.BOUNDS) + 1)  # Last bucket is everything above the largest bound
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(Histogram.BOUNDS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """ upper bound of the bucket holding the q-th percentile, q in [0, 100] """
+        if self.count == 0:
+            return 0.0
+        target = self.count * q / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count > 0:
+                return Histogram.BOUNDS[index] if index < len(Histogram.BOUNDS) else self.max
+        return self.max
+
+class Instrumentation(object):
+    """ Counters and duration histograms describing the monitor's own performance.
+    Updates are not locked: with several executor threads a concurrent update can occasionally be lost,
+    which is acceptable for these statistics and keeps the hot path cheap.
+    """
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self.counters = dict()    # name(str): total(int)
+        self.histograms = dict()  # name(str): Histogram()
+
+    def increment(self, name, count=1):
+        self.counters[name] = self.counters.get(name, 0) + count
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(value)
+
+    def timed(self, name, callback):
+        """ returns callback wrapped to record how long each call takes in histogram name """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        perf_counter = time.perf_counter
+
+        @functools.wraps(callback)
+        def timed_callback(*args):
+            start = perf_counter()
+            try:
+                return callback(*args)
+            finally:
+                histogram.observe(perf_counter() - start)
+        return timed_callback
+
+    def lagged(self, name, period, callback):
+        """ returns periodic timer callback wrapped to record how late each call is in histogram name """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        clock = self._clock
+        expected = [clock() + period]
+
+        @functools.wraps(callback)
+        def lagged_callback(*args):
+            now = clock()
+            histogram.observe(max(now - expected[0], 0.0))
+            expected[0] = now + period
+            return callback(*args)
+        return lagged_callback
+
+    def to_prometheus(self, prefix="topic_activity_monitor"):
+        """ returns the metrics in the Prometheus text exposition format """
+        lines = list()
+        for name, total in sorted(self.counters.items()):
+            lines.append("# TYPE %s_%s_total counter" % (prefix, name))
+            lines.append("%s_%s_total %d" % (prefix, name, total))
+        for name, histogram in sorted(self.histograms.items()):
+            metric = "%s_%s_seconds" % (prefix, name)
+            lines.append("# TYPE %s histogram" % metric)
+            cumulative = 0
+            for bound, count in zip(Histogram.BOUNDS, histogram.counts):
+                cumulative += count
+                lines.append('%s_bucket{le="%g"} %d' % (metric, bound, cumulative))
+            lines.append('%s_bucket{le="+Inf"} %d' % (metric, histogram.count))
+            lines.append("%s_sum %.9f" % (metric, histogram.sum))
+            lines.append("%s_count %d" % (metric, histogram.count))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """ writes to_prometheus() to path atomically, for the node exporter textfile collector """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as metrics_file:
+            metrics_file.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+def example():
+    instrumentation = Instrumentation()
+    callback = instrumentation.timed("callback", lambda: sum(range(1000)))
+    for _ in range(100):
+        callback()
+    instrumentation.increment("subscriptions_created", 3)
+    print(instrumentation.to_prometheus())
+
+if __name__ == "__main__":
+    example()
@@ -0,0 +1,41 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from threading import Lock, Thread
+
+from rosidl_runtime_py.utilities import get_message
+
+# Raised by get_message() for malformed names and message packages that are not installed
+MESSAGE_TYPE_ERRORS = (AttributeError, ModuleNotFoundError, ValueError)
+
+_lock = Lock()
+_types = dict()  # msg_type_name(str): message class
+
+def get_message_type(msg_type_name):
+    """ returns the message class for msg_type_name (e.g. "sensor_msgs/msg/Image").
+    The interface package is imported on first use, and the class is cached for every later call.
+    """
+    msg_type = _types.get(msg_type_name)
+    if msg_type is None:
+        with _lock:
+            msg_type = _types.get(msg_type_name)
+            if msg_type is None:
+                msg_type = get_message(msg_type_name)
+                _types[msg_type_name] = msg_type
+    return msg_type
+
+def prefetch(msg_type_names, logger=None):
+    """ imports msg_type_names on a background thread, so they are cached before they are needed.
+    returns the Thread
+    """
+    def run():
+        for msg_type_name in msg_type_names:
+            try:
+                get_message_type(msg_type_name)
+            except MESSAGE_TYPE_ERRORS as e:
+                if logger is not None:
+                    logger.warn("Can't load message type %s: %s" % (msg_type_name, e))
+
+    thread = Thread(target=run, name="message_type_prefetch", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,129 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor_msgs.msg import NamespaceStatus
+
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, ConnectionStatus
+
+# Counted per namespace, the indexes into NamespaceNode.counts
+TOPICS, PRESENT, MISSING, ACTIVE, SLOW, TIMEOUT, LATE, STALE, BANDWIDTH_EXCEEDED = range(9)
+_CONNECTION_COUNTERS = {ConnectionStatus.PRESENT: PRESENT, ConnectionStatus.MISSING: MISSING}
+_ACTIVITY_COUNTERS = {ActivityStatus.ACTIVE: ACTIVE, ActivityStatus.SLOW: SLOW, ActivityStatus.TIMEOUT: TIMEOUT,
+                      ActivityStatus.LATE: LATE, ActivityStatus.STALE: STALE,
+                      ActivityStatus.BANDWIDTH_EXCEEDED: BANDWIDTH_EXCEEDED}
+
+class NamespaceNode(object):
+    """ A namespace of the trie, with the counts of the topics under it at any depth """
+    __slots__ = ["namespace", "children", "counts", "published"]
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.children = dict()        # name(str): NamespaceNode()
+        self.counts = [0] * 9         # by counter index
+        self.published = None         # counts last returned by NamespaceRollup.changed()
+
+class NamespaceRollup(object):
+    """ Health summary of every namespace prefix of the tracked topics, kept current incrementally.
+
+    Each topic counts towards "/" and every namespace above it: /perception/camera/image_raw
+    towards "/", /perception and /perception/camera. update() moves a topic between counters along
+    that path, so a status transition costs O(depth) however many topics there are, and changed()
+    returns just the namespaces whose counts differ from the last time they were returned.
+    Not thread safe, NetworkStateTracker calls it under topics_lock.
+
+        rollup.update(topic_status_data)   # from TopicStatusData.on_transition
+        for node in rollup.changed():
+            publish(rollup.to_msg(node, now))
+    """
+    def __init__(self, domain_id=0):
+        self.domain_id = domain_id
+        self.root = NamespaceNode("/")
+        self._topics = dict()   # topic name(str): ([NamespaceNode] from the root down, counter indexes it counts towards)
+        self._changed = dict()  # NamespaceNode: None, the namespaces updated since changed(), in first update order
+
+    def _path(self, topic_name):
+        """ returns [NamespaceNode] of the namespaces above topic_name, creating the missing ones """
+        node = self.root
+        path = [node]
+        for name in topic_name.strip("/").split("/")[:-1]:
+            child = node.children.get(name)
+            if child is None:
+                child = NamespaceNode(node.namespace.rstrip("/") + "/" + name)
+                node.children[name] = child
+            node = child
+            path.append(node)
+        return path
+
+    def update(self, topic_status_data):
+        """ counts topic_status_data under its current connection and activity status """
+        counters = [TOPICS]
+        connection_counter = _CONNECTION_COUNTERS.get(topic_status_data.connection_status)
+        if connection_counter is not None:
+            counters.append(connection_counter)
+        activity_counter = _ACTIVITY_COUNTERS.get(topic_status_data.activity_status)
+        if activity_counter is not None:
+            counters.append(activity_counter)
+
+        entry = self._topics.get(topic_status_data.topic_name)
+        if entry is None:
+            path, counted = self._path(topic_status_data.topic_name), []
+        else:
+            path, counted = entry
+            if counted == counters:
+                return
+        self._topics[topic_status_data.topic_name] = (path, counters)
+
+        for node in path:
+            counts = node.counts
+            for counter in counted:
+                counts[counter] -= 1
+            for counter in counters:
+                counts[counter] += 1
+            self._changed[node] = None
+
+    def get(self, namespace):
+        """ returns the NamespaceNode of namespace, or None """
+        node = self.root
+        for name in namespace.strip("/").split("/"):
+            if name:
+                node = node.children.get(name)
+                if node is None:
+                    return None
+        return node
+
+    def changed(self):
+        """ returns [NamespaceNode] whose counts changed since they were last returned, parents first """
+        nodes = [node for node in self._changed if not node.counts == node.published]
+        self._changed.clear()
+        for node in nodes:
+            node.published = list(node.counts)
+        nodes.sort(key=lambda node: node.namespace.count("/") if node is not self.root else 0)
+        return nodes
+
+    def to_msg(self, node, timestamp):
+        """ returns NamespaceStatus of node """
+        msg = NamespaceStatus()
+        msg.namespace = node.namespace
+        msg.domain_id = self.domain_id
+        msg.timestamp = timestamp
+        msg.topic_count, msg.present_count, msg.missing_count, msg.active_count, msg.slow_count, \
+            msg.timeout_count, msg.late_count, msg.stale_count, msg.bandwidth_exceeded_count = node.counts
+        return msg
+
+def example():
+    from topic_activity_monitor.lib.topic_status_data import TopicStatusData
+    rollup = NamespaceRollup()
+    topics = [TopicStatusData(name, "sensor_msgs/msg/Image")
+              for name in ["/perception/camera/image_raw", "/perception/lidar/points", "/cmd_vel"]]
+    for topic_status_data in topics:
+        topic_status_data.on_transition = rollup.update
+        topic_status_data.connection_status = ConnectionStatus.PRESENT
+        topic_status_data.activity_status = ActivityStatus.ACTIVE
+    rollup.changed()
+    topics[1].activity_status = ActivityStatus.TIMEOUT
+    for node in rollup.changed():
+        print("%-20s %d topics, %d active, %d timeout" % (node.namespace, node.counts[TOPICS], node.counts[ACTIVE],
+                                                          node.counts[TIMEOUT]))
+
+if __name__ == "__main__":
+    example()
@@ -1,5 +1,19 @@
+# Severities, the values of rclpy.logging.LoggingSeverity
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+
 class PrintLogger(object):
     """ Mimics ROS Logger / Python Logging System Syntax """
+    level = DEBUG  # Least severity printed
+
+    def is_enabled_for(self, severity):
+        """ returns True if messages of severity are printed, like the method of rclpy's RcutilsLogger.
+        Check it before building a debug message that costs more than a format string
+        """
+        return severity >= self.level
+
     def debug(self, msg):
         print(msg)
 
@@ -15,6 +29,7 @@ class PrintLogger(object):
 def example():
     logger = PrintLogger()
     logger.info("Regular message")
+    print("debug enabled:", logger.is_enabled_for(DEBUG))
     logger.warn("There is a warning")
     logger.error("Bad thing happened")
 
@@ -0,0 +1,232 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor_msgs.msg import PublisherStatus, TopicPublisherStatus
+
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus
+
+try:
+    from rclpy.subscription import Subscription
+    # Since Jazzy, subscription callbacks taking (msg, msg_info) are passed the MessageInfo
+    MESSAGE_INFO_SUPPORTED = hasattr(Subscription, "CallbackType")
+except ImportError:
+    MESSAGE_INFO_SUPPORTED = False
+
+class PublisherRecord(object):
+    """ Statistics of one publisher of a topic, updated in place for each of its messages """
+    __slots__ = ["publisher_id", "last_sequence", "last_received", "window_received", "interval_average",
+                 "silent_windows", "message_count", "lost_count", "interval_count", "interval_sum", "interval_max",
+                 "latency_count", "latency_sum", "latency_max", "ambiguous"]
+
+    def __init__(self, publisher_id):
+        self.publisher_id = publisher_id
+        self.last_sequence = 0         # Publication sequence number of the latest message
+        self.last_received = 0.0       # Receive time of the latest message
+        self.window_received = 0.0     # Receive time of the latest message since subscribing, 0 before the first one
+        self.interval_average = 0.0    # Moving average of the intervals, kept across windows
+        self.silent_windows = 0        # Windows in a row without a message
+        self.clear_window()
+
+    def clear_window(self):
+        self.message_count = 0
+        self.lost_count = 0
+        self.interval_count = 0
+        self.interval_sum = 0.0
+        self.interval_max = 0.0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.ambiguous = False         # A message of the window may have been another publisher's
+
+    def activity_status(self, deadline):
+        """ returns the ActivityStatus of this publisher's window against the topic's deadline,
+        UNDEFINED when its messages can't be told apart from another publisher's
+        """
+        if self.ambiguous:
+            return ActivityStatus.UNDEFINED
+        if self.message_count == 0:
+            return ActivityStatus.TIMEOUT
+        if self.interval_count == 0 or not deadline > 0:
+            return ActivityStatus.UNDEFINED
+        if self.interval_max < deadline:
+            return ActivityStatus.ACTIVE
+        return ActivityStatus.SLOW
+
+class PublisherStats(object):
+    """ Splits the messages of one subscription between the topic's publishers, so interleaved
+    arrivals from a healthy publisher don't hide another one being slow or dead.
+
+    Works from the MessageInfo rclpy passes to subscription callbacks. rmw_message_info_t has the
+    publisher GID, but rclpy's MessageInfo only has the source and received timestamps and the
+    publication sequence number, so the GID is used when a "publisher_gid" entry is present and
+    publishers are told apart by sequence number otherwise: each publisher numbers its own messages
+    1, 2, 3..., so a message belongs to the publisher whose last number is closest below its own. A
+    number no publisher fits (below all of them, or too far ahead) is a new (or restarted) publisher.
+    When rmw doesn't report sequence numbers (0), every message goes to one record.
+
+    Sequence numbers can't always tell publishers apart: publishers started together number their
+    messages alike, and a lost message makes one publisher's next number look like another's. When
+    more than one publisher fits a number and the closest is tied or skipped more than ambiguous_gap
+    numbers, the message still goes to the closest (to keep following its numbers) but the window of
+    every publisher that fits is marked ambiguous, and reported UNDEFINED instead of ACTIVE, SLOW or TIMEOUT.
+
+    Memory is a fixed record per publisher, nothing is kept per message. Not thread safe, callers lock around it.
+    """
+    def __init__(self, max_publishers=16, max_sequence_gap=100, expiry_windows=3, ambiguous_gap=1):
+        self.max_publishers = max_publishers      # Least recently heard publishers are forgotten past this
+        self.max_sequence_gap = max_sequence_gap  # Largest jump in sequence numbers within a subscription
+        self.ambiguous_gap = ambiguous_gap        # Largest jump attributed while another publisher fits too
+        self.expiry_windows = expiry_windows      # Publishers silent for this many windows are forgotten
+        self.publishers = list()                  # PublisherRecord()
+        self._by_gid = dict()                     # publisher_gid: PublisherRecord()
+        self._next_id = 1
+
+    def add(self, msg_info, now):
+        """ adds a message, msg_info is the rclpy MessageInfo (timestamps in ns) and now its arrival time """
+        received = msg_info["received_timestamp"] * 1e-9
+        if not received > 0:
+            received = now
+        record = self._find(msg_info, received)
+        record.message_count += 1
+
+        if record.window_received > 0:
+            interval = received - record.window_received
+            record.interval_count += 1
+            record.interval_sum += interval
+            if interval > record.interval_max:
+                record.interval_max = interval
+            if record.interval_average > 0:
+                record.interval_average += 0.125 * (interval - record.interval_average)
+            else:
+                record.interval_average = interval
+        record.window_received = received
+        record.last_received = received
+
+        source = msg_info["source_timestamp"] * 1e-9
+        if source > 0:
+            latency = received - source
+            record.latency_count += 1
+            record.latency_sum += latency
+            if latency > record.latency_max:
+                record.latency_max = latency
+
+    def _find(self, msg_info, received):
+        """ returns the PublisherRecord msg_info came from """
+        publisher_gid = msg_info.get("publisher_gid")
+        if publisher_gid is not None:
+            record = self._by_gid.get(publisher_gid)
+            if record is None:
+                record = self._add_record(bytes(publisher_gid).hex())
+                self._by_gid[publisher_gid] = record
+            return record
+
+        sequence = msg_info.get("publication_sequence_number") or 0
+        if sequence == 0:
+            if len(self.publishers) == 0:
+                self._add_record("unknown")
+            return self.publishers[0]
+
+        # Runs for every message without a GID, so the closest publisher is found without allocating
+        record = None
+        gap = 0
+        tied = False  # Another publisher is as close as record
+        fitting = 0   # Publishers the number could come from, within max_sequence_gap
+        for candidate in self.publishers:
+            candidate_gap = sequence - candidate.last_sequence
+            if candidate_gap <= 0:
+                continue
+            if candidate_gap <= self.max_sequence_gap:
+                fitting += 1
+            if record is None or candidate_gap < gap:
+                record = candidate
+                gap = candidate_gap
+                tied = False
+            elif candidate_gap == gap:
+                tied = True
+        if fitting > 1 and (tied or gap > self.ambiguous_gap):
+            for candidate in self.publishers:
+                if 0 < sequence - candidate.last_sequence <= self.max_sequence_gap:
+                    candidate.ambiguous = True
+        if record is not None and gap > self.max_sequence_gap:
+            # Unless the gap is what the publisher sent while we were unsubscribed
+            if record.window_received > 0 or not record.interval_average > 0 or \
+                    gap > self.max_sequence_gap + 2 * (received - record.last_received) / record.interval_average:
+                record = None
+
+        if record is None:
+            record = self._add_record("seq-%d" % self._next_id)
+        elif record.window_received > 0:
+            record.lost_count += gap - 1
+        record.last_sequence = sequence
+        return record
+
+    def _add_record(self, publisher_id):
+        if len(self.publishers) >= self.max_publishers:
+            self._remove(min(self.publishers, key=lambda record: record.last_received))
+        self._next_id += 1
+        record = PublisherRecord(publisher_id)
+        self.publishers.append(record)
+        return record
+
+    def _remove(self, record):
+        self.publishers.remove(record)
+        for publisher_gid, gid_record in list(self._by_gid.items()):
+            if gid_record is record:
+                del self._by_gid[publisher_gid]
+
+    def disconnect(self):
+        """ the subscription was closed, the next message of each publisher only gives a reference time """
+        for record in self.publishers:
+            record.window_received = 0.0
+
+    def end_window(self):
+        """ starts counting the next window, and forgets publishers silent for expiry_windows windows in a row """
+        for record in list(self.publishers):
+            if record.message_count == 0:
+                record.silent_windows += 1
+                if record.silent_windows >= self.expiry_windows:
+                    self._remove(record)
+                    continue
+            else:
+                record.silent_windows = 0
+            record.clear_window()
+
+    def to_msg(self, topic_name, timestamp, deadline):
+        """ returns TopicPublisherStatus of the current window """
+        msg = TopicPublisherStatus()
+        msg.topic_name = topic_name
+        msg.timestamp = timestamp
+        msg.publishers = list()
+        for record in self.publishers:
+            publisher_status = PublisherStatus()
+            publisher_status.publisher_id = record.publisher_id
+            publisher_status.activity_status = record.activity_status(deadline).value
+            publisher_status.attribution_ambiguous = record.ambiguous
+            publisher_status.message_count = record.message_count
+            publisher_status.lost_count = record.lost_count
+            publisher_status.last_sequence_number = record.last_sequence
+            publisher_status.last_received = record.last_received
+            publisher_status.interval_mean = record.interval_sum / record.interval_count if record.interval_count > 0 else 0.0
+            publisher_status.interval_max = record.interval_max
+            publisher_status.latency_mean = record.latency_sum / record.latency_count if record.latency_count > 0 else 0.0
+            publisher_status.latency_max = record.latency_max
+            msg.publishers.append(publisher_status)
+        return msg
+
+def example():
+    # Two publishers interleaved on one topic, the second one stops after the first window
+    stats = PublisherStats()
+    for i in range(1, 41):
+        now = 1000.0 + i * 0.05
+        stats.add({"source_timestamp": int((now - 0.002) * 1e9), "received_timestamp": int(now * 1e9),
+                   "publication_sequence_number": 500 + i, "reception_sequence_number": 0}, now)
+        if i <= 20:
+            stats.add({"source_timestamp": 0, "received_timestamp": int((now + 0.01) * 1e9),
+                       "publication_sequence_number": i, "reception_sequence_number": 0}, now + 0.01)
+        if i % 20 == 0:
+            for record in stats.publishers:
+                print("%s: %d messages, %s" % (record.publisher_id, record.message_count, record.activity_status(0.1).name))
+            stats.end_window()
+
+if __name__ == "__main__":
+    example()
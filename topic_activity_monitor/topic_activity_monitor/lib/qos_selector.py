@@ -0,0 +1,34 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from rclpy.qos import QoSDurabilityPolicy, QoSHistoryPolicy, QoSProfile, QoSReliabilityPolicy
+
+RELIABILITY_CHOICES = ["auto", "best_effort", "reliable"]
+
+def select_qos(publisher_infos, reliability="auto", depth=2):
+    """ returns (QoSProfile, number of incompatible publishers) for a monitoring subscription.
+
+    The cheapest subscription that still hears every publisher is best effort and volatile with a
+    small history: best effort matches reliable and best effort publishers without ACK/NACK traffic,
+    volatile matches any durability without replaying old samples, and the default (infinite)
+    deadline and automatic liveliness accept whatever publishers offer. That is what "auto" picks.
+    Forcing "reliable" is incompatible with best effort publishers, and those are counted.
+    Publishers whose QoS is unknown (qos_profile is None) are assumed compatible.
+    """
+    if reliability == "reliable":
+        reliability_policy = QoSReliabilityPolicy.RELIABLE
+    else:
+        reliability_policy = QoSReliabilityPolicy.BEST_EFFORT
+
+    profile = QoSProfile(history=QoSHistoryPolicy.KEEP_LAST,
+                         depth=depth,
+                         reliability=reliability_policy,
+                         durability=QoSDurabilityPolicy.VOLATILE)
+
+    incompatible = 0
+    if reliability_policy == QoSReliabilityPolicy.RELIABLE:
+        for publisher_info in publisher_infos:
+            qos_profile = getattr(publisher_info, "qos_profile", None)
+            if qos_profile is not None and qos_profile.reliability == QoSReliabilityPolicy.BEST_EFFORT:
+                incompatible += 1
+    return profile, incompatible
@@ -0,0 +1,48 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+
+class RateEstimator(object):
+    """ Streaming estimate of a topic's nominal interval between messages, in constant memory.
+
+    Keeps exponentially weighted moving averages of the interval and of its absolute deviation,
+    the way TCP estimates round trip times. deadline() is the mean plus deviation_factor deviations
+    and at least min_factor times the mean, so a perfectly regular topic still tolerates some jitter.
+    """
+    __slots__ = ["alpha", "beta", "deviation_factor", "min_factor", "mean", "deviation", "count"]
+
+    def __init__(self, alpha=0.125, beta=0.25, deviation_factor=4.0, min_factor=1.5):
+        self.alpha = alpha                        # Weight of a new interval in mean
+        self.beta = beta                          # Weight of a new deviation in deviation
+        self.deviation_factor = deviation_factor
+        self.min_factor = min_factor
+        self.mean = 0.0
+        self.deviation = 0.0
+        self.count = 0                            # Intervals seen
+
+    def update(self, interval):
+        if self.count == 0:
+            self.mean = interval
+            self.deviation = interval / 2.0
+        else:
+            self.deviation += self.beta * (abs(interval - self.mean) - self.deviation)
+            self.mean += self.alpha * (interval - self.mean)
+        self.count += 1
+
+    def rate(self):
+        """ returns the estimated rate in Hz """
+        return 1.0 / self.mean if self.mean > 0 else 0.0
+
+    def deadline(self):
+        """ returns the longest interval consistent with the learned rate """
+        return max(self.mean * self.min_factor, self.mean + self.deviation_factor * self.deviation)
+
+def example():
+    import random
+    estimator = RateEstimator()
+    for _ in range(100):
+        estimator.update(0.1 * random.uniform(0.9, 1.1))
+    print("rate %.2f Hz, deadline %.4f s" % (estimator.rate(), estimator.deadline()))
+
+if __name__ == "__main__":
+    example()
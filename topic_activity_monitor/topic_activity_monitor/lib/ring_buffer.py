@@ -0,0 +1,102 @@
+import numpy as np
+
+class RingBuffer(object):
+    """ Fixed size buffer of floats backed by a preallocated numpy array.
+    push() is O(1) and overwrites the oldest value once the buffer is full.
+    Running sums are kept so mean() and std() are O(1) as well.
+    """
+    def __init__(self, max_size):
+        assert(max_size >= 1), "RingBuffer max_size must be >= 1. Received %d" % max_size
+        self.max_size = max_size
+        self._data = np.zeros(max_size, dtype=np.float64)
+        self._index = 0   # Next position to write
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, value):
+        """ Adds value to the buffer, dropping the oldest value if full """
+        if self._count == self.max_size:
+            old = self._data[self._index]
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self._count += 1
+        self._data[self._index] = value
+        self._sum += value
+        self._sum_sq += value * value
+        self._index += 1
+        if self._index == self.max_size:
+            self._index = 0
+            # Recompute the running sums once per lap so floating point error can't accumulate
+            if self._count == self.max_size:
+                self._sum = float(self._data.sum())
+                self._sum_sq = float(np.dot(self._data, self._data))
+
+    def full(self):
+        """ return True if the buffer has reached capacity """
+        return self._count == self.max_size
+
+    def clear(self):
+        self._index = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def values(self):
+        """ returns the stored values, oldest first (copy) """
+        if self._count < self.max_size:
+            return self._data[:self._count].copy()
+        return np.concatenate((self._data[self._index:], self._data[:self._index]))
+
+    def _valid(self):
+        """ view of the stored values in no particular order """
+        return self._data[:self._count]
+
+    def mean(self):
+        if self._count == 0:
+            return 0.0
+        return self._sum / self._count
+
+    def std(self):
+        if self._count == 0:
+            return 0.0
+        mean = self._sum / self._count
+        return float(np.sqrt(max(self._sum_sq / self._count - mean * mean, 0.0)))
+
+    def min(self):
+        if self._count == 0:
+            return 0.0
+        return float(self._valid().min())
+
+    def max(self):
+        if self._count == 0:
+            return 0.0
+        return float(self._valid().max())
+
+    def percentile(self, q):
+        """ q in [0, 100], interpolated between the nearest values like numpy does
+        (np.percentile() costs tens of microseconds of argument handling, more than sorting a window does)
+        """
+        if self._count == 0:
+            return 0.0
+        values = np.sort(self._valid())
+        position = (self._count - 1) * q / 100.0
+        lower = int(position)
+        upper = min(lower + 1, self._count - 1)
+        return float(values[lower] + (values[upper] - values[lower]) * (position - lower))
+
+def example():
+    b = RingBuffer(4)
+    for value in [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]:
+        b.push(value)
+        print(b.values(), "Is Full?", b.full(), "mean", b.mean(), "std", b.std())
+    print("min", b.min(), "max", b.max(), "p50", b.percentile(50))
+    b.clear()
+    print(b.values())
+
+if __name__ == "__main__":
+    example()
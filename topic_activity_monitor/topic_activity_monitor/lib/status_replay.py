@@ -0,0 +1,164 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Replays ActivityMonitor's SLOW/TIMEOUT rules over whole arrays of receive timestamps.
+
+Each function returns (times, statuses): the numpy arrays of the activity status transitions a live
+monitor would have reported, given the same messages. start is when the monitor started, and the replay
+follows its timing from there: the TimingWheel ticks every resolution seconds, a subscription is granted
+by the first SamplingScheduler update (every period) on or after the tick its request is due on, only
+messages after the grant are heard, and the watchdog fires on the first tick at or after TIMEOUT.
+
+The replay assumes an unlimited SamplingScheduler without jitter, whose updates are in phase with start,
+and that the first duty cycle window is requested at start (a live monitor staggers it by up to
+RECONNECT_WAIT_TIME). Under those assumptions it reports the live transitions to within a tick.
+"""
+import numpy as np
+
+from topic_activity_monitor.lib.timing_wheel import TICK_TOLERANCE
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus
+from topic_activity_monitor.sampling_scheduler import UPDATE_PERIOD
+
+ACTIVE = ActivityStatus.ACTIVE.value
+SLOW = ActivityStatus.SLOW.value
+TIMEOUT = ActivityStatus.TIMEOUT.value
+# TIMER_RESOLUTION of the monitor
+RESOLUTION = 0.01
+
+def _ticks_up(seconds, resolution):
+    """ returns array of seconds in wheel ticks, rounded up like TimingWheel.schedule() """
+    return np.ceil(np.asarray(seconds, dtype=np.float64) / resolution - TICK_TOLERANCE).astype(np.int64)
+
+def _grant_times(requested, start, resolution, period):
+    """ returns array of the times the subscriptions requested at times are granted """
+    # Due on the tick after the request at the earliest, granted by the next update
+    due = np.maximum(_ticks_up(np.asarray(requested) - start, resolution), 1)
+    update_ticks = _ticks_up(period, resolution)
+    return start + -(-due // update_ticks) * update_ticks * resolution
+
+def _timeout_times(waited_from, start, timeout, resolution):
+    """ returns array of the times the watchdog fires, if nothing arrives after waited_from """
+    return start + _ticks_up(np.asarray(waited_from) + timeout - start, resolution) * resolution
+
+def replay_duty_cycle(timestamps, start, end, window_size, deadline, timeout, reconnect_wait_time,
+                      resolution=RESOLUTION, period=UPDATE_PERIOD):
+    """ duty cycle mode: subscribe, judge window_size messages, unsubscribe for reconnect_wait_time """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    count = len(timestamps)
+
+    # Where the window would be granted after one starting at each message index ends. Computing it for
+    # every index at once leaves only the pointer chasing from one window to the next to Python
+    first_grant = _grant_times(start, start, resolution, period)
+    first = int(np.searchsorted(timestamps, first_grant, side="right"))
+    starts = list()
+    if count >= window_size:
+        ends = timestamps[window_size - 1:]
+        following = np.searchsorted(timestamps, _grant_times(ends + reconnect_wait_time, start, resolution, period),
+                                    side="right").tolist()
+        window_start = first
+        last_start = count - window_size
+        while window_start <= last_start:
+            starts.append(window_start)
+            window_start = following[window_start]
+    starts = np.array(starts, dtype=np.int64)
+
+    # Subscription times, the first window's and then one after each complete window
+    grants = np.concatenate(([first_grant], _grant_times(timestamps[starts + window_size - 1] + reconnect_wait_time,
+                                                         start, resolution, period)))
+    # The messages of each window, and those after the last grant (fewer than window_size)
+    tail_start = int(np.searchsorted(timestamps, grants[-1], side="right")) if len(starts) > 0 else first
+    window_stamps = timestamps[starts[:, None] + np.arange(window_size)]
+    tail_stamps = timestamps[tail_start:]
+
+    times = list()
+    statuses = list()
+
+    # Each complete window reports when its last message arrives
+    intervals = np.diff(window_stamps, axis=1)
+    times.append(window_stamps[:, -1])
+    statuses.append(np.where(intervals.max(axis=1, initial=0.0) < deadline, ACTIVE, SLOW))
+
+    # The watchdog restarts on subscribing and on every message, and fires TIMEOUT once when not restarted in time
+    waited_from = np.concatenate((grants[:-1], window_stamps[:, :-1].ravel()))
+    waited_until = np.concatenate((window_stamps[:, 0], window_stamps[:, 1:].ravel()))
+    fired = _timeout_times(waited_from, start, timeout, resolution)
+    late = waited_until > fired
+    times.append(fired[late])
+    statuses.append(np.full(int(late.sum()), TIMEOUT))
+
+    # The last subscription, still waiting for its window when the recording ends
+    if grants[-1] < end:
+        tail_from = np.concatenate(([grants[-1]], tail_stamps))
+        fired = _timeout_times(tail_from, start, timeout, resolution)
+        late = np.concatenate((tail_stamps, [end])) > fired
+        times.append(fired[late])
+        statuses.append(np.full(int(late.sum()), TIMEOUT))
+
+    return transitions(np.concatenate(times), np.concatenate(statuses))
+
+def replay_continuous(timestamps, start, end, window_size, deadline, timeout, resolution=RESOLUTION, period=UPDATE_PERIOD):
+    """ continuous mode: stay subscribed and report every window_size - 1 intervals,
+    or as soon as a late interval breaks an ACTIVE streak
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    grant = _grant_times(start, start, resolution, period)
+    timestamps = timestamps[timestamps > grant]
+    intervals = np.diff(timestamps)
+    interval_count = window_size - 1
+
+    times = list()
+    statuses = list()
+    priorities = list()  # Orders events at the same time the way the callback does
+
+    # A late interval reports SLOW right away
+    late = intervals >= deadline
+    times.append(timestamps[1:][late])
+    statuses.append(np.full(int(late.sum()), SLOW))
+    priorities.append(np.zeros(int(late.sum()), dtype=np.int64))
+
+    # Every full window of intervals reports SLOW if any of them was late, ACTIVE otherwise
+    window_count = len(intervals) // interval_count
+    window_late = late[:window_count * interval_count].reshape(window_count, interval_count).any(axis=1)
+    times.append(timestamps[1:][interval_count - 1:window_count * interval_count:interval_count])
+    statuses.append(np.where(window_late, SLOW, ACTIVE))
+    priorities.append(np.ones(window_count, dtype=np.int64))
+
+    # TIMEOUT when nothing arrives in time, from subscribing to the end of the recording
+    waited_from = np.concatenate(([grant], timestamps))
+    fired = _timeout_times(waited_from, start, timeout, resolution)
+    late = np.concatenate((timestamps, [end])) > fired
+    times.append(fired[late])
+    statuses.append(np.full(int(late.sum()), TIMEOUT))
+    priorities.append(np.zeros(int(late.sum()), dtype=np.int64))
+
+    return transitions(np.concatenate(times), np.concatenate(statuses), np.concatenate(priorities))
+
+def transitions(times, statuses, priorities=None):
+    """ returns (times, statuses) of the reports that changed the status, in time order """
+    if priorities is None:
+        order = np.argsort(times, kind="stable")
+    else:
+        order = np.lexsort((priorities, times))
+    times = times[order]
+    statuses = statuses[order].astype(np.uint8)
+    changed = np.ones(len(statuses), dtype=bool)
+    changed[1:] = statuses[1:] != statuses[:-1]
+    return times[changed], statuses[changed]
+
+def time_in_status(times, statuses, start, end):
+    """ returns array of seconds spent in each status value between start and end """
+    durations = np.diff(np.concatenate((np.clip(times, start, end), [end])))
+    seconds = np.bincount(statuses, weights=durations, minlength=len(ActivityStatus))
+    # Before the first transition (if it is in the window at all)
+    seconds[ActivityStatus.UNDEFINED.value] += (np.clip(times[0], start, end) if len(times) > 0 else end) - start
+    return seconds
+
+def example():
+    # 10 Hz for a minute, silent for 5 seconds, then 4 Hz
+    timestamps = np.concatenate((np.arange(0.0, 60.0, 0.1), np.arange(65.0, 120.0, 0.25)))
+    for name, (times, statuses) in [("duty_cycle", replay_duty_cycle(timestamps, 0.0, 120.0, 10, 0.15, 1.0, 1.0)),
+                                    ("continuous", replay_continuous(timestamps, 0.0, 120.0, 10, 0.15, 1.0))]:
+        print("%s: %s" % (name, ", ".join("%.2f %s" % (time, ActivityStatus(status).name) for time, status in zip(times, statuses))))
+
+if __name__ == "__main__":
+    example()
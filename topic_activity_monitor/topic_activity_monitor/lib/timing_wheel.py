@@ -0,0 +1,116 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import math
+import time
+
+from threading import Lock
+
+# Ticks a time may be past a tick boundary by rounding error and still be on it
+TICK_TOLERANCE = 1e-6
+
+class WheelTimer(object):
+    """ A deadline armed on a TimingWheel, returned by TimingWheel.schedule() """
+    __slots__ = ["tick", "callback", "canceled"]
+
+    def __init__(self, tick, callback):
+        self.tick = tick          # Wheel tick the callback is due on
+        self.callback = callback
+        self.canceled = False
+
+class TimingWheel(object):
+    """ Hashed timing wheel holding any number of one shot deadlines, driven by calling advance()
+    from a single ROS timer every resolution seconds.
+
+    Deadlines are rounded up to the next tick (resolution seconds). schedule() and cancel() are O(1)
+    and create no ROS objects. Each tick only visits the deadlines hashed into that slot, deadlines
+    more than one revolution (slot_count ticks) away simply stay in their slot until their tick comes.
+    If advance() runs late, every tick that was missed is processed on the next call. The deadlines
+    of one tick fire in the order they were scheduled.
+
+    Callbacks are called from advance() without the wheel lock held, so they may
+    schedule and cancel deadlines themselves.
+    """
+    def __init__(self, resolution=0.01, slot_count=512, clock=time.time):
+        self.resolution = resolution
+        self._clock = clock
+        self._slots = [dict() for _ in range(slot_count)]  # WheelTimer: None, in the order scheduled
+        self._origin = clock()
+        self._tick = 0      # Last tick processed
+        self._lock = Lock()
+
+    def __len__(self):
+        return sum(len(slot) for slot in self._slots)
+
+    def schedule(self, delay, callback):
+        """ returns WheelTimer calling callback() once, delay seconds from now """
+        with self._lock:
+            return self._add(self._ticks_up(self._clock() + delay - self._origin), callback)
+
+    def schedule_after(self, wheel_timer, delay, callback):
+        """ returns WheelTimer calling callback() once, delay seconds after wheel_timer was due.
+        Periodic timers rearm with it from the deadline that fired, so they don't drift by however late advance() ran
+        """
+        with self._lock:
+            return self._add(wheel_timer.tick + self._ticks_up(delay), callback)
+
+    def _ticks_up(self, seconds):
+        """ returns seconds in ticks, rounded up """
+        return int(math.ceil(seconds / self.resolution - TICK_TOLERANCE))
+
+    def _ticks_down(self, seconds):
+        """ returns seconds in ticks, rounded down """
+        return int(math.floor(seconds / self.resolution + TICK_TOLERANCE))
+
+    def _add(self, tick, callback):
+        """ caller must hold _lock """
+        wheel_timer = WheelTimer(max(self._tick + 1, tick), callback)
+        self._slots[wheel_timer.tick % len(self._slots)][wheel_timer] = None
+        return wheel_timer
+
+    def cancel(self, wheel_timer):
+        """ stops wheel_timer from firing, does nothing if it already fired """
+        with self._lock:
+            wheel_timer.canceled = True
+            self._slots[wheel_timer.tick % len(self._slots)].pop(wheel_timer, None)
+
+    def advance(self):
+        """ fires every deadline that is due """
+        due = list()
+        with self._lock:
+            target = self._ticks_down(self._clock() - self._origin)
+            slot_count = len(self._slots)
+            for tick in range(self._tick + 1, self._tick + 1 + min(target - self._tick, slot_count)):
+                slot = self._slots[tick % slot_count]
+                expired = [wheel_timer for wheel_timer in slot if wheel_timer.tick <= target]
+                for wheel_timer in expired:
+                    del slot[wheel_timer]
+                due.extend(expired)
+            self._tick = max(self._tick, target)
+
+        # Stable, so each tick keeps the order its deadlines were scheduled in
+        due.sort(key=lambda wheel_timer: wheel_timer.tick)
+        for wheel_timer in due:
+            # Canceled by an earlier callback of this tick
+            if not wheel_timer.canceled:
+                wheel_timer.callback()
+
+def example():
+    class Clock(object):
+        now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    wheel = TimingWheel(resolution=0.01, slot_count=8, clock=clock)
+    wheel.schedule(0.05, lambda: print("0.05 s at %.2f" % clock.now))
+    wheel.schedule(0.5, lambda: print("0.5 s at %.2f" % clock.now))
+    canceled = wheel.schedule(0.2, lambda: print("canceled, never printed"))
+    wheel.cancel(canceled)
+    while clock.now < 1.0:
+        clock.now += 0.01
+        wheel.advance()
+
+if __name__ == "__main__":
+    example()
@@ -0,0 +1,58 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import re
+
+class TopicFilter(object):
+    """ Matches topic names against a list of regex patterns, like re.match() on each pattern.
+    The patterns are compiled into one combined regex, and the verdict for each topic name is
+    cached until the patterns change.
+    """
+    def __init__(self, patterns=None):
+        self._patterns = list()
+        self._regexes = list()  # One combined regex, or one per pattern if they can't be combined
+        self._cache = dict()    # topic_name(str): matched(bool)
+        self.set_patterns(patterns or list())
+
+    def __len__(self):
+        return len(self._patterns)
+
+    @property
+    def patterns(self):
+        return list(self._patterns)
+
+    def set_patterns(self, patterns):
+        """ Replaces the patterns and clears cached verdicts """
+        self._patterns = list(patterns)
+        try:
+            self._regexes = [re.compile("|".join("(?:%s)" % pattern for pattern in self._patterns))] if self._patterns else list()
+        except re.error:
+            # Patterns with global flags can't be embedded in an alternation
+            self._regexes = [re.compile(pattern) for pattern in self._patterns]
+        self._cache.clear()
+
+    def extend(self, patterns):
+        self.set_patterns(self._patterns + list(patterns))
+
+    def match(self, topic_name):
+        """ returns True if topic_name matches at least one pattern """
+        try:
+            return self._cache[topic_name]
+        except KeyError:
+            pass
+        matched = False
+        for regex in self._regexes:
+            if regex.match(topic_name) is not None:
+                matched = True
+                break
+        self._cache[topic_name] = matched
+        return matched
+
+def example():
+    blacklist = TopicFilter(["/rosout", "/parameter_events"])
+    print(blacklist.match("/rosout"), blacklist.match("/image_raw"))
+    blacklist.extend(["/image"])
+    print(blacklist.match("/image_raw"))
+
+if __name__ == "__main__":
+    example()
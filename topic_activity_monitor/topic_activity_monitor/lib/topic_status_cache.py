@@ -0,0 +1,78 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor_msgs.msg import TopicStatus
+from topic_activity_monitor_msgs.srv import GetTopicStatuses
+
+from topic_activity_monitor.lib.topic_status_data import TopicStatusData
+
+class TopicStatusCache(object):
+    """ Local copy of the monitor's topics table, for dashboards and health aggregators to embed.
+
+    Starts from a GetTopicStatuses snapshot, then follows <status_prefix>/updates. Every
+    resync_period seconds it asks for the topics changed since the last version it saw, which
+    repairs missed updates and catches up after the monitor (or this client) reconnects.
+    Messages older than the stored status of a topic are ignored.
+    When the monitor restarts (a new epoch) the topics are dropped and rebuilt from its full snapshot,
+    so topics it no longer knows go away.
+
+        cache = TopicStatusCache(ros_node, on_update=lambda topic_status_data: print(topic_status_data.topic_name))
+        cache.topics["/image_raw"].activity_status
+    """
+    def __init__(self, ros_node, status_prefix="/topic_status", resync_period=5.0, on_update=None):
+        self.ros_node = ros_node
+        self.logger = ros_node.get_logger()
+        self.on_update = on_update  # callable(TopicStatusData) when a topic's status changes
+
+        self.topics = dict()  # name(str): TopicStatusData()
+        self.epoch = ""       # Epoch of the monitor version is from, "" before the first snapshot
+        self.version = 0      # Version of the last snapshot merged, 0 before the first one
+
+        self._pending = None  # Future of the GetTopicStatuses call in progress
+        self._client = self.ros_node.create_client(GetTopicStatuses, status_prefix + "/get")
+        self._update_sub = self.ros_node.create_subscription(TopicStatus, status_prefix + "/updates",
+                                                             self._update_callback, 100)
+        self._resync_timer = self.ros_node.create_timer(resync_period, self.resync)
+        self.resync()
+
+    def resync(self):
+        """ requests the topics changed since version (all of them the first time) """
+        if self._pending is not None and not self._pending.done():
+            return
+        if not self._client.service_is_ready():
+            return
+        request = GetTopicStatuses.Request()
+        request.since_epoch = self.epoch
+        request.since_version = self.version
+        self._pending = self._client.call_async(request)
+        self._pending.add_done_callback(self._resync_callback)
+
+    def _resync_callback(self, future):
+        response = future.result()
+        if response is None:
+            return
+        if self.epoch and not response.epoch == self.epoch:
+            self.logger.info("Topic status monitor restarted, dropping %d topics for its snapshot" % len(self.topics))
+            self.topics.clear()
+        elif response.full and self.version > 0:
+            self.logger.info("Topic status snapshot restarted from version %d" % response.version)
+        for msg in response.topics:
+            self._merge(msg)
+        self.epoch = response.epoch
+        self.version = response.version
+
+    def _update_callback(self, msg):
+        self._merge(msg)
+
+    def _merge(self, msg):
+        topic_status_data = self.topics.get(msg.topic_name)
+        if topic_status_data is None:
+            topic_status_data = TopicStatusData(msg.topic_name, msg.msg_type, self.logger, domain_id=msg.domain_id)
+            self.topics[msg.topic_name] = topic_status_data
+        elif msg.timestamp < topic_status_data.timestamp:
+            return
+
+        topic_status_data.has_update()
+        topic_status_data.update_from_msg(msg)
+        if topic_status_data.has_update() and self.on_update is not None:
+            self.on_update(topic_status_data)
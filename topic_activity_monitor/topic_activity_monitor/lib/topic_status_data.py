@@ -2,6 +2,9 @@
 # Date: 2023-09-08
 # License Apache 2
 from enum import Enum
+
+import numpy as np
+
 from topic_activity_monitor_msgs.msg import TopicStatus
 from topic_activity_monitor.lib.print_logger import PrintLogger
 
@@ -19,116 +22,395 @@ class ActivityStatus(Enum):
     SLOW          = 2  # Data received, but slower than deadline
     TIMEOUT       = 3  # No data received since last connection
     NOT_MONITORED = 4  # Activity not being monitored
+    QOS_INCOMPATIBLE = 5  # No publisher offers a QoS the monitoring subscription can match
+    STALE         = 6  # Status not refreshed within its valid_duration
+    LATE          = 7  # Data received on time, but older (by header.stamp) than activity_max_latency
+    BANDWIDTH_EXCEEDED = 8  # Data received on time, but more bytes/s than activity_max_bandwidth
+
+
+
+_CONNECTION_STATUSES = list(ConnectionStatus)  # by value
+_ACTIVITY_STATUSES = list(ActivityStatus)      # by value
+
+# Row of a StatusTable, the fields of TopicStatus.msg other than the names, then the bookkeeping
+STATUS_DTYPE = np.dtype([("timestamp", np.float64),
+                         ("valid_duration", np.float64),
+                         ("connection_status", np.uint8),
+                         ("activity_status", np.uint8),
+                         ("activity_deadline", np.float64),
+                         ("activity_slow_count", np.int64),
+                         ("activity_timeout", np.float64),
+                         ("activity_timeout_count", np.int64),
+                         ("activity_max_latency", np.float64),
+                         ("activity_late_count", np.int64),
+                         ("activity_latency_p50", np.float64),
+                         ("activity_latency_p95", np.float64),
+                         ("activity_max_bandwidth", np.float64),
+                         ("activity_bandwidth_exceeded_count", np.int64),
+                         ("activity_bandwidth", np.float64),
+                         ("activity_msg_size_mean", np.float64),
+                         ("activity_msg_size_p95", np.float64),
+                         ("activity_msg_size_max", np.float64),
+                         ("updated", np.bool_),  # Changed since has_update() was last called
+                         ("owned", np.bool_)])   # Published by this process, see NetworkStateTracker.owns_topic()
+
+
+class StatusTable(object):
+    """ The status of every topic as one numpy structured array, a row per topic id.
+    Sweeps over all the topics (connection updates, expiry, snapshots) run as array operations on
+    its columns, and TopicStatusData is a view of one row for the code that works on a single topic.
+
+    Each field is also an attribute holding its column, e.g. table.activity_status[topic_id].
+    Rows are never removed, and the array doubles when it is full (rebinding the columns).
+    The topics of a table are all in one ROS domain, domain_id.
+    Not thread safe, NetworkStateTracker changes it under topics_lock.
+    """
+    def __init__(self, capacity=64, domain_id=0):
+        self.domain_id = domain_id
+        self.topic_names = list()     # by topic id
+        self.msg_type_names = list()  # by topic id
+        self.ids = dict()             # name(str): topic id(int)
+        self._rows = self._allocate(capacity)
+        self._msgs = list()           # TopicStatus reused by to_msg(), by topic id
+        self._bind_columns()
+
+    def __len__(self):
+        return len(self.topic_names)
+
+    @staticmethod
+    def _allocate(capacity):
+        rows = np.zeros(max(capacity, 1), dtype=STATUS_DTYPE)
+        rows["owned"] = True
+        return rows
+
+    def _bind_columns(self):
+        for name in STATUS_DTYPE.names:
+            setattr(self, name, self._rows[name])
+
+    def add(self, topic_name, msg_type_name):
+        """ returns the topic id of a new row for topic_name """
+        assert(topic_name not in self.ids)
+        topic_id = len(self.topic_names)
+        if topic_id == len(self._rows):
+            rows = self._allocate(2 * len(self._rows))
+            rows[:topic_id] = self._rows
+            self._rows = rows
+            self._bind_columns()
+        self.topic_names.append(topic_name)
+        self.msg_type_names.append(msg_type_name)
+        self.ids[topic_name] = topic_id
+        msg = TopicStatus()
+        msg.topic_name = topic_name
+        msg.msg_type = msg_type_name
+        msg.domain_id = self.domain_id
+        self._msgs.append(msg)
+        return topic_id
+
+    def set_column(self, name, topic_ids, values):
+        """ sets field name of the rows topic_ids to values, and returns the ids (np.ndarray)
+        of the rows that changed, which are marked updated
+        """
+        topic_ids = np.asarray(topic_ids, dtype=np.int64)
+        column = getattr(self, name)
+        values = np.asarray(values, dtype=column.dtype)
+        changed = column[topic_ids] != values
+        topic_ids = topic_ids[changed]
+        column[topic_ids] = values[changed]
+        self.updated[topic_ids] = True
+        return topic_ids
+
+    def expired(self, now):
+        """ returns the ids (np.ndarray) of the owned rows whose valid_duration ran out by now,
+        other than those already STALE
+        """
+        count = len(self.topic_names)
+        valid_duration = self.valid_duration[:count]
+        expired = (valid_duration > 0) & (self.timestamp[:count] + valid_duration <= now)
+        expired &= self.activity_status[:count] != ActivityStatus.STALE.value
+        expired &= self.owned[:count]
+        return np.flatnonzero(expired)
+
+    def largest(self, name, count):
+        """ returns the ids (np.ndarray) of the owned rows with the count largest positive values
+        of field name, largest first
+        """
+        values = getattr(self, name)[:len(self.topic_names)]
+        topic_ids = np.flatnonzero((values > 0) & self.owned[:len(self.topic_names)])
+        if len(topic_ids) > count:
+            topic_ids = topic_ids[np.argpartition(values[topic_ids], -count)[-count:]]
+        return topic_ids[np.argsort(-values[topic_ids], kind="stable")]
+
+    def owned_ids(self):
+        """ returns the ids (np.ndarray) of the rows this process publishes """
+        return np.flatnonzero(self.owned[:len(self.topic_names)])
+
+    def to_msg(self, topic_id):
+        """ returns TopicStatus.msg of row topic_id
+        Each row reuses its own message object, so publish it before releasing the lock the table
+        is changed under. Anything that leaves the lock goes through snapshot() and to_msgs().
+        """
+        msg = self._msgs[topic_id]
+        self._fill(msg, self._rows.item(topic_id))
+        return msg
+
+    def snapshot(self, topic_ids):
+        """ returns a copy of the rows topic_ids, to turn into messages with to_msgs() """
+        topic_ids = np.asarray(topic_ids, dtype=np.int64)
+        return topic_ids, self._rows[topic_ids]
+
+    def to_msgs(self, snapshot):
+        """ returns list of new TopicStatus.msg of a snapshot()
+        Nothing is shared with the table, so this runs after releasing the lock the snapshot was
+        taken under, and the messages can be published or returned from a service.
+        """
+        topic_ids, rows = snapshot
+        msgs = list()
+        # One conversion of all the rows to Python values, instead of one per field
+        for topic_id, row in zip(topic_ids.tolist(), rows.tolist()):
+            msg = TopicStatus()
+            msg.topic_name = self.topic_names[topic_id]
+            msg.msg_type = self.msg_type_names[topic_id]
+            msg.domain_id = self.domain_id
+            self._fill(msg, row)
+            msgs.append(msg)
+        return msgs
+
+    @staticmethod
+    def _fill(msg, row):
+        msg.timestamp, msg.valid_duration, msg.connection_status, msg.activity_status, \
+            msg.activity_deadline, msg.activity_slow_count, msg.activity_timeout, msg.activity_timeout_count, \
+            msg.activity_max_latency, msg.activity_late_count, msg.activity_latency_p50, \
+            msg.activity_latency_p95, msg.activity_max_bandwidth, msg.activity_bandwidth_exceeded_count, \
+            msg.activity_bandwidth, msg.activity_msg_size_mean, msg.activity_msg_size_p95, \
+            msg.activity_msg_size_max, _, _ = row
 
 
 class TopicStatusData(object):
-    """ Mirrors the TopicStatus.msg
+    """ Mirrors the TopicStatus.msg, as a view of the topic's row of a StatusTable.
+    Without a table it gets a StatusTable of its own (in domain_id), for code that keeps a few topics.
+    topic_name, msg_type_name and domain_id are read only. Setting any other field to a new value marks the
+    data as updated (see has_update()), except the latency percentiles, bandwidth and message sizes: they
+    are measurements that go out with the next update or snapshot. Changing connection_status or activity_status also calls
+    on_transition(self), if set.
     """
-    def __init__(self, name, msg_type, logger=PrintLogger()):
-        self.logger = logger
-
-        # Track if we have received any changes since the last time has_update() was called
-        self._updated = False
+    __slots__ = ["logger", "on_transition", "table", "topic_id"]
 
-        self._topic_name = name
-        self._msg_type_name = msg_type
-
-        self._timestamp = 0.0
-        self._valid_duration = 0.0
+    def __init__(self, name, msg_type, logger=PrintLogger(), table=None, domain_id=0):
+        self.logger = logger
+        self.on_transition = None  # callable(TopicStatusData), e.g. HistoryLog.record
+        self.table = table if table is not None else StatusTable(1, domain_id)
+        self.topic_id = self.table.add(name, msg_type)
+
+    def _set(self, column, value):
+        """ sets this row of column to value, returns True (and marks the row updated) if it changed """
+        topic_id = self.topic_id
+        if column.item(topic_id) == value:
+            return False
+        column[topic_id] = value
+        self.table.updated[topic_id] = True
+        return True
+
+    @property
+    def topic_name(self):
+        return self.table.topic_names[self.topic_id]
+
+    @topic_name.setter
+    def topic_name(self, value: str):
+        raise Exception("TopicStatusData.topic_name is read only")
 
-        self._connection_status = ConnectionStatus.UNDEFINED
+    @property
+    def msg_type_name(self):
+        return self.table.msg_type_names[self.topic_id]
 
-        self._activity_status = ActivityStatus.UNDEFINED
-        self._activity_deadline = 0.0
-        self._activity_slow_count = 0
-        self._activity_timeout = 0.0
-        self._activity_timeout_count = 0
+    @msg_type_name.setter
+    def msg_type_name(self, value: str):
+        raise Exception("TopicStatusData.msg_type_name is read only")
 
-    def __setattr__(self, name, value):
-        if name in ["topic_name", "msg_type_name", "timestamp", "valid_duration", "connection_status", "activity_status", 
-                    "activity_deadline", "activity_slow_count", "activity_timeout", "activity_timeout_count"]:
-            setter_fun = getattr(self, "_set_" + name)
-            setter_fun(value)
-        else:
-            super().__setattr__(name, value)
+    @property
+    def domain_id(self):
+        return self.table.domain_id
 
-    def __getattribute__(self, name):
-        if name not in ["topic_name", "msg_type_name", "timestamp", "valid_duration", "connection_status", "activity_status",
-                        "activity_deadline", "activity_slow_count", "activity_timeout", "activity_timeout_count"]:
-            return super().__getattribute__(name)
-        return super().__getattribute__("_" + name)
+    @domain_id.setter
+    def domain_id(self, value: int):
+        raise Exception("TopicStatusData.domain_id is read only")
 
-    def _set_topic_name(self, value: str):
-        raise Exception("TopicStatusData.topic_name is read only")
+    @property
+    def timestamp(self):
+        return self.table.timestamp.item(self.topic_id)
 
-    def _set_msg_type_name(self, value: str):
-        raise Exception("TopicStatusData.msg_type_name is read only")
+    @timestamp.setter
+    def timestamp(self, timestamp):
+        self._set(self.table.timestamp, timestamp)
 
-    def _set_timestamp(self, timestamp):
-        if not self._timestamp == timestamp:
-            self._updated = True
-            self._timestamp = timestamp
+    @property
+    def valid_duration(self):
+        return self.table.valid_duration.item(self.topic_id)
 
-    def _set_valid_duration(self, valid_duration):
-        if not self._valid_duration == valid_duration:
-            self._updated = True
-            self._valid_duration = valid_duration
+    @valid_duration.setter
+    def valid_duration(self, valid_duration):
+        self._set(self.table.valid_duration, valid_duration)
 
+    @property
+    def activity_status(self):
+        return _ACTIVITY_STATUSES[self.table.activity_status.item(self.topic_id)]
 
-    def _set_activity_status(self, status):
+    @activity_status.setter
+    def activity_status(self, status):
         if isinstance(status, int):
             status = ActivityStatus(status)
         if not isinstance(status, ActivityStatus):
             raise ValueError("TopicStatusData.activity_status must be type int or ActivityStatus()")
-        if not self._activity_status == status:
-            self._updated = True
-            self._activity_status = status
+        if self._set(self.table.activity_status, status.value) and self.on_transition is not None:
+            self.on_transition(self)
+
+    @property
+    def connection_status(self):
+        return _CONNECTION_STATUSES[self.table.connection_status.item(self.topic_id)]
 
-    def _set_connection_status(self, status):
+    @connection_status.setter
+    def connection_status(self, status):
         if isinstance(status, int):
             status = ConnectionStatus(status)
         if not isinstance(status, ConnectionStatus):
             raise ValueError("TopicStatusData.connection_status must be type int or ConnectionStatus()")
-        if not self._connection_status == status:
-            self._updated = True
-            self._connection_status = status
-
-    def _set_activity_slow_count(self, count):
-        if self._activity_slow_count > count:
-            self._logger.warn("%s.activity_slow_count decreased from %d to %d" % (self._name, self._slow_count, count))
-        if not self._activity_slow_count == count:
-            self._updated = True
-            self._activity_slow_count = count
-
-    def _set_activity_deadline(self, activity_deadline):
-        if not self._activity_deadline == activity_deadline:
-            self._updated = True
-            self._activity_deadline = activity_deadline
-
-    def _set_activity_timeout(self, activity_timeout):
-        if not self._activity_timeout == activity_timeout:
-            self._updated = True
-            self._activity_timeout = activity_timeout
-
-    def _set_activity_timeout_count(self, count):
-        if self._activity_timeout_count > count:
-            self._logger.warn("%s.activity_timeout_count decreased from %d to %d" % (self._name, self._timeout_count, count))
-        if not self._activity_timeout_count == count:
-            self._updated = True
-            self._activity_timeout_count = count
+        if self._set(self.table.connection_status, status.value) and self.on_transition is not None:
+            self.on_transition(self)
+
+    @property
+    def activity_slow_count(self):
+        return self.table.activity_slow_count.item(self.topic_id)
+
+    @activity_slow_count.setter
+    def activity_slow_count(self, count):
+        if self.activity_slow_count > count:
+            self.logger.warn("%s.activity_slow_count decreased from %d to %d" % (self.topic_name, self.activity_slow_count, count))
+        self._set(self.table.activity_slow_count, count)
+
+    @property
+    def activity_deadline(self):
+        return self.table.activity_deadline.item(self.topic_id)
+
+    @activity_deadline.setter
+    def activity_deadline(self, activity_deadline):
+        self._set(self.table.activity_deadline, activity_deadline)
+
+    @property
+    def activity_timeout(self):
+        return self.table.activity_timeout.item(self.topic_id)
+
+    @activity_timeout.setter
+    def activity_timeout(self, activity_timeout):
+        self._set(self.table.activity_timeout, activity_timeout)
+
+    @property
+    def activity_timeout_count(self):
+        return self.table.activity_timeout_count.item(self.topic_id)
+
+    @activity_timeout_count.setter
+    def activity_timeout_count(self, count):
+        if self.activity_timeout_count > count:
+            self.logger.warn("%s.activity_timeout_count decreased from %d to %d" % (self.topic_name, self.activity_timeout_count, count))
+        self._set(self.table.activity_timeout_count, count)
+
+    @property
+    def activity_max_latency(self):
+        return self.table.activity_max_latency.item(self.topic_id)
+
+    @activity_max_latency.setter
+    def activity_max_latency(self, activity_max_latency):
+        self._set(self.table.activity_max_latency, activity_max_latency)
+
+    @property
+    def activity_late_count(self):
+        return self.table.activity_late_count.item(self.topic_id)
+
+    @activity_late_count.setter
+    def activity_late_count(self, count):
+        if self.activity_late_count > count:
+            self.logger.warn("%s.activity_late_count decreased from %d to %d" % (self.topic_name, self.activity_late_count, count))
+        self._set(self.table.activity_late_count, count)
+
+    @property
+    def activity_latency_p50(self):
+        return self.table.activity_latency_p50.item(self.topic_id)
+
+    @activity_latency_p50.setter
+    def activity_latency_p50(self, latency):
+        self.table.activity_latency_p50[self.topic_id] = latency
+
+    @property
+    def activity_latency_p95(self):
+        return self.table.activity_latency_p95.item(self.topic_id)
+
+    @activity_latency_p95.setter
+    def activity_latency_p95(self, latency):
+        self.table.activity_latency_p95[self.topic_id] = latency
+
+    @property
+    def activity_max_bandwidth(self):
+        return self.table.activity_max_bandwidth.item(self.topic_id)
+
+    @activity_max_bandwidth.setter
+    def activity_max_bandwidth(self, activity_max_bandwidth):
+        self._set(self.table.activity_max_bandwidth, activity_max_bandwidth)
+
+    @property
+    def activity_bandwidth_exceeded_count(self):
+        return self.table.activity_bandwidth_exceeded_count.item(self.topic_id)
+
+    @activity_bandwidth_exceeded_count.setter
+    def activity_bandwidth_exceeded_count(self, count):
+        if self.activity_bandwidth_exceeded_count > count:
+            self.logger.warn("%s.activity_bandwidth_exceeded_count decreased from %d to %d" %
+                             (self.topic_name, self.activity_bandwidth_exceeded_count, count))
+        self._set(self.table.activity_bandwidth_exceeded_count, count)
+
+    @property
+    def activity_bandwidth(self):
+        return self.table.activity_bandwidth.item(self.topic_id)
+
+    @activity_bandwidth.setter
+    def activity_bandwidth(self, bandwidth):
+        self.table.activity_bandwidth[self.topic_id] = bandwidth
+
+    @property
+    def activity_msg_size_mean(self):
+        return self.table.activity_msg_size_mean.item(self.topic_id)
+
+    @activity_msg_size_mean.setter
+    def activity_msg_size_mean(self, size):
+        self.table.activity_msg_size_mean[self.topic_id] = size
+
+    @property
+    def activity_msg_size_p95(self):
+        return self.table.activity_msg_size_p95.item(self.topic_id)
+
+    @activity_msg_size_p95.setter
+    def activity_msg_size_p95(self, size):
+        self.table.activity_msg_size_p95[self.topic_id] = size
+
+    @property
+    def activity_msg_size_max(self):
+        return self.table.activity_msg_size_max.item(self.topic_id)
+
+    @activity_msg_size_max.setter
+    def activity_msg_size_max(self, size):
+        self.table.activity_msg_size_max[self.topic_id] = size
 
     def has_update(self):
         """ returns True if information was updated since last time this was called """
-        if self._updated:
-            self._updated = False
+        updated = self.table.updated
+        if updated[self.topic_id]:
+            updated[self.topic_id] = False
             return True
         return False
 
     def update_from_msg(self, msg):
         """ update based on TopicStatus.msg """
         assert(isinstance(msg, TopicStatus))
-        assert(msg.topic_name == self._name)
-        assert(msg.msg_type == self._msg_type)
+        assert(msg.topic_name == self.topic_name)
+        assert(msg.msg_type == self.msg_type_name)
+        assert(msg.domain_id == self.domain_id)
 
         self.timestamp = msg.timestamp
         self.valid_duration = msg.valid_duration
@@ -142,20 +424,23 @@ class TopicStatusData(object):
         self.activity_timeout = msg.activity_timeout
         self.activity_timeout_count = msg.activity_timeout_count
 
+        self.activity_max_latency = msg.activity_max_latency
+        self.activity_late_count = msg.activity_late_count
+        self.activity_latency_p50 = msg.activity_latency_p50
+        self.activity_latency_p95 = msg.activity_latency_p95
+
+        self.activity_max_bandwidth = msg.activity_max_bandwidth
+        self.activity_bandwidth_exceeded_count = msg.activity_bandwidth_exceeded_count
+        self.activity_bandwidth = msg.activity_bandwidth
+        self.activity_msg_size_mean = msg.activity_msg_size_mean
+        self.activity_msg_size_p95 = msg.activity_msg_size_p95
+        self.activity_msg_size_max = msg.activity_msg_size_max
+
     def to_msg(self):
-        """ returns TopicStatus.msg """
-        msg = TopicStatus()
-        msg.topic_name = self._topic_name
-        msg.msg_type = self._msg_type_name
-        msg.timestamp = self._timestamp
-        msg.valid_duration = self._valid_duration
-        msg.connection_status = self._connection_status.value
-        msg.activity_status = self._activity_status.value
-        msg.activity_deadline = self._activity_deadline
-        msg.activity_slow_count = self._activity_slow_count
-        msg.activity_timeout = self._activity_timeout
-        msg.activity_timeout_count = self._activity_timeout_count
-        return msg
+        """ returns TopicStatus.msg
+        The same message object is reused by every call, publish or copy it before calling again.
+        """
+        return self.table.to_msg(self.topic_id)
 
 
 
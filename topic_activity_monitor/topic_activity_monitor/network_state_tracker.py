@@ -3,57 +3,509 @@
 # License Apache 2
 import argparse
 import configparser
+import functools
 import json
 import time
 import os
-import re
 
-from topic_activity_monitor_msgs.msg import TopicStatus
+from threading import RLock
 
-from topic_activity_monitor.lib.topic_status_data import TopicStatusData, ActivityStatus
+import numpy as np
+
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
+
+from topic_activity_monitor_msgs.msg import (BandwidthReport, MonitorMetrics, NamespaceStatus, TopicPublisherStatus,
+                                             TopicStatus, TopicStatusArray)
+from topic_activity_monitor_msgs.srv import GetTopicStatuses
+
+from topic_activity_monitor.lib.better_timer import BetterTimer
+from topic_activity_monitor.lib.change_log import ChangeLog
+from topic_activity_monitor.lib.history_log import HistoryLog
+from topic_activity_monitor.lib.instrumentation import Instrumentation
+from topic_activity_monitor.lib import message_types
+from topic_activity_monitor.lib.namespace_rollup import NamespaceRollup
+from topic_activity_monitor.lib.publisher_stats import MESSAGE_INFO_SUPPORTED
+from topic_activity_monitor.lib.qos_selector import RELIABILITY_CHOICES
+from topic_activity_monitor.lib.timing_wheel import TimingWheel
+from topic_activity_monitor.lib.topic_filter import TopicFilter
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, StatusTable, TopicStatusData
 from topic_activity_monitor.connection_monitor import ConnectionMonitor
-from topic_activity_monitor.activity_monitor import ActivityMonitor
+from topic_activity_monitor.activity_monitor import ActivityMonitor, MonitorMode
+from topic_activity_monitor.sampling_scheduler import SamplingScheduler
+from topic_activity_monitor.shard_manager import ShardManager, SHARD_STATUS_PREFIX
 
 # Get script's directory so we can find relative path resources
 DIR = os.path.realpath(os.path.dirname(__file__))
 
 
 class NetworkStateTracker(object):
-    def __init__(self, ros_node, args):
+    """ Tracks the topics of the ROS domain ros_node is in.
+    A process monitoring several domains has a NetworkStateTracker per domain, and those after the
+    first are given it as primary: they share its timing wheel, sampling scheduler and
+    instrumentation (one ROS timer drives every deadline, and the subscription budget is for the
+    whole process), and keep their own topics, monitors and status topics.
+
+    Locks are always taken in this order: ActivityMonitor._lock, then topics_lock, then the
+    SamplingScheduler, BetterTimer and TimingWheel locks (which never call out while held). So nothing that
+    holds topics_lock may call into an ActivityMonitor (stop_monitor(), publishers_changed(), ...),
+    collect the monitors under topics_lock and call them after releasing it.
+    """
+    def __init__(self, ros_node, args, clock=time.time, domain_id=0, primary=None):
         self.ros_node =ros_node
         self.logger = ros_node.get_logger()
+        # Wall clock used for timestamps, replaced by a simulated clock in the benchmarks
+        self.clock = clock
+        # ROS_DOMAIN_ID of ros_node, sent in every TopicStatus
+        self.domain_id = domain_id
 
         # Topics not to monitor - set by _load_config_file()
-        self.blacklist = list()
+        self.blacklist = TopicFilter()
+        # If not empty, the only topics to monitor - set by _load_config_file()
+        self.whitelist = TopicFilter()
+        # Discovered topics that get an ActivityMonitor with learned deadlines - set by _load_config_file()
+        self.auto_monitor_filter = TopicFilter()
+
+        # Default for subscribing to serialized messages - set by _load_config_file()
+        self.raw_subscriptions = True
+        # Default subscription reliability (auto, best_effort or reliable) - set by _load_config_file()
+        self.qos_reliability = "auto"
+        # Default subscription history depth - set by _load_config_file()
+        self.qos_depth = 2
+        # Default for keeping interval statistics per publisher (needs rclpy to pass MessageInfo) - set by _load_config_file()
+        self.publisher_stats = True
+        # Default ActivityMonitor mode - set by _load_config_file()
+        self.monitor_mode = MonitorMode.DUTY_CYCLE
+        # Seconds between TopicStatusArray snapshots, 0 disables - set by _load_config_file()
+        self.aggregate_period = 1.0
+        # Seconds between MonitorMetrics messages, 0 disables instrumentation - set by _load_config_file()
+        self.metrics_period = 0.0
+        # Optional Prometheus text file written with every MonitorMetrics message - set by _load_config_file()
+        self.metrics_file = None
+        # Most subscriptions open at once, 0 for no limit - set by _load_config_file()
+        self.max_concurrent_subscriptions = 0
+        # Most bytes/s the open subscriptions may receive, 0 for no limit - set by _load_config_file()
+        self.max_subscription_bandwidth = 0.0
+        # Import the configured message types in the background while monitoring starts - set by _load_config_file()
+        self.prefetch_message_types = True
+        # Fraction each RECONNECT_WAIT_TIME is randomly varied by - set by _load_config_file()
+        self.sampling_jitter = 0.1
+        # Seed of the sampling jitter and stagger, None for a different schedule every run - set by _load_config_file()
+        self.sampling_seed = None
+        # Seconds per tick of the timing wheel, the precision of TIMEOUTs and reconnects - set by _load_config_file()
+        self.timer_resolution = 0.01
+        # Ring file every status transition is appended to, None disables - set by _load_config_file()
+        self.history_file = None
+        # Transitions kept in history_file (16 bytes each) - set by _load_config_file()
+        self.history_capacity = 1000000
+        # HistoryLog of history_file, opened once the config is loaded
+        self.history = None
+        # Seconds between publishing the namespace rollups that changed, 0 disables - set by _load_config_file()
+        self.rollup_period = 0.5
+        # NamespaceRollup of topics, created once the config is loaded
+        self.rollup = None
+        # Seconds between BandwidthReports of the topics with the highest bandwidth, 0 disables - set by _load_config_file()
+        self.bandwidth_report_period = 5.0
+        # Topics listed in each BandwidthReport - set by _load_config_file()
+        self.bandwidth_report_size = 10
+        # ActivityMonitor config for topics matching auto_monitor_filter, TOPIC_NAME and TYPE are
+        # filled in when the topic is discovered - set by _load_config_file()
+        self.auto_config = {"WINDOW_SIZE": 10,
+                            "RECONNECT_WAIT_TIME": 5.0,
+                            "DEADLINE": 0.0,        # Learned
+                            "TIMEOUT": 5.0,         # Until learned, then the least TIMEOUT
+                            "MAX_LATENCY": 0.0,     # Not monitored
+                            "MAX_BANDWIDTH": 0.0,   # Not limited
+                            "MODE": MonitorMode.DUTY_CYCLE,
+                            "LEARN_WINDOWS": 2,     # Windows used to learn the rate before judging it
+                            "TIMEOUT_FACTOR": 5.0}  # TIMEOUT as a multiple of the learned DEADLINE
 
         # Activity Monitor List
         self.activity_monitors = dict() # name(str): ActivityMonitor()
+        # Activity Monitor configs from _load_config_file(), monitors are only created for topics this shard owns
+        self.activity_configs = dict()  # name(str): config(dict)
 
        # TopicStatusData() List - list of all the topics we are tracking
         self.topics = dict() # name(str): TopicStatusData()
-        #TODO: Send out aggregated List of TopicStatusData
+        # The columns behind every TopicStatusData in topics, for sweeps over all of them
+        self.status_table = StatusTable(domain_id=domain_id)
+        # Held while adding topics, changing a TopicStatusData or publishing it, which
+        # can happen from several executor threads at once
+        self.topics_lock = RLock()
+        # Deadline on timing_wheel of each status's valid_duration, see _arm_expiry()
+        self._expiry_timers = dict()  # topic id(int): WheelTimer
+        # Versions of the changes to topics, for GetTopicStatuses clients catching up
+        self.change_log = ChangeLog()
+        self.callback_group = MutuallyExclusiveCallbackGroup()
+
+        # Updates topics connection_status, created once the monitors are set up
+        self.connection_monitor = None
+
+        # Sharded deployments split the topics between several processes. Each shard publishes the
+        # topics it owns under SHARD_STATUS_PREFIX and TopicStatusAggregator merges them
+        self.shard_manager = None
+        status_prefix = "/topic_status"
+        if args.shard_count > 1:
+            self.shard_manager = ShardManager(ros_node, self, args.shard_index, args.shard_count)
+            status_prefix = SHARD_STATUS_PREFIX
+
+        # Publisher for individual TopicStatus updates, only sent when a topic's status changes
+        # used by ConnectionMonitor and ActivityMonitor through publish_update()
+        self.update_pub = self.ros_node.create_publisher(TopicStatus, status_prefix + "/updates", 10)
+
+        # Publisher for the per publisher statistics of each ActivityMonitor window
+        self.publishers_pub = self.ros_node.create_publisher(TopicPublisherStatus, status_prefix + "/publishers", 10)
 
-        #TODO: Create watchdogs that invalidates statuses if we don't hear them updated on a regular basis (use timeout value x 1.5 ?)
-        #self._topics_watchdog_timer = self.ros_node.create_timer(0.5, self._topics_watchdog_callback)
+        # Publisher for periodic snapshots of every topic's TopicStatus
+        self.aggregate_pub = self.ros_node.create_publisher(TopicStatusArray, status_prefix + "/all", 10)
+
+        # Every topic's TopicStatus, or those changed since a version, on request
+        self.status_service = self.ros_node.create_service(GetTopicStatuses, status_prefix + "/get",
+                                                           self._get_topic_statuses_callback,
+                                                           callback_group=self.callback_group)
 
         # Load config
         self._load_config_file(os.path.join(DIR, args.config_path))
- 
+
+        # Monitors import their message type on first subscription, get a head start on that
+        if self.prefetch_message_types and primary is None:
+            message_types.prefetch(sorted({config["TYPE"] for config in self.activity_configs.values()}), self.logger)
+
+        # Log of status transitions for looking back at incidents, see topic_status_history
+        if self.history_file:
+            # Topic names are only unique within a domain, each domain gets a history file of its own
+            if primary is not None:
+                self.history_file = "%s.domain_%d" % (self.history_file, domain_id)
+            self.history = HistoryLog(self.history_file, self.history_capacity, clock=self.clock)
+            self.logger.info("Recording status transitions to '%s'" % self.history_file)
+
+        # Health counts per namespace. Each shard only sees the topics it owns, so with shards
+        # TopicStatusAggregator keeps the rollup of the merged topics instead
+        if self.rollup_period > 0 and self.shard_manager is None:
+            self.rollup = NamespaceRollup(domain_id)
+            for topic_status_data in self.topics.values():
+                self.rollup.update(topic_status_data)
+            self.namespace_pub = self.ros_node.create_publisher(NamespaceStatus, status_prefix + "/namespaces", 10)
+
+        # Network wide report of the topics with the highest bandwidth, like the rollup it is made by
+        # TopicStatusAggregator when sharded
+        if self.bandwidth_report_period > 0 and self.shard_manager is None:
+            self.bandwidth_pub = self.ros_node.create_publisher(BandwidthReport, status_prefix + "/bandwidth", 10)
+
+        # Measurements of our own performance, None when disabled so the hot paths are left unwrapped
+        self.instrumentation = None
+        self._metrics_timer = None
+        if primary is not None:
+            self.instrumentation = primary.instrumentation
+        elif self.metrics_period > 0:
+            self.instrumentation = Instrumentation(self.clock)
+            self.metrics_pub = self.ros_node.create_publisher(MonitorMetrics, status_prefix + "/metrics", 10)
+            self._metrics_timer = self.ros_node.create_timer(self.metrics_period, self._metrics_callback,
+                                                            callback_group=self.callback_group)
+
+        # Every watchdog and reconnect deadline lives on one timing wheel, driven by one ROS timer
+        # in its own callback group so deadlines are not held up by other callbacks
+        if primary is not None:
+            self.timing_wheel = primary.timing_wheel
+        else:
+            self.timing_wheel = TimingWheel(self.timer_resolution, clock=self.clock)
+            self._timing_wheel_timer = self.ros_node.create_timer(self.timer_resolution,
+                                                                 self.instrument("timing_wheel", self.timing_wheel.advance),
+                                                                 callback_group=MutuallyExclusiveCallbackGroup())
+
+        # A status that is not refreshed within its valid_duration is marked STALE, see _arm_expiry()
+        self._expire_callback = self.instrument("expiry", self._expire)
+
+        self._rollup_timer = None
+        if self.rollup is not None:
+            self._rollup_timer = BetterTimer(self.timing_wheel, self.rollup_period,
+                                             self.instrument("rollup_publish", self._rollup_callback))
+            self._rollup_timer.start()
+
+        self._bandwidth_timer = None
+        if self.bandwidth_report_period > 0 and self.shard_manager is None:
+            self._bandwidth_timer = BetterTimer(self.timing_wheel, self.bandwidth_report_period,
+                                                self.instrument("bandwidth_report", self._bandwidth_callback))
+            self._bandwidth_timer.start()
+
+        # Decides when the ActivityMonitors subscribe (must exist before rebalance() creates them)
+        if primary is not None:
+            self.sampling_scheduler = primary.sampling_scheduler
+        else:
+            self.sampling_scheduler = SamplingScheduler(ros_node, self,
+                                                        max_subscriptions=self.max_concurrent_subscriptions,
+                                                        max_bandwidth=self.max_subscription_bandwidth,
+                                                        jitter=self.sampling_jitter, seed=self.sampling_seed)
+
+        self.rebalance()
+
         # Updates topics connection_status (must be started after config has been loaded)
         self.connection_monitor = ConnectionMonitor(ros_node, self)
 
-        # Publisher for individual TopicStatus updates
-        # used by ConnectionMonitor and ActivityMonitor
-        self.update_pub = self.ros_node.create_publisher(TopicStatus, "/topic_status/updates", 10)
+        self._aggregate_timer = None
+        if self.aggregate_period > 0:
+            self._aggregate_timer = self.ros_node.create_timer(self.aggregate_period,
+                                                              self.instrument_timer("aggregate_timer_lag", self.aggregate_period,
+                                                                                    self._aggregate_callback),
+                                                              callback_group=self.callback_group)
+
+    def instrument(self, name, callback):
+        """ returns callback wrapped to record its duration in histogram name, or callback itself if instrumentation is disabled """
+        if self.instrumentation is None:
+            return callback
+        return self.instrumentation.timed(name, callback)
+
+    def instrument_timer(self, name, period, callback):
+        """ returns periodic timer callback wrapped to record how late it fires, or callback itself if instrumentation is disabled """
+        if self.instrumentation is None:
+            return callback
+        return self.instrumentation.lagged(name, period, callback)
+
+    def count(self, name, count=1):
+        """ increments counter name if instrumentation is enabled """
+        if self.instrumentation is not None:
+            self.instrumentation.increment(name, count)
+
+    def observe(self, name, value):
+        """ records value in histogram name if instrumentation is enabled """
+        if self.instrumentation is not None:
+            self.instrumentation.observe(name, value)
+
+    def _metrics_callback(self):
+        """ Publishes MonitorMetrics and writes the Prometheus text file, called by _metrics_timer """
+        instrumentation = self.instrumentation
+        msg = MonitorMetrics()
+        msg.timestamp = self.clock()
+        counters = sorted(instrumentation.counters.items())
+        msg.counter_names = [name for name, _ in counters]
+        msg.counter_values = [value for _, value in counters]
+        histograms = sorted(instrumentation.histograms.items())
+        msg.histogram_names = [name for name, _ in histograms]
+        msg.histogram_counts = [histogram.count for _, histogram in histograms]
+        msg.histogram_sums = [histogram.sum for _, histogram in histograms]
+        msg.histogram_p50 = [histogram.percentile(50) for _, histogram in histograms]
+        msg.histogram_p99 = [histogram.percentile(99) for _, histogram in histograms]
+        msg.histogram_max = [histogram.max for _, histogram in histograms]
+        self.metrics_pub.publish(msg)
+
+        if self.metrics_file:
+            try:
+                instrumentation.write_prometheus(self.metrics_file)
+            except OSError as e:
+                self.logger.warn("Failed to write metrics to '%s': %s" % (self.metrics_file, e))
+
+    def publish_update(self, topic_status_data):
+        """ Refreshes the timestamp of topic_status_data and publishes it on update_pub,
+        but only if something other than the timestamp changed since it was last published.
+        """
+        with self.topics_lock:
+            changed = topic_status_data.has_update()
+            topic_status_data.timestamp = self.clock()
+            # The timestamp alone is not an update
+            topic_status_data.has_update()
+            self._arm_expiry(topic_status_data)
+            if changed:
+                self.change_log.changed(topic_status_data.topic_name)
+            if changed and self.status_table.owned[topic_status_data.topic_id]:
+                self.update_pub.publish(topic_status_data.to_msg())
+                self.count("updates_published")
+            return changed
+
+    def own_graph_change(self):
+        """ Tells discovery a monitoring subscription is about to be created or destroyed, see GraphWatcher.own_change() """
+        if self.connection_monitor is not None:
+            self.connection_monitor.graph_watcher.own_change()
+
+    def publish_publishers(self, topic_publisher_status):
+        """ Publishes the TopicPublisherStatus of a monitor's window on publishers_pub, if this process owns the topic """
+        if self.owns_topic(topic_publisher_status.topic_name):
+            topic_publisher_status.domain_id = self.domain_id
+            self.publishers_pub.publish(topic_publisher_status)
+            self.count("publisher_statuses_published")
+
+    def set_connection_statuses(self, topic_ids, statuses):
+        """ Sets connection_status (values) of the status_table rows topic_ids in one array operation,
+        then publishes the topics whose status changed. Caller must hold topics_lock
+        """
+        for topic_id in self.status_table.set_column("connection_status", topic_ids, statuses).tolist():
+            topic_status_data = self.topics[self.status_table.topic_names[topic_id]]
+            self._transition(topic_status_data)
+            self.publish_update(topic_status_data)
+
+    def _arm_expiry(self, topic_status_data):
+        """ Moves the deadline of topic_status_data to valid_duration after its timestamp, caller must hold topics_lock.
+        Every status has at most one deadline on the timing wheel, rearmed in O(1) each time it is refreshed,
+        so only the statuses that actually run out cost anything. STALE statuses and valid_duration 0 don't expire.
+        """
+        wheel_timer = self._expiry_timers.pop(topic_status_data.topic_id, None)
+        if wheel_timer is not None:
+            self.timing_wheel.cancel(wheel_timer)
+        if topic_status_data.valid_duration > 0 and not topic_status_data.activity_status == ActivityStatus.STALE:
+            expire = functools.partial(self._expire_callback, topic_status_data, topic_status_data.timestamp)
+            self._expiry_timers[topic_status_data.topic_id] = self.timing_wheel.schedule(topic_status_data.valid_duration, expire)
+
+    def _expire(self, topic_status_data, timestamp):
+        """ Marks topic_status_data STALE unless it was refreshed since timestamp, called by the timing wheel """
+        with self.topics_lock:
+            # Refreshed while the deadline was firing
+            if not topic_status_data.timestamp == timestamp:
+                return
+            self._expiry_timers.pop(topic_status_data.topic_id, None)
+            if not self.status_table.owned[topic_status_data.topic_id]:
+                return
+            now = self.clock()
+            self.logger.warn("%s status not refreshed for %.2f s, marking it STALE" %
+                             (topic_status_data.topic_name, now - topic_status_data.timestamp))
+            topic_status_data.activity_status = ActivityStatus.STALE
+            self.count("statuses_expired")
+            self.publish_update(topic_status_data)
+
+    def _transition(self, topic_status_data):
+        """ on_transition of every TopicStatusData in topics, records it in the history and the namespace rollup """
+        if self.history is not None:
+            self.history.record(topic_status_data)
+        if self.rollup is not None:
+            self.rollup.update(topic_status_data)
+
+    def _rollup_callback(self):
+        """ Publishes NamespaceStatus of each namespace whose counts changed, called by _rollup_timer """
+        with self.topics_lock:
+            timestamp = self.clock()
+            for node in self.rollup.changed():
+                self.namespace_pub.publish(self.rollup.to_msg(node, timestamp))
+                self.count("namespace_statuses_published")
+
+    def _bandwidth_callback(self):
+        """ Publishes BandwidthReport of the topics with the highest bandwidth, called by _bandwidth_timer """
+        msg = BandwidthReport()
+        msg.domain_id = self.domain_id
+        with self.topics_lock:
+            msg.timestamp = self.clock()
+            table = self.status_table
+            bandwidths = table.activity_bandwidth[table.owned_ids()]
+            msg.topic_count = int(np.count_nonzero(bandwidths > 0))
+            msg.total_bandwidth = float(bandwidths[bandwidths > 0].sum())
+            topic_ids = table.largest("activity_bandwidth", self.bandwidth_report_size)
+            msg.topic_names = [table.topic_names[topic_id] for topic_id in topic_ids.tolist()]
+            msg.bandwidths = table.activity_bandwidth[topic_ids].tolist()
+            msg.msg_size_means = table.activity_msg_size_mean[topic_ids].tolist()
+            msg.msg_size_maxes = table.activity_msg_size_max[topic_ids].tolist()
+        self.bandwidth_pub.publish(msg)
+        self.count("bandwidth_reports_published")
+
+    def _aggregate_callback(self):
+        """ Publishes TopicStatusArray of all the topics, called by _aggregate_timer """
+        msg = TopicStatusArray()
+        msg.timestamp = self.clock()
+        with self.topics_lock:
+            snapshot = self.status_table.snapshot(self.status_table.owned_ids())
+        msg.topics = self.status_table.to_msgs(snapshot)
+        self.aggregate_pub.publish(msg)
+        self.count("snapshots_published")
+
+    def _get_topic_statuses_callback(self, request, response):
+        """ GetTopicStatuses service: every topic, or the topics changed after request.since_version """
+        with self.topics_lock:
+            # A client of a previous run, or of another tracker, gets everything
+            response.full = not self.change_log.covers(request.since_epoch, request.since_version)
+            if response.full:
+                topic_ids = self.status_table.owned_ids()
+            else:
+                topic_ids = np.array([self.status_table.ids[topic_name]
+                                      for topic_name in self.change_log.changed_since(request.since_version)], dtype=np.int64)
+                topic_ids = topic_ids[self.status_table.owned[topic_ids]]
+            response.epoch = self.change_log.epoch
+            response.version = self.change_log.version
+            snapshot = self.status_table.snapshot(topic_ids)
+        # The response is serialized after this returns, when the lock is no longer held
+        response.topics = self.status_table.to_msgs(snapshot)
+        return response
+
+    def owns_topic(self, topic_name):
+        """ returns True if this process publishes the status of topic_name (always, unless sharded) """
+        return self.shard_manager is None or self.shard_manager.owns(topic_name)
+
+    def rebalance(self):
+        """ Starts ActivityMonitors for the configured topics this shard owns and stops the others.
+        Called once the config is loaded and by ShardManager when shards join or leave.
+        """
+        with self.topics_lock:
+            for topic_name in list(self.activity_configs.keys()):
+                self._start_monitor(topic_name)
+            handed_over = [(topic_name, self.activity_monitors.pop(topic_name))
+                           for topic_name in list(self.activity_monitors.keys()) if not self.owns_topic(topic_name)]
+
+            if self.shard_manager is not None:
+                table = self.status_table
+                owned = np.array([self.owns_topic(topic_name) for topic_name in table.topic_names], dtype=np.bool_)
+                taken_over = np.flatnonzero(owned & ~table.owned[:len(table)])
+                table.owned[:len(table)] = owned
+                # Announce the current status of topics taken over from another shard
+                for topic_id in taken_over.tolist():
+                    topic_name = table.topic_names[topic_id]
+                    self.topics[topic_name].timestamp = self.clock()
+                    self._arm_expiry(self.topics[topic_name])
+                    self.change_log.changed(topic_name)
+                    self.update_pub.publish(table.to_msg(topic_id))
+
+        # Monitors take their own lock before topics_lock, so they are stopped after releasing it.
+        # They are no longer owned, so whatever they report in the meantime isn't published
+        for topic_name, activity_monitor in handed_over:
+            self.logger.info("Handing %s over to another shard" % topic_name)
+            activity_monitor.stop_monitor()
+            with self.topics_lock:
+                # Unless a rebalance since then took it back
+                if topic_name not in self.activity_monitors:
+                    self.topics[topic_name].activity_status = ActivityStatus.UNDEFINED
+
+    def add_topic(self, topic_name, msg_type_name):
+        """ returns new TopicStatusData for topic_name, added to topics. Caller must hold topics_lock """
+        assert(topic_name not in self.topics.keys())
+        topic_status_data = TopicStatusData(topic_name, msg_type_name, self.logger, table=self.status_table)
+        self.status_table.owned[topic_status_data.topic_id] = self.owns_topic(topic_name)
+        topic_status_data.on_transition = self._transition
+        if self.rollup is not None:
+            self.rollup.update(topic_status_data)
+        self.topics[topic_name] = topic_status_data
+        return topic_status_data
+
+    def _start_monitor(self, topic_name):
+        """ Starts the ActivityMonitor of topic_name if this shard owns it and it isn't running, caller must hold topics_lock """
+        if self.owns_topic(topic_name) and topic_name not in self.activity_monitors:
+            activity_monitor = ActivityMonitor(self, self.activity_configs[topic_name])
+            activity_monitor.start_monitor()
+            self.activity_monitors[topic_name] = activity_monitor
+
+    def auto_monitor(self, topic_name):
+        """ Sets up an ActivityMonitor with learned deadlines if topic_name matches AUTO_MONITOR
+        and has no config of its own, caller must hold topics_lock.
+        Called by ConnectionMonitor when it discovers a topic.
+        """
+        if len(self.auto_monitor_filter) == 0 or topic_name in self.activity_configs:
+            return
+        if not self.auto_monitor_filter.match(topic_name):
+            return
+        config = dict(self.auto_config)
+        config["TOPIC_NAME"] = topic_name
+        config["TYPE"] = self.topics[topic_name].msg_type_name
+        self.topics[topic_name].activity_timeout = config["TIMEOUT"]
+        self.topics[topic_name].activity_max_latency = config["MAX_LATENCY"]
+        self.topics[topic_name].activity_max_bandwidth = config["MAX_BANDWIDTH"]
+        self.activity_configs[topic_name] = config
+        self._start_monitor(topic_name)
 
     def check_blacklist(self, topic_name):
-        """ returns True if topic_name matches at least one pattern in the blacklist 
+        """ returns True if topic_name matches at least one pattern in the blacklist """
+        return self.blacklist.match(topic_name)
+
+    def check_whitelist(self, topic_name):
+        """ returns True if the whitelist is empty or topic_name matches at least one pattern in it """
+        return len(self.whitelist) == 0 or self.whitelist.match(topic_name)
+
+    def ignore_topic(self, topic_name):
+        """ returns True if topic_name should not be tracked
         called by ConnectionMonitor._update()
         """
-        for pattern in self.blacklist:
-            if not re.match(pattern, topic_name) is None:
-                return True
-        return False
+        return self.check_blacklist(topic_name) or not self.check_whitelist(topic_name)
 
     def _load_config_file(self, config_file_path):
         """ 
@@ -66,9 +518,64 @@ class NetworkStateTracker(object):
         config_file.read(config_file_path)
 
         # Read Settings 
-        self.blacklist += json.loads(config_file.get("SETTINGS", "blacklist"))
-        self.logger.info("Blacklist: %s" % self.blacklist)
-
+        self.blacklist.extend(json.loads(config_file.get("SETTINGS", "blacklist")))
+        self.logger.info("Blacklist: %s" % self.blacklist.patterns)
+        self.whitelist.extend(json.loads(config_file.get("SETTINGS", "whitelist", fallback="[]")))
+        if len(self.whitelist) > 0:
+            self.logger.info("Whitelist: %s" % self.whitelist.patterns)
+        self.auto_monitor_filter.extend(json.loads(config_file.get("SETTINGS", "auto_monitor", fallback="[]")))
+        if len(self.auto_monitor_filter) > 0:
+            self.logger.info("Auto monitor: %s" % self.auto_monitor_filter.patterns)
+        self.raw_subscriptions = config_file.getboolean("SETTINGS", "raw_subscriptions", fallback=self.raw_subscriptions)
+        self.qos_reliability = config_file.get("SETTINGS", "qos_reliability", fallback=self.qos_reliability)
+        if self.qos_reliability not in RELIABILITY_CHOICES:
+            raise SystemExit("Error reading config '%s':\nQOS_RELIABILITY must be one of %s" % (config_file_path, RELIABILITY_CHOICES))
+        self.qos_depth = config_file.getint("SETTINGS", "qos_depth", fallback=self.qos_depth)
+        self.publisher_stats = config_file.getboolean("SETTINGS", "publisher_stats", fallback=self.publisher_stats)
+        if self.publisher_stats and not MESSAGE_INFO_SUPPORTED:
+            self.logger.info("This rclpy doesn't pass MessageInfo to subscription callbacks, no per publisher statistics")
+        try:
+            self.monitor_mode = MonitorMode(config_file.get("SETTINGS", "monitor_mode", fallback=self.monitor_mode.value))
+        except ValueError as e:
+            raise SystemExit("Error reading config '%s':\n%s" % (config_file_path, e))
+        self.aggregate_period = config_file.getfloat("SETTINGS", "aggregate_period", fallback=self.aggregate_period)
+        self.metrics_period = config_file.getfloat("SETTINGS", "metrics_period", fallback=self.metrics_period)
+        self.metrics_file = config_file.get("SETTINGS", "metrics_file", fallback=self.metrics_file)
+        self.max_concurrent_subscriptions = config_file.getint("SETTINGS", "max_concurrent_subscriptions",
+                                                               fallback=self.max_concurrent_subscriptions)
+        self.max_subscription_bandwidth = config_file.getfloat("SETTINGS", "max_subscription_bandwidth",
+                                                               fallback=self.max_subscription_bandwidth)
+        self.prefetch_message_types = config_file.getboolean("SETTINGS", "prefetch_message_types",
+                                                             fallback=self.prefetch_message_types)
+        self.sampling_jitter = config_file.getfloat("SETTINGS", "sampling_jitter", fallback=self.sampling_jitter)
+        self.sampling_seed = config_file.getint("SETTINGS", "sampling_seed", fallback=self.sampling_seed)
+        self.timer_resolution = config_file.getfloat("SETTINGS", "timer_resolution", fallback=self.timer_resolution)
+        self.history_file = config_file.get("SETTINGS", "history_file", fallback=self.history_file)
+        self.history_capacity = config_file.getint("SETTINGS", "history_capacity", fallback=self.history_capacity)
+        self.rollup_period = config_file.getfloat("SETTINGS", "rollup_period", fallback=self.rollup_period)
+        self.bandwidth_report_period = config_file.getfloat("SETTINGS", "bandwidth_report_period",
+                                                            fallback=self.bandwidth_report_period)
+        self.bandwidth_report_size = config_file.getint("SETTINGS", "bandwidth_report_size", fallback=self.bandwidth_report_size)
+        try:
+            self.auto_config["WINDOW_SIZE"] = config_file.getint("SETTINGS", "auto_window_size", fallback=self.auto_config["WINDOW_SIZE"])
+            self.auto_config["RECONNECT_WAIT_TIME"] = config_file.getfloat("SETTINGS", "auto_reconnect_wait_time",
+                                                                           fallback=self.auto_config["RECONNECT_WAIT_TIME"])
+            self.auto_config["TIMEOUT"] = config_file.getfloat("SETTINGS", "auto_timeout", fallback=self.auto_config["TIMEOUT"])
+            self.auto_config["MAX_LATENCY"] = config_file.getfloat("SETTINGS", "auto_max_latency",
+                                                                   fallback=self.auto_config["MAX_LATENCY"])
+            self.auto_config["MAX_BANDWIDTH"] = config_file.getfloat("SETTINGS", "auto_max_bandwidth",
+                                                                     fallback=self.auto_config["MAX_BANDWIDTH"])
+            self.auto_config["LEARN_WINDOWS"] = config_file.getint("SETTINGS", "auto_learn_windows",
+                                                                   fallback=self.auto_config["LEARN_WINDOWS"])
+            self.auto_config["TIMEOUT_FACTOR"] = config_file.getfloat("SETTINGS", "auto_timeout_factor",
+                                                                      fallback=self.auto_config["TIMEOUT_FACTOR"])
+        except ValueError as e:
+            raise SystemExit("Error reading config '%s':\n%s" % (config_file_path, e))
+        assert(self.auto_config["WINDOW_SIZE"] >= 2), "AUTO_WINDOW_SIZE must be >= 2. Received %d" % self.auto_config["WINDOW_SIZE"]
+        self.auto_config["RAW"] = self.raw_subscriptions
+        self.auto_config["RELIABILITY"] = self.qos_reliability
+        self.auto_config["QOS_DEPTH"] = self.qos_depth
+        self.auto_config["PUBLISHER_STATS"] = self.publisher_stats
 
         # Read Individual Topic Configurations
         for section_name in config_file.sections():
@@ -84,27 +591,40 @@ class NetworkStateTracker(object):
                 config["DEADLINE"] = config_file.getfloat(topic_name, "DEADLINE")
                 config["TIMEOUT"] = config_file.getfloat(topic_name, "TIMEOUT")
                 config["WINDOW_SIZE"] = config_file.getint(topic_name, "WINDOW_SIZE")
-                config["RECONNECT_WAIT_TIME"] = config_file.getfloat(topic_name, "RECONNECT_WAIT_TIME")
+                config["MAX_LATENCY"] = config_file.getfloat(topic_name, "MAX_LATENCY", fallback=0.0)
+                config["MAX_BANDWIDTH"] = config_file.getfloat(topic_name, "MAX_BANDWIDTH", fallback=0.0)
+                config["MODE"] = MonitorMode(config_file.get(topic_name, "MODE", fallback=self.monitor_mode.value))
+                # Continuous monitors never disconnect, so they don't need a reconnect time
+                if config["MODE"] == MonitorMode.CONTINUOUS:
+                    config["RECONNECT_WAIT_TIME"] = config_file.getfloat(topic_name, "RECONNECT_WAIT_TIME", fallback=0.0)
+                else:
+                    config["RECONNECT_WAIT_TIME"] = config_file.getfloat(topic_name, "RECONNECT_WAIT_TIME")
+                config["RAW"] = config_file.getboolean(topic_name, "RAW", fallback=self.raw_subscriptions)
+                config["RELIABILITY"] = config_file.get(topic_name, "RELIABILITY", fallback=self.qos_reliability)
+                config["QOS_DEPTH"] = config_file.getint(topic_name, "QOS_DEPTH", fallback=self.qos_depth)
+                config["PUBLISHER_STATS"] = config_file.getboolean(topic_name, "PUBLISHER_STATS", fallback=self.publisher_stats)
             except configparser.NoOptionError as e:
-                raise SystemExit("Error reading config '%s':\n%s" % (config_path, e))
+                raise SystemExit("Error reading config '%s':\n%s" % (config_file_path, e))
             except ValueError as e:
-                raise SystemExit("Error reading config '%s':\n%s" % (config_path, e))
+                raise SystemExit("Error reading config '%s':\n%s" % (config_file_path, e))
 
-            # Skip setting up topics in the blacklist
-            if self.check_blacklist(topic_name):
+            # Check the values match requirements
+            assert(config["WINDOW_SIZE"] >= 2), "%s: WINDOW_SIZE must be >= 2. Received %d" % (topic_name, config["WINDOW_SIZE"])
+            assert(config["RELIABILITY"] in RELIABILITY_CHOICES), "%s: RELIABILITY must be one of %s. Received %s" % \
+                (topic_name, RELIABILITY_CHOICES, config["RELIABILITY"])
+            assert(config["QOS_DEPTH"] >= 1), "%s: QOS_DEPTH must be >= 1. Received %d" % (topic_name, config["QOS_DEPTH"])
+
+            # Skip setting up topics in the blacklist or missing from the whitelist
+            if self.ignore_topic(topic_name):
                 continue
  
             # Add topic, configure with settings from the config
-            assert(topic_name not in self.topics.keys())
-            self.topics[topic_name] = TopicStatusData(topic_name, config["TYPE"], self.logger)
-            self.topics[topic_name].activity_deadline = config["DEADLINE"]
-            self.topics[topic_name].activity_timeout = config["TIMEOUT"]
-
-            # Setup Activity Monitor for topic
-            activity_monitor = ActivityMonitor(self, config)
-            activity_monitor.start_monitor()
-            self.activity_monitors[topic_name] = activity_monitor
+            topic_status_data = self.add_topic(topic_name, config["TYPE"])
+            topic_status_data.activity_deadline = config["DEADLINE"]
+            topic_status_data.activity_timeout = config["TIMEOUT"]
+            topic_status_data.activity_max_latency = config["MAX_LATENCY"]
+            topic_status_data.activity_max_bandwidth = config["MAX_BANDWIDTH"]
 
-            # Check the values match requirements
-            assert(config["WINDOW_SIZE"] >= 2), "%s: WINDOW_SIZE must be >= 2. Received %d" % (topic_name, config["WINDOW_SIZE"])
+            # Activity Monitor for topic is setup by rebalance()
+            self.activity_configs[topic_name] = config
 
@@ -0,0 +1,212 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import functools
+import heapq
+import itertools
+import math
+import random
+
+from threading import RLock
+
+from topic_activity_monitor.lib.better_timer import BetterTimer
+from topic_activity_monitor.lib.ring_buffer import RingBuffer
+
+# Seconds between grants of the subscriptions that are due
+UPDATE_PERIOD = 0.05
+# Recent grants (and releases) expected_delay() is estimated from
+GRANT_HISTORY = 64
+
+class SamplingScheduler(object):
+    """ Decides when ActivityMonitors may open their subscriptions.
+
+    Monitors request() a subscription instead of subscribing themselves, and release() it when
+    their window is complete. At most max_subscriptions are open at once, and the bytes/s measured
+    on each topic during its previous window must fit in max_bandwidth (0 disables either limit).
+    Reconnect delays get +/- jitter so monitors started together drift apart, and monitors started
+    at the same time are spread over their first RECONNECT_WAIT_TIME.
+
+    When more monitors are due than can be granted, those whose last window changed their
+    status (or that have never been sampled) go first, then the ones that have waited longest.
+    Continuous monitors keep their subscription once granted, so while duty cycle monitors are
+    waiting they may take at most max_subscriptions - 1 slots, and the rest are not monitored.
+
+    Reconnect delays are deadlines on the tracker's TimingWheel, which also runs _update().
+    The scheduler lock is never held while calling into a monitor, so monitors may call
+    request() and release() while holding their own lock.
+    """
+    def __init__(self, ros_node, network_state_tracker, max_subscriptions=0, max_bandwidth=0.0, jitter=0.1, period=UPDATE_PERIOD,
+                 seed=None):
+        self.ros_node = ros_node
+        self.logger = ros_node.get_logger()
+        self.network_state_tracker = network_state_tracker
+        self._clock = network_state_tracker.clock
+
+        self.max_subscriptions = max_subscriptions  # Open subscriptions, 0 for no limit
+        self.max_bandwidth = max_bandwidth          # bytes/s, 0 for no limit
+        self.jitter = jitter                        # Fraction each reconnect delay may vary by
+        self._random = random.Random(seed)          # Seeded for a repeatable schedule
+
+        self._lock = RLock()
+        self._timing_wheel = network_state_tracker.timing_wheel
+        self._sequence = itertools.count()
+        self._ready = list()       # heap of (urgency, eligible time, sequence, monitor) due, waiting for budget
+        self._queued = dict()      # monitor: sequence of its current request, stale entries are skipped
+        self._delays = dict()      # monitor: WheelTimer of its request, while not yet due
+        self._active = dict()      # monitor: estimated bytes/s of its open subscription
+        self._continuous = set()   # monitors in _active that keep their subscription
+        self._bandwidth = dict()   # (domain id(int), topic name(str)): bytes/s measured during its last window
+        self._grant_delays = RingBuffer(GRANT_HISTORY)  # Seconds from due to granted of recent grants
+        self._hold_times = RingBuffer(GRANT_HISTORY)    # Seconds recently released subscriptions were held
+        self._expected_delay = period                   # Returned by expected_delay(), set by _update() and release()
+        self._period = period
+        self._starved_warned = False  # Warned that continuous monitors are held back to leave a slot
+
+        self._update_timer = BetterTimer(self._timing_wheel, period, network_state_tracker.instrument("sampling_update", self._update))
+        self._update_timer.start()
+
+    @property
+    def limited(self):
+        """ True if subscriptions compete for a limited budget """
+        return self.max_subscriptions > 0 or self.max_bandwidth > 0
+
+    def expected_delay(self):
+        """ returns the seconds a request may wait after its delay before it is granted, see _estimate_delay().
+        Called by every ActivityMonitor update, so it only reads the value kept by _update() and release()
+        """
+        return self._expected_delay
+
+    def request(self, monitor, delay=0.0):
+        """ queues monitor to be granted a subscription in delay seconds (+/- jitter) """
+        if delay > 0 and self.jitter > 0:
+            delay *= 1.0 + self._random.uniform(-self.jitter, self.jitter)
+        self._queue(monitor, delay)
+
+    def request_staggered(self, monitor, max_delay):
+        """ queues monitor to be granted a subscription at a random time within max_delay seconds """
+        self._queue(monitor, self._random.uniform(0.0, max_delay) if max_delay > 0 else 0.0)
+
+    def _queue(self, monitor, delay):
+        with self._lock:
+            self._cancel_delay(monitor)
+            sequence = next(self._sequence)
+            self._queued[monitor] = sequence
+            eligible = self._clock() + delay
+            self._delays[monitor] = self._timing_wheel.schedule(delay, functools.partial(self._due, monitor, sequence, eligible))
+
+    def _due(self, monitor, sequence, eligible):
+        """ moves a request whose delay has passed to the ready queue, called by the timing wheel """
+        urgency = 0 if monitor.urgent() else 1
+        with self._lock:
+            if not self._queued.get(monitor) == sequence:
+                return
+            self._delays.pop(monitor, None)
+            heapq.heappush(self._ready, (urgency, eligible, sequence, monitor))
+
+    def _cancel_delay(self, monitor):
+        """ caller must hold _lock """
+        wheel_timer = self._delays.pop(monitor, None)
+        if wheel_timer is not None:
+            self._timing_wheel.cancel(wheel_timer)
+
+    def release(self, monitor, byte_count=0, duration=0.0):
+        """ frees the subscription granted to monitor. byte_count received over duration seconds
+        becomes the bandwidth estimate for its next window
+        """
+        with self._lock:
+            if monitor in self._active and duration > 0:
+                self._hold_times.push(duration)
+            self._active.pop(monitor, None)
+            self._continuous.discard(monitor)
+            if byte_count > 0 and duration > 0:
+                self._bandwidth[(monitor.status.domain_id, monitor.status.topic_name)] = byte_count / duration
+            if self.limited:
+                self._estimate_delay()
+
+    def remove(self, monitor):
+        """ forgets monitor, releasing its subscription and dropping any queued request """
+        with self._lock:
+            self._active.pop(monitor, None)
+            self._continuous.discard(monitor)
+            self._queued.pop(monitor, None)
+            self._cancel_delay(monitor)
+
+    def _update(self):
+        """ Grants subscriptions to ready monitors while the budget allows, called by _update_timer """
+        now = self._clock()
+        granted = list()   # (monitor, eligible time)
+        held_back = list()  # Ready entries of continuous monitors kept from the last slot
+        with self._lock:
+            while self._ready:
+                urgency, eligible, sequence, monitor = self._ready[0]
+                if not self._queued.get(monitor) == sequence:
+                    heapq.heappop(self._ready)
+                    continue
+                bandwidth = self._bandwidth.get((monitor.status.domain_id, monitor.status.topic_name), 0.0)
+                if not self._has_budget(bandwidth):
+                    break
+                if monitor.continuous() and self._last_slot():
+                    held_back.append(heapq.heappop(self._ready))
+                    continue
+                heapq.heappop(self._ready)
+                del self._queued[monitor]
+                self._active[monitor] = bandwidth
+                if monitor.continuous():
+                    self._continuous.add(monitor)
+                self._grant_delays.push(now - eligible)
+                granted.append((monitor, eligible))
+            for entry in held_back:
+                heapq.heappush(self._ready, entry)
+            if self.limited:
+                self._estimate_delay()
+
+        for monitor, eligible in granted:
+            if monitor.grant():
+                self.network_state_tracker.count("sampling_grants")
+                self.network_state_tracker.observe("sampling_grant_delay", now - eligible)
+            else:
+                # Stopped while it was queued, or it could not subscribe
+                self.release(monitor)
+
+    def _estimate_delay(self):
+        """ updates _expected_delay, caller must hold _lock.
+        Without limits a request waits for the next _update(). Otherwise it is the longest recent wait for
+        budget, and with max_subscriptions at least the time the slots take to serve every queued request
+        (known before the queue has built up).
+        The valid_duration built on it republishes every status it changes, so it is rounded up to a power
+        of two, rises as soon as the wait does, and only falls once the wait is below a quarter of it
+        """
+        delay = self._grant_delays.max()
+        if self.max_subscriptions > 0 and len(self._hold_times) > 0:
+            slots = max(self.max_subscriptions - len(self._continuous), 1)
+            delay = max(delay, len(self._queued) * self._hold_times.mean() / slots)
+        delay += self._period
+        if delay > self._expected_delay or delay < self._expected_delay / 4.0:
+            self._expected_delay = 2.0 ** math.ceil(math.log2(delay))
+
+    def _last_slot(self):
+        """ returns True if a continuous monitor would take the last subscription slot that duty cycle
+        monitors have left, and warns the first time. Caller must hold _lock
+        """
+        if self.max_subscriptions <= 0:
+            return False
+        continuous = len(self._continuous)
+        if continuous < self.max_subscriptions - 1:
+            return False
+        if not any(not monitor.continuous() for monitor in itertools.chain(self._active, self._queued)):
+            return False
+        if not self._starved_warned:
+            self._starved_warned = True
+            self.logger.warn("Continuous monitors hold %d of MAX_CONCURRENT_SUBSCRIPTIONS %d, the last one is kept for "
+                             "duty cycle monitors and further continuous topics are not monitored. Raise "
+                             "MAX_CONCURRENT_SUBSCRIPTIONS or use duty_cycle mode" % (continuous, self.max_subscriptions))
+        return True
+
+    def _has_budget(self, bandwidth):
+        """ returns True if one more subscription expected to use bandwidth bytes/s fits, caller must hold _lock """
+        if self.max_subscriptions > 0 and len(self._active) >= self.max_subscriptions:
+            return False
+        # A topic bigger than the whole budget still gets sampled on its own
+        if self.max_bandwidth > 0 and self._active and sum(self._active.values()) + bandwidth > self.max_bandwidth:
+            return False
+        return True
@@ -0,0 +1,64 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+from topic_activity_monitor.lib.hash_ring import HashRing
+
+SHARD_NODE_PREFIX = "_topic_activity_monitor_shard_"
+# Shards publish TopicStatus and TopicStatusArray here, TopicStatusAggregator republishes them under /topic_status
+SHARD_STATUS_PREFIX = "/topic_status/shard"
+
+def shard_node_name(shard_index):
+    return "%s%d" % (SHARD_NODE_PREFIX, shard_index)
+
+class ShardManager(object):
+    """ Decides which topics this shard owns using a consistent hash ring of the live shards.
+    Shards find each other by node name on the ROS graph. A shard that has not been seen for
+    shard_timeout seconds is dropped from the ring, and the tracker rebalances its topics.
+    """
+    def __init__(self, ros_node, network_state_tracker, shard_index, shard_count, shard_timeout=3.0):
+        self.ros_node = ros_node
+        self.logger = ros_node.get_logger()
+        self.network_state_tracker = network_state_tracker
+        self._clock = network_state_tracker.clock
+
+        self.shard_name = shard_node_name(shard_index)
+        self._shard_timeout = shard_timeout
+
+        # Start out assuming every configured shard is alive, so shards don't all claim every topic at startup
+        now = self._clock()
+        self._last_seen = {shard_node_name(i): now for i in range(shard_count)}  # name(str): time last seen
+        self._last_seen[self.shard_name] = now
+        self.ring = HashRing(self._last_seen.keys())
+        self._owned = dict()  # topic_name(str): owned(bool), cleared when the ring changes
+
+        self._update_timer = self.ros_node.create_timer(1.0, self._update, callback_group=network_state_tracker.callback_group)
+        self.logger.info("%s started with shards %s" % (self.shard_name, sorted(self.ring.nodes)))
+
+    def owns(self, topic_name):
+        """ returns True if this shard is responsible for topic_name """
+        try:
+            return self._owned[topic_name]
+        except KeyError:
+            owned = self.ring.get_node(topic_name) == self.shard_name
+            self._owned[topic_name] = owned
+            return owned
+
+    def _update(self):
+        """ Updates the ring from the shard nodes on the graph, called by _update_timer """
+        now = self._clock()
+        for node_name, _ in self.ros_node.get_node_names_and_namespaces():
+            if node_name.startswith(SHARD_NODE_PREFIX):
+                self._last_seen[node_name] = now
+        self._last_seen[self.shard_name] = now
+
+        live = {name for name, last_seen in self._last_seen.items() if now - last_seen < self._shard_timeout}
+        if live == self.ring.nodes:
+            return
+        for name in self.ring.nodes - live:
+            self.logger.warn("Shard %s is gone, taking over its topics" % name)
+            self.ring.remove_node(name)
+        for name in live - self.ring.nodes:
+            self.logger.info("Shard %s joined" % name)
+            self.ring.add_node(name)
+        self._owned.clear()
+        self.network_state_tracker.rebalance()
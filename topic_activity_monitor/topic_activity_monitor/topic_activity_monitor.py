@@ -2,29 +2,66 @@
 # Date: 2023-09-08
 # License Apache 2
 import argparse
+from threading import Thread
 
 import rclpy
+from rclpy.executors import MultiThreadedExecutor, SingleThreadedExecutor
 
 from topic_activity_monitor.network_state_tracker import NetworkStateTracker
+from topic_activity_monitor.shard_manager import shard_node_name
 
 NAME = "_topic_activity_monitor"
 
 def main(args=None):
-    rclpy.init(args=args)
+    argv = args
     parser = argparse.ArgumentParser(NAME)
     parser.add_argument("--config-path", type=str, default="config/example.ini")
-    args = parser.parse_args(rclpy.utilities.remove_ros_args()[1:])
+    parser.add_argument("--executor", type=str, choices=["single", "multi"], default="single",
+                        help="single: spin every callback on one thread, multi: MultiThreadedExecutor")
+    parser.add_argument("--threads", type=int, default=None, help="Number of threads for --executor multi")
+    parser.add_argument("--shard-count", type=int, default=1,
+                        help="Number of monitor processes sharing the topics, merged by topic_status_aggregator")
+    parser.add_argument("--shard-index", type=int, default=0, help="Index of this process when --shard-count > 1")
+    parser.add_argument("--domains", type=int, nargs="+", default=None,
+                        help="ROS_DOMAIN_IDs to monitor from this process, instead of just ROS_DOMAIN_ID")
+    args = parser.parse_args(rclpy.utilities.remove_ros_args(argv)[1:])
+    node_name = NAME if args.shard_count == 1 else shard_node_name(args.shard_index)
 
-    ros_node = rclpy.create_node(NAME)
-    network_tracker = NetworkStateTracker(ros_node, args)
+    # A node per domain, the first in the default context (the only one rclpy's graph listener
+    # watches) and the others in contexts of their own. The first domain's tracker owns the timing
+    # wheel and sampling scheduler that the others share
+    network_trackers = list()
+    for domain_id in (args.domains or [None]):
+        context = rclpy.utilities.get_default_context() if not network_trackers else rclpy.Context()
+        rclpy.init(args=argv, context=context, domain_id=domain_id)
+        ros_node = rclpy.create_node(node_name, context=context)
+        primary = network_trackers[0] if network_trackers else None
+        network_trackers.append(NetworkStateTracker(ros_node, args, domain_id=context.get_domain_id(), primary=primary))
+
+    # An executor waits in a single context, so each domain gets its own. The first spins here and
+    # the others on threads of their own, the trackers lock what they share
+    executors = list()
+    for network_tracker in network_trackers:
+        context = network_tracker.ros_node.context
+        if args.executor == "multi":
+            executor = MultiThreadedExecutor(num_threads=args.threads, context=context)
+        else:
+            executor = SingleThreadedExecutor(context=context)
+        executor.add_node(network_tracker.ros_node)
+        executors.append(executor)
+    threads = [Thread(target=executor.spin, daemon=True) for executor in executors[1:]]
+    for thread in threads:
+        thread.start()
 
     try:
-        while rclpy.ok():
-            rclpy.spin_once(ros_node)
+        executors[0].spin()
     except KeyboardInterrupt:
         pass
 
-    rclpy.shutdown()
+    for network_tracker in network_trackers:
+        network_tracker.ros_node.context.try_shutdown()
+    for thread in threads:
+        thread.join()
 
 if __name__ == "__main__":
     main()
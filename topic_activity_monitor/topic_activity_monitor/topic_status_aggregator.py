@@ -0,0 +1,157 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+import argparse
+import heapq
+import time
+
+import rclpy
+
+from topic_activity_monitor_msgs.msg import BandwidthReport, NamespaceStatus, TopicStatus, TopicStatusArray
+from topic_activity_monitor_msgs.srv import GetTopicStatuses
+
+from topic_activity_monitor.lib.change_log import ChangeLog
+from topic_activity_monitor.lib.namespace_rollup import NamespaceRollup
+from topic_activity_monitor.lib.topic_status_data import TopicStatusData
+from topic_activity_monitor.shard_manager import SHARD_STATUS_PREFIX
+
+NAME = "_topic_status_aggregator"
+
+class TopicStatusAggregator(object):
+    """ Merges the TopicStatus streams of every shard into one view, published under /topic_status.
+    Each topic is owned by one shard at a time. When ownership moves, messages older than the
+    newest one already merged for that topic are dropped.
+    The shards only see the topics they own, so the namespace rollups and bandwidth reports are made here.
+    """
+    def __init__(self, ros_node, args):
+        self.ros_node = ros_node
+        self.logger = ros_node.get_logger()
+
+        self.topics = dict()  # name(str): TopicStatusData()
+        self.change_log = ChangeLog()
+
+        self.update_pub = self.ros_node.create_publisher(TopicStatus, "/topic_status/updates", 10)
+        self.aggregate_pub = self.ros_node.create_publisher(TopicStatusArray, "/topic_status/all", 10)
+
+        self._update_sub = self.ros_node.create_subscription(TopicStatus, SHARD_STATUS_PREFIX + "/updates",
+                                                             self._update_callback, 100)
+        self._aggregate_sub = self.ros_node.create_subscription(TopicStatusArray, SHARD_STATUS_PREFIX + "/all",
+                                                                self._shard_aggregate_callback, 10)
+        self.status_service = self.ros_node.create_service(GetTopicStatuses, "/topic_status/get",
+                                                           self._get_topic_statuses_callback)
+
+        self._aggregate_timer = None
+        if args.aggregate_period > 0:
+            self._aggregate_timer = self.ros_node.create_timer(args.aggregate_period, self._aggregate_callback)
+
+        self.rollup = None
+        self._rollup_timer = None
+        if args.rollup_period > 0:
+            self.rollup = NamespaceRollup(ros_node.context.get_domain_id())
+            self.namespace_pub = self.ros_node.create_publisher(NamespaceStatus, "/topic_status/namespaces", 10)
+            self._rollup_timer = self.ros_node.create_timer(args.rollup_period, self._rollup_callback)
+
+        self.bandwidth_report_size = args.bandwidth_report_size
+        self._bandwidth_timer = None
+        if args.bandwidth_report_period > 0:
+            self.bandwidth_pub = self.ros_node.create_publisher(BandwidthReport, "/topic_status/bandwidth", 10)
+            self._bandwidth_timer = self.ros_node.create_timer(args.bandwidth_report_period, self._bandwidth_callback)
+
+    def _merge(self, msg):
+        """ returns True if msg changed anything besides the timestamp """
+        topic_status_data = self.topics.get(msg.topic_name)
+        if topic_status_data is None:
+            topic_status_data = TopicStatusData(msg.topic_name, msg.msg_type, self.logger, domain_id=msg.domain_id)
+            self.topics[msg.topic_name] = topic_status_data
+            if self.rollup is not None:
+                topic_status_data.on_transition = self.rollup.update
+                self.rollup.update(topic_status_data)
+        elif msg.timestamp < topic_status_data.timestamp:
+            # Sent by the previous owner of the topic
+            return False
+
+        topic_status_data.timestamp = msg.timestamp
+        topic_status_data.has_update()
+        topic_status_data.update_from_msg(msg)
+        if not topic_status_data.has_update():
+            return False
+        self.change_log.changed(msg.topic_name)
+        return True
+
+    def _update_callback(self, msg):
+        if self._merge(msg):
+            self.update_pub.publish(msg)
+
+    def _shard_aggregate_callback(self, msg):
+        # Snapshots also repair updates that were missed
+        for topic_status in msg.topics:
+            if self._merge(topic_status):
+                self.update_pub.publish(topic_status)
+
+    def _get_topic_statuses_callback(self, request, response):
+        """ GetTopicStatuses service over the merged topics, see NetworkStateTracker """
+        response.full = not self.change_log.covers(request.since_epoch, request.since_version)
+        if response.full:
+            topic_names = self.topics.keys()
+        else:
+            topic_names = self.change_log.changed_since(request.since_version)
+        response.epoch = self.change_log.epoch
+        response.version = self.change_log.version
+        response.topics = [self.topics[topic_name].to_msg() for topic_name in topic_names]
+        return response
+
+    def _rollup_callback(self):
+        """ Publishes NamespaceStatus of each namespace whose counts changed, called by _rollup_timer """
+        timestamp = time.time()
+        for node in self.rollup.changed():
+            self.namespace_pub.publish(self.rollup.to_msg(node, timestamp))
+
+    def _bandwidth_callback(self):
+        """ Publishes BandwidthReport of the merged topics with the highest bandwidth, called by _bandwidth_timer """
+        msg = BandwidthReport()
+        msg.domain_id = self.ros_node.context.get_domain_id()
+        msg.timestamp = time.time()
+        measured = [topic_status_data for topic_status_data in self.topics.values() if topic_status_data.activity_bandwidth > 0]
+        msg.topic_count = len(measured)
+        msg.total_bandwidth = sum(topic_status_data.activity_bandwidth for topic_status_data in measured)
+        largest = heapq.nlargest(self.bandwidth_report_size, measured,
+                                 key=lambda topic_status_data: topic_status_data.activity_bandwidth)
+        msg.topic_names = [topic_status_data.topic_name for topic_status_data in largest]
+        msg.bandwidths = [topic_status_data.activity_bandwidth for topic_status_data in largest]
+        msg.msg_size_means = [topic_status_data.activity_msg_size_mean for topic_status_data in largest]
+        msg.msg_size_maxes = [topic_status_data.activity_msg_size_max for topic_status_data in largest]
+        self.bandwidth_pub.publish(msg)
+
+    def _aggregate_callback(self):
+        """ Publishes TopicStatusArray of the merged topics, called by _aggregate_timer """
+        msg = TopicStatusArray()
+        msg.timestamp = time.time()
+        msg.topics = [topic_status_data.to_msg() for topic_status_data in self.topics.values()]
+        self.aggregate_pub.publish(msg)
+
+def main(args=None):
+    rclpy.init(args=args)
+    parser = argparse.ArgumentParser(NAME)
+    parser.add_argument("--aggregate-period", type=float, default=1.0,
+                        help="Seconds between merged TopicStatusArray snapshots, 0 disables")
+    parser.add_argument("--rollup-period", type=float, default=0.5,
+                        help="Seconds between NamespaceStatus of the namespaces whose counts changed, 0 disables")
+    parser.add_argument("--bandwidth-report-period", type=float, default=5.0,
+                        help="Seconds between BandwidthReports of the topics with the highest bandwidth, 0 disables")
+    parser.add_argument("--bandwidth-report-size", type=int, default=10,
+                        help="Topics listed in each BandwidthReport")
+    args = parser.parse_args(rclpy.utilities.remove_ros_args()[1:])
+
+    ros_node = rclpy.create_node(NAME)
+    # Kept alive by the subscriptions and timers it creates on ros_node
+    TopicStatusAggregator(ros_node, args)
+
+    try:
+        rclpy.spin(ros_node)
+    except KeyboardInterrupt:
+        pass
+
+    rclpy.shutdown()
+
+if __name__ == "__main__":
+    main()
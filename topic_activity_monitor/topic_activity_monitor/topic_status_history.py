@@ -0,0 +1,66 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Queries the status transitions recorded in a HISTORY_FILE.
+
+Usage:
+    topic_status_history /var/log/topic_status.history --last 86400 --summary
+    topic_status_history /var/log/topic_status.history --since 1760000000 --until 1760003600 --status TIMEOUT
+    topic_status_history /var/log/topic_status.history --topic "/camera/" --last 600
+"""
+import argparse
+import time
+
+from topic_activity_monitor.lib.history_log import HistoryReader
+from topic_activity_monitor.lib.topic_filter import TopicFilter
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, ConnectionStatus
+
+NAME = "topic_status_history"
+
+def format_time(timestamp):
+    return "%s.%03d" % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)), int(timestamp * 1000) % 1000)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(NAME)
+    parser.add_argument("history_file", type=str, help="HISTORY_FILE from the monitor's config")
+    parser.add_argument("--topic", type=str, nargs="+", default=None, help="Only topics matching one of these patterns")
+    parser.add_argument("--since", type=float, default=None, help="Start time (seconds since the epoch)")
+    parser.add_argument("--until", type=float, default=None, help="End time (seconds since the epoch), defaults to now")
+    parser.add_argument("--last", type=float, default=None, help="Start LAST seconds before --until")
+    parser.add_argument("--status", type=str, nargs="+", default=None, choices=[status.name for status in ActivityStatus],
+                        help="Only transitions to one of these activity statuses")
+    parser.add_argument("--connection", type=str, nargs="+", default=None, choices=[status.name for status in ConnectionStatus],
+                        help="Only transitions to one of these connection statuses")
+    parser.add_argument("--summary", action="store_true", help="Print the time each topic spent in each activity status")
+    args = parser.parse_args(args)
+
+    until = time.time() if args.until is None else args.until
+    since = args.since
+    if args.last is not None:
+        since = until - args.last
+
+    reader = HistoryReader(args.history_file)
+    topic_ids = None
+    if args.topic is not None:
+        topic_filter = TopicFilter(args.topic)
+        topic_ids = reader.topic_ids([topic_name for topic_name in reader.topic_names if topic_filter.match(topic_name)])
+
+    if args.summary:
+        if since is None:
+            since = reader.records["timestamp"][0] if len(reader.records) > 0 else until
+        statuses = list(ActivityStatus)
+        print("%-40s" % "topic" + "".join(" %13s" % status.name for status in statuses))
+        for topic_id, seconds in sorted(reader.time_in_status(since, until, topic_ids).items(),
+                                        key=lambda item: reader.topic_names[item[0]]):
+            print("%-40s" % reader.topic_names[topic_id] + "".join(" %13.1f" % seconds[status.value] for status in statuses))
+        return
+
+    activity_status = None if args.status is None else [ActivityStatus[name].value for name in args.status]
+    connection_status = None if args.connection is None else [ConnectionStatus[name].value for name in args.connection]
+    for record in reader.query(topic_ids, since, until, activity_status, connection_status):
+        print("%s %-40s %-12s %s" % (format_time(record["timestamp"]), reader.topic_names[record["topic_id"]],
+                                     ConnectionStatus(record["connection_status"]).name,
+                                     ActivityStatus(record["activity_status"]).name))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Author: Dan Brooks [db] ros2@danbrooks.net
+# Date: 2026-10-18
+# License Apache 2
+""" Replays a rosbag2 recording through the ACTIVE/SLOW/TIMEOUT rules of a monitor config, faster than real time.
+
+Only the receive timestamps are read from the bag, and each topic section's DEADLINE, TIMEOUT,
+WINDOW_SIZE, RECONNECT_WAIT_TIME and MODE are evaluated over them as whole numpy arrays.
+
+    topic_status_replay rosbag2_2026_10_18-12_00_00 --config-path /etc/topic_monitor.ini
+    topic_status_replay incident.mcap --config-path monitor.ini --summary
+    topic_status_replay incident.db3 --config-path monitor.ini --history incident.history
+    topic_status_history incident.history --status SLOW TIMEOUT
+"""
+import argparse
+import configparser
+import os
+import time
+
+from topic_activity_monitor.lib.bag_reader import BagTimestamps
+from topic_activity_monitor.lib.history_log import HistoryLog
+from topic_activity_monitor.lib.status_replay import replay_continuous, replay_duty_cycle, time_in_status, RESOLUTION
+from topic_activity_monitor.lib.topic_filter import TopicFilter
+from topic_activity_monitor.lib.topic_status_data import ActivityStatus, TopicStatusData
+from topic_activity_monitor.topic_status_history import format_time
+
+NAME = "topic_status_replay"
+DIR = os.path.realpath(os.path.dirname(__file__))
+MODES = ["duty_cycle", "continuous"]
+
+def read_topic_configs(config_path):
+    """ returns {topic_name: config(dict)} of the topic sections of a monitor config """
+    config_file = configparser.ConfigParser(inline_comment_prefixes=('#'))
+    if len(config_file.read(config_path)) == 0:
+        raise SystemExit("Can't read config '%s'" % config_path)
+    monitor_mode = config_file.get("SETTINGS", "monitor_mode", fallback="duty_cycle")
+    timer_resolution = config_file.getfloat("SETTINGS", "timer_resolution", fallback=RESOLUTION)
+
+    configs = dict()
+    for topic_name in config_file.sections():
+        if topic_name == "SETTINGS":
+            continue
+        try:
+            config = dict()
+            config["DEADLINE"] = config_file.getfloat(topic_name, "DEADLINE")
+            config["TIMEOUT"] = config_file.getfloat(topic_name, "TIMEOUT")
+            config["WINDOW_SIZE"] = config_file.getint(topic_name, "WINDOW_SIZE")
+            config["MODE"] = config_file.get(topic_name, "MODE", fallback=monitor_mode)
+            config["TIMER_RESOLUTION"] = timer_resolution
+            # Continuous monitors never disconnect, so they don't need a reconnect time
+            if config["MODE"] == "continuous":
+                config["RECONNECT_WAIT_TIME"] = config_file.getfloat(topic_name, "RECONNECT_WAIT_TIME", fallback=0.0)
+            else:
+                config["RECONNECT_WAIT_TIME"] = config_file.getfloat(topic_name, "RECONNECT_WAIT_TIME")
+        except (configparser.NoOptionError, ValueError) as e:
+            raise SystemExit("Error reading config '%s':\n%s" % (config_path, e))
+        assert(config["WINDOW_SIZE"] >= 2), "%s: WINDOW_SIZE must be >= 2. Received %d" % (topic_name, config["WINDOW_SIZE"])
+        assert(config["MODE"] in MODES), "%s: MODE must be one of %s. Received %s" % (topic_name, MODES, config["MODE"])
+        configs[topic_name] = config
+    return configs
+
+def replay(timestamps, start, end, config):
+    """ returns (times, statuses) of the activity status transitions of one topic """
+    if config["MODE"] == "continuous":
+        return replay_continuous(timestamps, start, end, config["WINDOW_SIZE"], config["DEADLINE"], config["TIMEOUT"],
+                                 config["TIMER_RESOLUTION"])
+    return replay_duty_cycle(timestamps, start, end, config["WINDOW_SIZE"], config["DEADLINE"], config["TIMEOUT"],
+                             config["RECONNECT_WAIT_TIME"], config["TIMER_RESOLUTION"])
+
+def main(args=None):
+    parser = argparse.ArgumentParser(NAME)
+    parser.add_argument("bag", type=str, help="rosbag2 directory, or a .db3 or .mcap file")
+    parser.add_argument("--config-path", type=str, default="config/example.ini")
+    parser.add_argument("--topic", type=str, nargs="+", default=None, help="Only topics matching one of these patterns")
+    parser.add_argument("--summary", action="store_true", help="Print the time each topic spent in each activity status")
+    parser.add_argument("--history", type=str, default=None,
+                        help="Also write the transitions to this HISTORY_FILE, for topic_status_history")
+    args = parser.parse_args(args)
+
+    configs = read_topic_configs(os.path.join(DIR, args.config_path))
+    if args.topic is not None:
+        topic_filter = TopicFilter(args.topic)
+        configs = {topic_name: config for topic_name, config in configs.items() if topic_filter.match(topic_name)}
+
+    load_start = time.perf_counter()
+    try:
+        bag = BagTimestamps(args.bag)
+    except ValueError as e:
+        raise SystemExit(e)
+    if bag.start is None:
+        raise SystemExit("'%s' has no messages" % args.bag)
+
+    replay_start = time.perf_counter()
+    results = dict()  # name(str): (times, statuses)
+    for topic_name, config in sorted(configs.items()):
+        # A configured topic missing from the bag times out
+        timestamps = bag.topics.get(topic_name, [])
+        results[topic_name] = replay(timestamps, bag.start, bag.end, config)
+    replay_end = time.perf_counter()
+
+    if args.history is not None:
+        # A bag doesn't tell the connection status, transitions are recorded with UNDEFINED
+        history = HistoryLog(args.history)
+        for topic_name, (times, statuses) in results.items():
+            topic_status_data = TopicStatusData(topic_name, bag.msg_types.get(topic_name, ""))
+            for timestamp, status in zip(times.tolist(), statuses.tolist()):
+                topic_status_data.activity_status = status
+                history.record(topic_status_data, timestamp)
+        history.close()
+
+    if args.summary:
+        statuses = list(ActivityStatus)
+        print("%-40s %9s" % ("topic", "messages") + "".join(" %13s" % status.name for status in statuses))
+        for topic_name, (times, topic_statuses) in results.items():
+            seconds = time_in_status(times, topic_statuses, bag.start, bag.end)
+            print("%-40s %9d" % (topic_name, len(bag.topics.get(topic_name, []))) +
+                  "".join(" %13.1f" % seconds[status.value] for status in statuses))
+    else:
+        transitions = [(timestamp, topic_name, status) for topic_name, (times, statuses) in results.items()
+                       for timestamp, status in zip(times.tolist(), statuses.tolist())]
+        for timestamp, topic_name, status in sorted(transitions):
+            print("%s %-40s %s" % (format_time(timestamp), topic_name, ActivityStatus(status).name))
+
+    print("# %.1f s of recording, %d messages: loaded in %.3f s, replayed in %.3f s" %
+          (bag.end - bag.start, sum(len(timestamps) for timestamps in bag.topics.values()),
+           replay_start - load_start, replay_end - replay_start))
+
+if __name__ == "__main__":
+    main()